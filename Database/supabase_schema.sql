@@ -99,6 +99,7 @@ CREATE TABLE IF NOT EXISTS simulations (
     is_override BOOLEAN DEFAULT FALSE,
     simulation_runs INTEGER DEFAULT 10000,
     explanation TEXT,
+    summary JSONB, -- Compact distribution summary: quantiles, histogram, factors, seed, engine version
     
     -- Timestamps
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -107,6 +108,9 @@ CREATE TABLE IF NOT EXISTS simulations (
     CONSTRAINT fk_crop FOREIGN KEY (crop_name) REFERENCES crops(name) ON DELETE CASCADE
 );
 
+-- Existing deployments: add columns introduced after the initial schema
+ALTER TABLE simulations ADD COLUMN IF NOT EXISTS summary JSONB;
+
 -- ============================================
 -- TABLE: user_feedback (optional)
 -- Collects user feedback on simulation accuracy
@@ -122,6 +126,28 @@ CREATE TABLE IF NOT EXISTS user_feedback (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- ============================================
+-- TABLE: simulation_rollups
+-- Per week x crop x terrain x region aggregates for /api/analytics,
+-- maintained incrementally by the simulations_rollup trigger below
+-- ============================================
+CREATE TABLE IF NOT EXISTS simulation_rollups (
+    week_start DATE NOT NULL, -- Monday of the UTC week
+    crop_name VARCHAR(100) NOT NULL,
+    terrain VARCHAR(50) NOT NULL,
+    region_lat DECIMAL(9,6) NOT NULL, -- South-west corner of the 1 degree region cell
+    region_lon DECIMAL(9,6) NOT NULL,
+    
+    simulation_count INTEGER NOT NULL DEFAULT 0,
+    sum_success_probability DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_expected_yield DOUBLE PRECISION NOT NULL DEFAULT 0,
+    low_risk_count INTEGER NOT NULL DEFAULT 0,
+    medium_risk_count INTEGER NOT NULL DEFAULT 0,
+    high_risk_count INTEGER NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (week_start, crop_name, terrain, region_lat, region_lon)
+);
+
 -- ============================================
 -- INDEXES for performance
 -- ============================================
@@ -132,6 +158,15 @@ CREATE INDEX idx_simulations_location ON simulations(latitude, longitude);
 CREATE INDEX idx_simulations_created ON simulations(created_at DESC);
 CREATE INDEX idx_terrain_type ON terrain_modifiers(terrain_type);
 
+-- Keyset pagination for /api/simulations/history: (created_at, id) ordering
+-- lets every page be a range scan, and the composites serve the common
+-- filtered listings without a sort
+CREATE INDEX idx_simulations_created_id ON simulations(created_at DESC, id DESC);
+CREATE INDEX idx_simulations_crop_created ON simulations(crop_name, created_at DESC, id DESC);
+CREATE INDEX idx_simulations_terrain_created ON simulations(terrain, created_at DESC, id DESC);
+CREATE INDEX idx_simulations_risk_created ON simulations(risk_level, created_at DESC, id DESC);
+CREATE INDEX idx_rollups_crop_week ON simulation_rollups(crop_name, week_start);
+
 -- ============================================
 -- SAMPLE DATA: Crops
 -- ============================================
@@ -206,6 +241,130 @@ BEFORE UPDATE ON crops
 FOR EACH ROW
 EXECUTE FUNCTION update_updated_at();
 
+-- Rollup maintenance: every inserted simulation updates its rollup row in
+-- the same transaction. The region cell size (1 degree) must match
+-- ROLLUP_REGION_DEGREES in the backend. The function runs as its owner
+-- (SECURITY DEFINER) because clients only have SELECT on simulation_rollups.
+CREATE OR REPLACE FUNCTION update_simulation_rollup()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO simulation_rollups (
+        week_start, crop_name, terrain, region_lat, region_lon,
+        simulation_count, sum_success_probability, sum_expected_yield,
+        low_risk_count, medium_risk_count, high_risk_count
+    ) VALUES (
+        date_trunc('week', NEW.created_at AT TIME ZONE 'UTC')::date,
+        NEW.crop_name,
+        NEW.terrain,
+        floor(NEW.latitude),
+        floor(NEW.longitude),
+        1,
+        NEW.success_probability,
+        NEW.expected_yield,
+        (NEW.risk_level = 'Low')::int,
+        (NEW.risk_level = 'Medium')::int,
+        (NEW.risk_level = 'High')::int
+    )
+    ON CONFLICT (week_start, crop_name, terrain, region_lat, region_lon) DO UPDATE SET
+        simulation_count = simulation_rollups.simulation_count + EXCLUDED.simulation_count,
+        sum_success_probability = simulation_rollups.sum_success_probability + EXCLUDED.sum_success_probability,
+        sum_expected_yield = simulation_rollups.sum_expected_yield + EXCLUDED.sum_expected_yield,
+        low_risk_count = simulation_rollups.low_risk_count + EXCLUDED.low_risk_count,
+        medium_risk_count = simulation_rollups.medium_risk_count + EXCLUDED.medium_risk_count,
+        high_risk_count = simulation_rollups.high_risk_count + EXCLUDED.high_risk_count;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER simulations_rollup
+AFTER INSERT ON simulations
+FOR EACH ROW
+EXECUTE FUNCTION update_simulation_rollup();
+
+-- Backfill: build the rollups of simulations stored before the trigger
+-- existed. Runs only while simulation_rollups is empty, so re-running this
+-- script does not count simulations twice.
+INSERT INTO simulation_rollups (
+    week_start, crop_name, terrain, region_lat, region_lon,
+    simulation_count, sum_success_probability, sum_expected_yield,
+    low_risk_count, medium_risk_count, high_risk_count
+)
+SELECT
+    date_trunc('week', created_at AT TIME ZONE 'UTC')::date,
+    crop_name,
+    terrain,
+    floor(latitude),
+    floor(longitude),
+    COUNT(*),
+    SUM(success_probability),
+    SUM(expected_yield),
+    COUNT(*) FILTER (WHERE risk_level = 'Low'),
+    COUNT(*) FILTER (WHERE risk_level = 'Medium'),
+    COUNT(*) FILTER (WHERE risk_level = 'High')
+FROM simulations
+WHERE NOT EXISTS (SELECT 1 FROM simulation_rollups)
+GROUP BY 1, 2, 3, 4, 5;
+
+-- Analytics groups for /api/analytics: rollup rows matching the filters,
+-- merged over the requested dimensions (any of week, crop, terrain,
+-- region) in the database so only the groups are returned. group_total is
+-- the number of groups before max_groups (or PostgREST's max-rows) applies,
+-- letting the backend refuse a cut-off answer.
+CREATE OR REPLACE FUNCTION analytics_groups(
+    group_by TEXT[],
+    p_crop TEXT DEFAULT NULL,
+    p_terrain TEXT DEFAULT NULL,
+    p_week_min DATE DEFAULT NULL,
+    p_week_max DATE DEFAULT NULL,
+    p_lat_min DOUBLE PRECISION DEFAULT NULL,
+    p_lat_max DOUBLE PRECISION DEFAULT NULL,
+    p_lon_min DOUBLE PRECISION DEFAULT NULL,
+    p_lon_max DOUBLE PRECISION DEFAULT NULL,
+    max_groups INTEGER DEFAULT 5000
+)
+RETURNS TABLE (
+    week_start DATE,
+    crop_name VARCHAR(100),
+    terrain VARCHAR(50),
+    region_lat DECIMAL(9,6),
+    region_lon DECIMAL(9,6),
+    simulation_count BIGINT,
+    sum_success_probability DOUBLE PRECISION,
+    sum_expected_yield DOUBLE PRECISION,
+    low_risk_count BIGINT,
+    medium_risk_count BIGINT,
+    high_risk_count BIGINT,
+    group_total BIGINT
+) AS $$
+    SELECT
+        CASE WHEN 'week' = ANY(group_by) THEN r.week_start END,
+        CASE WHEN 'crop' = ANY(group_by) THEN r.crop_name END,
+        CASE WHEN 'terrain' = ANY(group_by) THEN r.terrain END,
+        CASE WHEN 'region' = ANY(group_by) THEN r.region_lat END,
+        CASE WHEN 'region' = ANY(group_by) THEN r.region_lon END,
+        SUM(r.simulation_count),
+        SUM(r.sum_success_probability),
+        SUM(r.sum_expected_yield),
+        SUM(r.low_risk_count),
+        SUM(r.medium_risk_count),
+        SUM(r.high_risk_count),
+        COUNT(*) OVER ()
+    FROM simulation_rollups r
+    WHERE (p_crop IS NULL OR r.crop_name = p_crop)
+      AND (p_terrain IS NULL OR r.terrain = p_terrain)
+      AND (p_week_min IS NULL OR r.week_start >= p_week_min)
+      AND (p_week_max IS NULL OR r.week_start <= p_week_max)
+      AND (p_lat_min IS NULL OR r.region_lat >= p_lat_min)
+      AND (p_lat_max IS NULL OR r.region_lat <= p_lat_max)
+      AND (p_lon_min IS NULL OR r.region_lon >= p_lon_min)
+      AND (p_lon_max IS NULL OR r.region_lon <= p_lon_max)
+    GROUP BY 1, 2, 3, 4, 5
+    LIMIT max_groups;
+$$ LANGUAGE sql STABLE;
+
 -- ============================================
 -- ROW LEVEL SECURITY (Optional)
 -- Enable if you want user-specific access control
@@ -235,4 +394,6 @@ EXECUTE FUNCTION update_updated_at();
 GRANT SELECT ON crops TO authenticated;
 GRANT SELECT ON terrain_modifiers TO authenticated;
 GRANT ALL ON simulations TO authenticated;
-GRANT ALL ON user_feedback TO authenticated;
\ No newline at end of file
+GRANT ALL ON user_feedback TO authenticated;
+GRANT SELECT ON simulation_rollups TO authenticated;
+GRANT EXECUTE ON FUNCTION analytics_groups TO authenticated;
\ No newline at end of file
@@ -1,164 +1,389 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import os
+import time
+import logging
+import functools
+import itertools
+import uuid
+import random
+import threading
+import multiprocessing
+from urllib.parse import urlencode
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# CRITICAL: Patch httpx BEFORE importing supabase to avoid proxy parameter error
-import httpx
-original_client_init = httpx.Client.__init__
+from utils.lazy import LazyResource, StartupReport
 
-def patched_init(self, *args, proxy=None, **kwargs):
-    # Ignore proxy parameter to avoid compatibility issues with supabase/gotrue
-    original_client_init(self, *args, **kwargs)
+# Import and initialization timings for each subsystem
+startup = StartupReport()
 
-httpx.Client.__init__ = patched_init
+with startup.measure_import('flask'):
+    from flask import Flask, request, jsonify, g, Response, stream_with_context
+    from flask_cors import CORS
 
-from engine.simulator import MonteCarloSimulator
-from engine.penalties import PenaltyEngine
-from engine.scoring import compute_metrics
-from engine.explainability import generate_explanation
-from utils.validators import validate_input
-from utils.weather_service import WeatherService
+with startup.measure_import('engine'):
+    from engine.pipeline import run_simulation
+    from engine.simulator import RunDraws
+    from engine.pool import SimulationPool, PoolSaturatedError, PoolUnavailableError
+    from engine.sketch import compare_summaries
+    from engine.memory import choose_mode, estimate_memory
+
+with startup.measure_import('utils'):
+    from utils.validators import validate_input, validate_feedback, DEFAULT_EXAMPLE_RUNS
+    from utils.admission import AdmissionController, AdmissionRejected
+    from utils.scheduler import SECONDS_PER_RUN, estimate_seconds, choose_route, load_calibration
+    from utils.jobs import JobManager, JobQueueFullError
+    from utils.singleflight import SingleFlight, FlightTimeout, canonical_key
+    from utils.http_cache import VersionClock, reference_version
+    from utils.whatif import WhatIfSessions
+    from utils.responses import FastJSONProvider, compress_response
+    from utils.weather_service import WeatherService
+    from utils.metrics import (
+        registry as metrics_registry, PROMETHEUS_CONTENT_TYPE, HTTP_REQUESTS, HTTP_LATENCY,
+        SIMULATIONS, SIMULATION_RUNS, SIMULATIONS_REUSED, SIMULATIONS_TRUNCATED, SIMULATIONS_COALESCED, SIMULATION_PEAK_MEMORY,
+        SIMULATION_MEMORY_DECISIONS, ADMISSION_WAIT, ADMISSION_REJECTIONS, PROFILES,
+        time_stage, observe_stages
+    )
+    from utils.profiling import PROFILE_DIR, PROFILE_TOP, profile_options, start_profiler, write_profile
+    from utils.logging_utils import get_logger, log_event, LOG_SAMPLE_RATE
+    from utils.spatial_index import SpatialIndex, simulation_entry, entry_to_json, can_reuse
+    from utils.history_query import parse_history_query, paginate, HISTORY_COLUMNS
+    from utils.rollups import parse_analytics_query, aggregate, TooManyGroupsError
+    from utils.reference_data import (
+        MOCK_CROPS, TERRAIN_DEFAULTS, find_crop, extract_terrain_modifiers,
+        resolve_crop, resolve_terrain_modifiers, build_environment
+    )
+    from utils.export import (
+        EXPORT_FORMATS, RUN_COLUMNS, ExportError, resolve_columns, check_format,
+        iter_simulation_batches, iter_run_batches, encode, build_run_simulator
+    )
+
+with startup.measure_import('storage'):
+    from storage import open_storage, GuardedStorage, CircuitBreaker, StorageUnavailableError
+
+from config import Config
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
-# Initialize Supabase
-supabase = None
-SUPABASE_ENABLED = False
-try:
-    from supabase import create_client
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-    
-    if supabase_url and supabase_key:
+logger = get_logger('terrasim.api')
+
+# Settings, read from the environment once in config.Config (see there
+# for what each one controls)
+SIMULATION_EXECUTION = Config.SIMULATION_EXECUTION
+SIMULATION_WORKERS = Config.SIMULATION_WORKERS
+SIMULATION_QUEUE_DEPTH = Config.SIMULATION_QUEUE_DEPTH
+SIMULATION_TIMEOUT = Config.SIMULATION_TIMEOUT
+SCHEDULER_INLINE_MAX_SECONDS = Config.SCHEDULER_INLINE_MAX_SECONDS
+SCHEDULER_JOB_MIN_SECONDS = Config.SCHEDULER_JOB_MIN_SECONDS
+SCHEDULER_BASELINE = Config.SCHEDULER_BASELINE
+ASYNC_JOBS = Config.ASYNC_JOBS
+JOB_WORKERS = Config.JOB_WORKERS
+JOB_MAX_PENDING = Config.JOB_MAX_PENDING
+JOB_RESULT_TTL = Config.JOB_RESULT_TTL
+SIMULATION_CONCURRENCY = Config.SIMULATION_CONCURRENCY
+ADMISSION_QUEUE_DEPTH = Config.ADMISSION_QUEUE_DEPTH
+ADMISSION_MAX_WAIT = Config.ADMISSION_MAX_WAIT
+ADMISSION_CLIENT_LIMIT = Config.ADMISSION_CLIENT_LIMIT
+DEFAULT_SIMULATION_RUNS = Config.DEFAULT_SIMULATION_RUNS
+MAX_SIMULATION_RUNS = Config.MAX_SIMULATION_RUNS
+SIMULATION_COALESCING = Config.SIMULATION_COALESCING
+WHATIF_SESSION_TTL = Config.WHATIF_SESSION_TTL
+WHATIF_MAX_SESSIONS = Config.WHATIF_MAX_SESSIONS
+WHATIF_MEMORY_MB = Config.WHATIF_MEMORY_MB
+DEADLINE_RESERVE_MS = Config.DEADLINE_RESERVE_MS
+SIMULATION_MEMORY_BUDGET_MB = Config.SIMULATION_MEMORY_BUDGET_MB
+MEMORY_TRACE_SAMPLE_RATE = Config.MEMORY_TRACE_SAMPLE_RATE
+SIMULATION_SUMMARIES = Config.SIMULATION_SUMMARIES
+MAX_COMPARE_SIMULATIONS = 10
+
+SPATIAL_INDEX_CELL_DEGREES = Config.SPATIAL_INDEX_CELL_DEGREES
+SPATIAL_INDEX_MAX_ENTRIES = Config.SPATIAL_INDEX_MAX_ENTRIES
+SPATIAL_INDEX_WARM_ROWS = Config.SPATIAL_INDEX_WARM_ROWS
+REUSE_RADIUS_KM = Config.SIMULATION_REUSE_RADIUS_KM
+REUSE_MAX_AGE_HOURS = Config.SIMULATION_REUSE_MAX_AGE_HOURS
+
+STORAGE_BACKEND = Config.STORAGE_BACKEND
+SQLITE_PATH = Config.SQLITE_PATH
+STORAGE_CALL_TIMEOUT = Config.STORAGE_CALL_TIMEOUT
+STORAGE_BREAKER_FAILURES = Config.STORAGE_BREAKER_FAILURES
+STORAGE_BREAKER_RESET_SECONDS = Config.STORAGE_BREAKER_RESET_SECONDS
+
+REFERENCE_CACHE_MAX_AGE = Config.REFERENCE_CACHE_MAX_AGE
+RESPONSE_COMPRESSION = Config.RESPONSE_COMPRESSION
+COMPRESSION_MIN_BYTES = Config.COMPRESSION_MIN_BYTES
+
+BACKGROUND_INIT = Config.BACKGROUND_INIT
+DB_INIT_WAIT = Config.DB_INIT_WAIT
+
+# ============================================
+# Subsystems (initialized lazily or in the background)
+# ============================================
+
+def _create_storage():
+    """Storage provider selected by STORAGE_BACKEND; None means mock mode"""
+    storage = open_storage(STORAGE_BACKEND, SQLITE_PATH)
+    if storage is not None and storage.name == 'supabase':
+        # Remote calls can hang; the embedded SQLite store is left unguarded
+        storage = GuardedStorage(storage, timeout=STORAGE_CALL_TIMEOUT, breaker=CircuitBreaker(
+            STORAGE_BREAKER_FAILURES, STORAGE_BREAKER_RESET_SECONDS
+        ))
+    return storage
+
+def _create_weather_service():
+    return WeatherService(
+        Config.WEATHER_API_KEY,
+        climatology_path=Config.CLIMATOLOGY_PATH,
+        base_url=Config.WEATHER_API_URL
+    )
+
+def load_reference_data():
+    """Load all crop profiles and terrain modifiers (from storage or defaults)"""
+    crops = MOCK_CROPS
+    terrain_modifiers = {terrain: dict(mods) for terrain, mods in TERRAIN_DEFAULTS.items()}
+    storage = get_storage()
+    if storage:
         try:
-            supabase = create_client(supabase_url, supabase_key)
-            SUPABASE_ENABLED = True
-            print("[OK] Supabase connected successfully")
+            crops = storage.list_crops() or crops
+            for row in storage.list_terrain_modifiers():
+                terrain_modifiers[row['terrain_type']] = extract_terrain_modifiers(row)
         except Exception as e:
-            print(f"[WARN] Supabase connection failed: {str(e)[:100]}")
-            print("       Running in mock mode with hardcoded data")
-            supabase = None
-    else:
-        print("[WARN] Supabase credentials not found in environment")
-        print("       Running in mock mode with hardcoded data")
-except Exception as e:
-    print(f"[WARN] Could not import Supabase: {str(e)[:100]}")
-    print("       Running in mock mode with hardcoded data")
-    supabase = None
+            log_event(logger, logging.WARNING, 'reference_data.load_failed', error=str(e)[:100])
+    return {'crops': crops, 'terrain_modifiers': terrain_modifiers}
 
-weather_service = WeatherService(os.getenv("WEATHER_API_KEY"))
+def _start_simulation_pool():
+    reference = reference_data.get()
+    pool = SimulationPool(
+        workers=SIMULATION_WORKERS,
+        queue_depth=SIMULATION_QUEUE_DEPTH,
+        crops=reference['crops'],
+        terrain_modifiers=reference['terrain_modifiers']
+    ).start()
+    log_event(logger, logging.INFO, 'simulation_pool.started', workers=SIMULATION_WORKERS)
+    return pool
 
-# Mock data for when Supabase is unavailable
-MOCK_CROPS = [
-    {
-        "id": 1,
-        "name": "Wheat",
-        "temp_min": 0,
-        "temp_max": 30,
-        "rainfall_min": 400,
-        "rainfall_max": 1000,
-        "growing_season_days": 120,
-        "ideal_yield": 5000,
-        "category": "Cereal",
-        "description": "Winter or spring cereal grain",
-        "season": "Winter",
-        "yield_potential": 5.5
-    },
-    {
-        "id": 2,
-        "name": "Rice",
-        "temp_min": 15,
-        "temp_max": 35,
-        "rainfall_min": 1200,
-        "rainfall_max": 2000,
-        "growing_season_days": 150,
-        "ideal_yield": 6000,
-        "category": "Cereal",
-        "description": "Staple grain crop requiring water",
-        "season": "Summer",
-        "yield_potential": 5.0
-    },
-    {
-        "id": 3,
-        "name": "Corn",
-        "temp_min": 10,
-        "temp_max": 35,
-        "rainfall_min": 400,
-        "rainfall_max": 1200,
-        "growing_season_days": 110,
-        "ideal_yield": 8000,
-        "category": "Cereal",
-        "description": "Versatile crop for food and feed",
-        "season": "Summer",
-        "yield_potential": 6.5
-    },
-    {
-        "id": 4,
-        "name": "Soybean",
-        "temp_min": 10,
-        "temp_max": 30,
-        "rainfall_min": 400,
-        "rainfall_max": 900,
-        "growing_season_days": 120,
-        "ideal_yield": 3000,
-        "category": "Legume",
-        "description": "Protein-rich legume crop",
-        "season": "Summer",
-        "yield_potential": 2.5
-    },
-    {
-        "id": 5,
-        "name": "Potato",
-        "temp_min": 5,
-        "temp_max": 25,
-        "rainfall_min": 400,
-        "rainfall_max": 800,
-        "growing_season_days": 90,
-        "ideal_yield": 20000,
-        "category": "Tuber",
-        "description": "Starchy tuber crop",
-        "season": "Spring/Fall",
-        "yield_potential": 20.0
+def _load_spatial_index():
+    """Build the spatial index, warmed with the most recent persisted simulations"""
+    index = SpatialIndex(cell_degrees=SPATIAL_INDEX_CELL_DEGREES, max_entries=SPATIAL_INDEX_MAX_ENTRIES)
+    storage = get_storage()
+    if storage:
+        try:
+            rows = storage.recent_simulations(SPATIAL_INDEX_WARM_ROWS, (
+                'id', 'crop_name', 'terrain', 'latitude', 'longitude', 'created_at',
+                'avg_temp', 'avg_rainfall', 'humidity', 'wind_speed', 'simulation_runs'
+            ))
+            for row in reversed(rows):
+                index.add(simulation_entry(row))
+        except Exception as e:
+            log_event(logger, logging.WARNING, 'spatial_index.warm_failed', error=str(e)[:100])
+    return index
+
+database = startup.register(LazyResource('database', _create_storage))
+weather = startup.register(LazyResource('weather', _create_weather_service))
+reference_data = startup.register(LazyResource('reference_data', load_reference_data))
+spatial_index = startup.register(LazyResource(
+    'spatial_index', _load_spatial_index, required=False, eager=True
+))
+simulation_pool_resource = startup.register(LazyResource(
+    'simulation_pool', _start_simulation_pool, required=SIMULATION_EXECUTION == 'pool',
+    eager=SIMULATION_EXECUTION in ('pool', 'auto')
+))
+
+admission = AdmissionController(
+    SIMULATION_CONCURRENCY, ADMISSION_QUEUE_DEPTH, ADMISSION_MAX_WAIT, ADMISSION_CLIENT_LIMIT
+)
+jobs = JobManager(workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, ttl=JOB_RESULT_TTL)
+in_flight_simulations = SingleFlight()
+whatif_sessions = WhatIfSessions(
+    ttl=WHATIF_SESSION_TTL, max_sessions=WHATIF_MAX_SESSIONS, max_bytes=int(WHATIF_MEMORY_MB * 2 ** 20)
+)
+
+def _scheduler_seconds_per_run():
+    """Per-run engine cost, from the benchmark baseline when one is configured"""
+    if SCHEDULER_BASELINE:
+        try:
+            calibrated = load_calibration(SCHEDULER_BASELINE)
+            if calibrated:
+                return calibrated
+        except (OSError, ValueError) as e:
+            log_event(logger, logging.WARNING, 'scheduler.calibration_failed', error=str(e)[:100])
+    return SECONDS_PER_RUN
+
+SCHEDULER_SECONDS_PER_RUN = _scheduler_seconds_per_run()
+
+def get_storage():
+    """Storage provider, or None in mock mode or while still connecting"""
+    return database.get(timeout=DB_INIT_WAIT)
+
+def get_weather_service() -> WeatherService:
+    return weather.get()
+
+def get_simulation_pool():
+    """Simulation process pool, started on first use; None if it failed to start"""
+    return simulation_pool_resource.get()
+
+def _initialize_subsystems():
+    # Required subsystems first so readiness is reached as early as possible
+    for resource in sorted(startup.resources, key=lambda r: not r.required):
+        if resource.eager:
+            resource.get()
+    log_event(logger, logging.INFO, 'startup.report', **startup.report())
+
+def _pool_task_counts():
+    pool = simulation_pool_resource.peek()
+    if pool is None:
+        return None
+    stats = pool.stats()
+    return {
+        ('running',): stats['in_flight'] - stats['queued'],
+        ('queued',): stats['queued'],
+        ('capacity',): stats['capacity']
     }
-]
+
+metrics_registry.gauge(
+    'terrasim_simulation_pool_tasks', 'Simulation process pool tasks by state',
+    ('state',), callback=_pool_task_counts
+)
+def _admission_counts():
+    stats = admission.stats()
+    return {
+        ('running',): stats['running'],
+        ('queued',): stats['queued'],
+        ('capacity',): stats['max_concurrent'] + stats['queue_depth']
+    }
+
+metrics_registry.gauge(
+    'terrasim_admission_requests', 'Simulations holding or waiting for an admission slot',
+    ('state',), callback=_admission_counts
+)
+metrics_registry.gauge(
+    'terrasim_simulations_in_flight', 'Distinct simulations being computed',
+    callback=in_flight_simulations.in_flight
+)
+metrics_registry.gauge(
+    'terrasim_whatif_sessions', 'What-if sessions holding random draws',
+    callback=lambda: whatif_sessions.stats()['sessions']
+)
+metrics_registry.gauge(
+    'terrasim_simulation_jobs', 'Asynchronous simulation jobs by status',
+    ('status',), callback=lambda: {(status,): count for status, count in jobs.counts().items()}
+)
+_BREAKER_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+def _storage_breaker_state():
+    storage = database.peek()
+    if not isinstance(storage, GuardedStorage):
+        return None
+    return _BREAKER_STATE_VALUES[storage.breaker.state]
+
+metrics_registry.gauge(
+    'terrasim_storage_breaker_state', 'Storage circuit breaker (0 closed, 1 half-open, 2 open)',
+    callback=_storage_breaker_state
+)
+metrics_registry.gauge(
+    'terrasim_climatology_loaded', 'Whether an offline climatology grid is loaded',
+    callback=lambda: 1 if weather.peek() and weather.peek().climatology else 0
+)
+
+if BACKGROUND_INIT and multiprocessing.parent_process() is None:
+    # Pool workers re-importing this module must not start their own subsystems
+    threading.Thread(target=_initialize_subsystems, name='init-subsystems', daemon=True).start()
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    if 'request_start' in g:
+        HTTP_LATENCY.observe(time.perf_counter() - g.request_start, endpoint=endpoint)
+    return response
+
+@app.after_request
+def _compress_response(response):
+    if RESPONSE_COMPRESSION:
+        return compress_response(response, COMPRESSION_MIN_BYTES)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of request, stage, run and queue metrics"""
+    return Response(metrics_registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    status = "healthy" if supabase else "healthy (mock mode)"
-    return jsonify({"status": status, "service": "Agricultural Simulation Engine"})
+    """Liveness check: answers immediately and never waits on subsystems"""
+    storage = database.peek()
+    if storage:
+        status = "healthy"
+    elif database.settled:
+        status = "healthy (mock mode)"
+    else:
+        status = "healthy (starting)"
+    return jsonify({
+        "status": status,
+        "service": "Agricultural Simulation Engine",
+        "storage": storage.name if storage else None,
+        "storage_breaker": storage.breaker.state if isinstance(storage, GuardedStorage) else None,
+        "ready": _is_ready(),
+        "admission": admission.stats()
+    })
+
+def _is_ready():
+    # Without background initialization every subsystem starts on demand
+    return startup.ready if BACKGROUND_INIT else True
+
+@app.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: 503 until required subsystems have initialized"""
+    ready = _is_ready()
+    body = {"ready": ready}
+    body.update(startup.report())
+    return jsonify(body), 200 if ready else 503
+
+reference_versions = VersionClock()
+
+def _reference_response(payload, rows):
+    """JSON response with cache validators; 304 when the client's copy is current"""
+    version = reference_version(payload)
+    response = jsonify(payload)
+    response.set_etag(version, weak=True)
+    response.last_modified = reference_versions.last_modified(rows, version)
+    response.cache_control.public = True
+    response.cache_control.max_age = REFERENCE_CACHE_MAX_AGE
+    return response.make_conditional(request)
 
 @app.route('/api/crops', methods=['GET'])
 def get_crops():
-    if supabase:
+    storage = get_storage()
+    if storage:
         try:
-            response = supabase.table('crops').select('*').execute()
-            return jsonify(response.data)
-        except:
-            pass
+            crops = storage.list_crops()
+            return _reference_response(crops, crops)
+        except Exception as e:
+            log_event(logger, logging.WARNING, 'crops.storage_failed', error=str(e)[:100])
     # Fallback to mock data
-    return jsonify(MOCK_CROPS)
+    return _reference_response(MOCK_CROPS, MOCK_CROPS)
 
 
 @app.route('/api/crops/<crop_name>', methods=['GET'])
 def get_crop(crop_name):
     """Fetch specific crop details"""
     try:
-        if supabase:
-            response = supabase.table('crops').select('*').eq('name', crop_name).execute()
-            if response.data:
-                return jsonify(response.data[0])
-    except:
-        pass
+        storage = get_storage()
+        if storage:
+            crop = storage.get_crop(crop_name)
+            if crop:
+                return _reference_response(crop, [crop])
+    except Exception as e:
+        log_event(logger, logging.WARNING, 'crops.storage_failed', crop=crop_name, error=str(e)[:100])
     
     # Fallback to mock data
-    for crop in MOCK_CROPS:
-        if crop['name'].lower() == crop_name.lower():
-            return jsonify(crop)
+    crop = find_crop(MOCK_CROPS, crop_name)
+    if crop:
+        return _reference_response(crop, [crop])
     
     return jsonify({"error": "Crop not found"}), 404
 
@@ -169,12 +394,50 @@ def get_weather():
         lat = float(request.args.get('lat'))
         lon = float(request.args.get('lon'))
         
-        weather_data = weather_service.get_current_weather(lat, lon)
+        weather_data = get_weather_service().get_current_weather(lat, lon)
         return jsonify(weather_data)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def profiled(view):
+    """
+    Profile a view when authorized (X-Profile token) or sampled.
+    
+    Authorized requests get the summary in the JSON body under "profile";
+    with PROFILE_DIR set, the raw profile and summary are also written there.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        options = profile_options(request.headers, request.args)
+        if options is None:
+            return view(*args, **kwargs)
+        
+        g.profiling = True
+        PROFILES.inc(trigger=options['trigger'])
+        profiler = start_profiler(options['mode'])
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        finally:
+            profiler.stop()
+        summary = profiler.summary(PROFILE_TOP)
+        
+        if PROFILE_DIR:
+            name = f"{request.endpoint}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            try:
+                path = write_profile(profiler, summary, name)
+                log_event(logger, logging.INFO, 'profile.written', trigger=options['trigger'], path=path)
+            except OSError as e:
+                log_event(logger, logging.WARNING, 'profile.write_failed', error=str(e)[:100])
+        
+        body = response.get_json(silent=True) if options['respond'] else None
+        if isinstance(body, dict):
+            body['profile'] = summary
+            response.set_data(app.json.dumps(body))
+        return response
+    return wrapper
+
 @app.route('/api/simulate', methods=['POST'])
+@profiled
 def simulate():
     """
     Main simulation endpoint
@@ -183,162 +446,790 @@ def simulate():
         "crop": "rice",
         "location": {"lat": 13.08, "lon": 80.27},
         "terrain": "plain",
-        "weather": {...}
+        "weather": {...},
+        "runs": 10000,
+        "deadline_ms": 500,
+        "fields": ["success_probability", "expected_yield"],
+        "examples": {"size": 3, "stratify": true}
     }
+    
+    With deadline_ms the engine stops early if needed to answer in time;
+    the response then says whether it was truncated and carries 95%
+    confidence intervals of the estimates.
+    
+    fields limits the response to the listed fields, and stages producing
+    nothing requested are skipped: the explanation (failure pattern
+    analysis) unless "explanation" is listed, and persistence (with the
+    stored distribution summary) unless "simulation_id" is listed.
+    
+    examples asks for concrete example runs, reservoir-sampled from all
+    runs (per outcome and limiting factor when stratified).
     """
     try:
         data = request.json
-        print(f"[SIMULATE] Received payload: {data}")
         
         # Validate input
-        validation_error = validate_input(data)
+        with time_stage('validate'):
+            validation_error = validate_input(data, max_runs=MAX_SIMULATION_RUNS)
         if validation_error:
-            print(f"[SIMULATE] Validation error: {validation_error}")
+            log_event(logger, logging.INFO, 'simulate.invalid', error=validation_error)
             return jsonify({"error": validation_error}), 400
         
-        # Fetch crop profile (from Supabase or mock)
-        crop_profile = None
-        if supabase:
-            try:
-                crop_response = supabase.table('crops').select('*').eq('name', data['crop']).execute()
-                if crop_response.data:
-                    crop_profile = crop_response.data[0]
-            except:
-                pass
+        deadline = _request_deadline(data['deadline_ms']) if 'deadline_ms' in data else None
+        fields = data.get('fields')
+        explain, summary, persist = _output_stages(fields)
+        example_runs, stratify_examples = _example_options(data.get('examples'), fields)
         
-        # Fallback to mock data
-        if not crop_profile:
-            for crop in MOCK_CROPS:
-                if crop['name'].lower() == data['crop'].lower():
-                    crop_profile = crop
-                    break
+        # Keep every run's result only when that fits the memory budget
+        runs = data.get('runs', DEFAULT_SIMULATION_RUNS)
+        engine_mode = choose_mode(runs, int(SIMULATION_MEMORY_BUDGET_MB * 2 ** 20), summary)
+        if engine_mode is None:
+            SIMULATION_MEMORY_DECISIONS.inc(decision='rejected')
+            estimated_mb = estimate_memory(runs, 'streaming', summary) / 2 ** 20
+            return jsonify({
+                "error": (
+                    f"{runs} runs need about {estimated_mb:.0f} MB, over the "
+                    f"{SIMULATION_MEMORY_BUDGET_MB:g} MB simulation memory budget"
+                )
+            }), 422
         
+        log_event(
+            logger, logging.DEBUG, 'simulate.request', sample_rate=LOG_SAMPLE_RATE,
+            crop=data['crop'], terrain=data['terrain'],
+            lat=data['location']['lat'], lon=data['location']['lon']
+        )
+        
+        storage = get_storage()
+        crop_profile, terrain_modifiers, environment = _resolve_scenario(storage, data)
         if not crop_profile:
             return jsonify({"error": "Crop not found"}), 404
         
-        # Fetch terrain modifiers (from Supabase or use defaults)
-        terrain_modifiers = None
-        if supabase:
-            try:
-                terrain_response = supabase.table('terrain_modifiers').select('*').eq(
-                    'terrain_type', data['terrain']
-                ).execute()
-                if terrain_response.data:
-                    row = terrain_response.data[0]
-                    # Extract only the modifier fields we need
-                    terrain_modifiers = {
-                        'water_retention_factor': row.get('water_retention_factor', 1.0),
-                        'soil_depth_factor': row.get('soil_depth_factor', 1.0),
-                        'erosion_risk': row.get('erosion_risk', 0.0)
-                    }
-            except:
-                pass
-        
-        # Default terrain modifiers if not found
-        if not terrain_modifiers:
-            # Create a proper terrain modifiers structure
-            terrain_defaults = {
-                'plain': {'water_retention_factor': 1.0, 'soil_depth_factor': 1.0, 'erosion_risk': 0.1},
-                'plateau': {'water_retention_factor': 0.85, 'soil_depth_factor': 0.9, 'erosion_risk': 0.3},
-                'mountain': {'water_retention_factor': 0.6, 'soil_depth_factor': 0.7, 'erosion_risk': 0.7},
-                'valley': {'water_retention_factor': 1.1, 'soil_depth_factor': 1.1, 'erosion_risk': 0.2},
-                'coastal': {'water_retention_factor': 0.9, 'soil_depth_factor': 0.8, 'erosion_risk': 0.4}
-            }
-            terrain_modifiers = terrain_defaults.get(data['terrain'], 
-                                                   {'water_retention_factor': 1.0, 'soil_depth_factor': 1.0, 'erosion_risk': 0.1})
-        
-        # Prepare environment data
-        environment = {
-            "avg_temp": data['weather'].get('temp', 25),
-            "avg_rainfall": data['weather'].get('rainfall', 800),
-            "humidity": data['weather'].get('humidity', 70),
-            "wind_speed": data['weather'].get('wind', 10),
-            "elevation": data.get('elevation', 100),
-            "terrain": data['terrain'],
-            "latitude": data['location']['lat'],
-            "longitude": data['location']['lon']
-        }
+        log_event(
+            logger, logging.DEBUG, 'simulate.profiles', sample_rate=LOG_SAMPLE_RATE,
+            crop=crop_profile.get('name'), terrain=data['terrain'],
+            terrain_modifiers=terrain_modifiers
+        )
         
-        # Log profiles for debugging
-        print(f"[SIMULATE] crop_profile (type={type(crop_profile)}): {crop_profile}")
-        print(f"[SIMULATE] terrain_modifiers (type={type(terrain_modifiers)}): {terrain_modifiers}")
+        # Optionally answer with a recent nearby simulation of the same inputs;
+        # example runs are per-run outputs a stored result does not have
+        if data.get('reuse') and not example_runs:
+            with time_stage('reuse_lookup'):
+                reused = _find_reusable_simulation(data, environment, runs)
+            if reused:
+                SIMULATIONS_REUSED.inc()
+                return jsonify(_project(reused, fields, ('reused', 'reused_from')))
 
-        # Initialize penalty engine
-        penalty_engine = PenaltyEngine(crop_profile, environment, terrain_modifiers)
-        
-        # Determine if this is an override scenario
-        is_override = penalty_engine.check_compatibility()
-        
-        # Run Monte Carlo simulation
-        simulator = MonteCarloSimulator(
-            crop_profile=crop_profile,
-            environment=environment,
-            penalty_engine=penalty_engine,
-            runs=10000
+        # Route by estimated cost: inline, process pool or asynchronous job
+        route, estimated_seconds = _choose_route(runs, engine_mode)
+        if route == 'job' and deadline is not None:
+            # A client with a deadline wants an answer now, even a partial one
+            route = 'pool'
+        trace_memory = not g.get('profiling') and random.random() < MEMORY_TRACE_SAMPLE_RATE
+        simulation = (
+            crop_profile, environment, terrain_modifiers, runs, engine_mode, trace_memory, deadline,
+            summary, explain, example_runs, stratify_examples
         )
         
-        results = simulator.run()
+        if route == 'job':
+            try:
+                job = jobs.submit(
+                    functools.partial(_run_simulation_job, data, storage, simulation, persist, fields),
+                    estimated_seconds=round(estimated_seconds, 3)
+                )
+            except JobQueueFullError as e:
+                response = jsonify({"error": str(e)})
+                response.headers['Retry-After'] = str(max(1, round(estimated_seconds)))
+                return response, 429
+            log_event(logger, logging.INFO, 'simulate.job_queued', job_id=job['id'], runs=runs)
+            response = jsonify(_job_payload(job))
+            response.headers['Location'] = f"/api/jobs/{job['id']}"
+            return response, 202
         
-        # Compute metrics
-        success_rate, avg_yield, risk_level, yield_range = compute_metrics(results)
+        client = request.headers.get('X-Client-Id') or request.remote_addr or ''
         
-        # Generate explanation
-        explanation = generate_explanation(results, crop_profile, environment, is_override)
+        def compute():
+            wait_limit = None if deadline is None else deadline - time.time()
+            with admission.slot(client, wait_limit) as waited:
+                ADMISSION_WAIT.observe(waited)
+                outcome, execution = _execute_simulation(route, *simulation)
+            return _complete_simulation(data, storage, environment, outcome, execution, persist)
         
-        # Save simulation to database (if Supabase available)
-        if supabase:
-            try:
-                simulation_record = {
-                    "crop_name": data['crop'],
-                    "latitude": data['location']['lat'],
-                    "longitude": data['location']['lon'],
-                    "terrain": data['terrain'],
-                    "success_probability": success_rate,
-                    "expected_yield": avg_yield,
-                    "risk_level": risk_level,
-                    "is_override": is_override
-                }
-                supabase.table('simulations').insert(simulation_record).execute()
-            except:
-                pass  # Continue even if database save fails
+        try:
+            # Identical simulations already running are joined, not repeated;
+            # profiled requests always run their own. A joined request waits
+            # no longer than its own deadline, and if the leader's client was
+            # refused admission it asks for admission itself.
+            if SIMULATION_COALESCING and not g.get('profiling'):
+                key = canonical_key(
+                    crop_profile, terrain_modifiers, environment, runs, engine_mode,
+                    data.get('deadline_ms'), explain, summary, persist, example_runs, stratify_examples
+                )
+                wait_limit = SIMULATION_TIMEOUT if deadline is None else max(0.0, deadline - time.time())
+                result, shared = in_flight_simulations.do(
+                    key, compute, timeout=wait_limit, retry_on=(AdmissionRejected,)
+                )
+                if shared:
+                    SIMULATIONS_COALESCED.inc()
+            else:
+                result = compute()
+        except AdmissionRejected as e:
+            ADMISSION_REJECTIONS.inc(reason=e.reason)
+            log_event(logger, logging.INFO, 'simulate.rejected', reason=e.reason, client=client)
+            response = jsonify({"error": "Too many simulations in progress, please retry shortly"})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
+        except PoolSaturatedError:
+            response = jsonify({"error": "Simulation capacity exhausted, please retry shortly"})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        except PoolUnavailableError as e:
+            log_event(logger, logging.WARNING, 'simulate.pool_failed', error=str(e), client=client)
+            response = jsonify({"error": "Simulation did not complete, please retry shortly"})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        except FlightTimeout:
+            log_event(logger, logging.WARNING, 'simulate.coalesced_timeout', client=client)
+            response = jsonify({"error": "Simulation did not finish in time, please retry shortly"})
+            response.headers['Retry-After'] = '1'
+            return response, 503
         
         # Return response
-        return jsonify({
-            "success_probability": round(success_rate, 3),
-            "expected_yield": round(avg_yield, 2),
-            "risk_level": risk_level,
-            "explanation": explanation,
-            "is_override": is_override,
-            "yield_range": {
-                "min": round(yield_range[0], 2),
-                "avg": round(yield_range[1], 2),
-                "max": round(yield_range[2], 2)
-            },
-            "simulation_runs": len(results)
-        })
+        return jsonify(_project(result, fields))
         
     except Exception as e:
         error_msg = str(e)
-        print(f"[SIMULATE] Exception: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        log_event(logger, logging.ERROR, 'simulate.failed', exc_info=True, error=error_msg)
         return jsonify({"error": f"Simulation failed: {error_msg}"}), 500
 
+def _resolve_scenario(storage, data):
+    """Engine inputs for a validated payload: (crop_profile or None, terrain_modifiers, environment)"""
+    # Fetch crop profile (from storage or mock)
+    with time_stage('crop_lookup'):
+        crop_profile = resolve_crop(storage, data['crop'])
+    if not crop_profile:
+        return None, None, None
+    
+    # Fetch terrain modifiers (from storage or use defaults)
+    with time_stage('terrain_lookup'):
+        terrain_modifiers = resolve_terrain_modifiers(storage, data['terrain'])
+    
+    # Missing weather fields fall back to the long-term climatology for
+    # this location, or to fixed defaults when no grid covers it
+    with time_stage('climate_baseline'):
+        baseline = get_weather_service().get_climate_baseline(
+            data['location']['lat'], data['location']['lon']
+        )
+        environment = build_environment(data, baseline)
+    return crop_profile, terrain_modifiers, environment
+
+def _output_stages(fields):
+    """Optional stages a response needs: (explain, summary, persist)"""
+    if fields is None:
+        return True, SIMULATION_SUMMARIES, True
+    persist = 'simulation_id' in fields
+    # A persisted simulation stores its explanation and summary for history views
+    explain = persist or 'explanation' in fields
+    return explain, SIMULATION_SUMMARIES and persist, persist
+
+def _example_options(examples, fields):
+    """Example runs requested: (count, stratified)"""
+    if examples is None or (fields is not None and 'examples' not in fields):
+        return 0, False
+    if isinstance(examples, dict):
+        return examples.get('size', DEFAULT_EXAMPLE_RUNS), examples.get('stratify', False)
+    return examples, False
+
+def _project(result, fields, extra=()):
+    """Response payload limited to the requested fields (and any extra keys)"""
+    if fields is None:
+        return result
+    return {key: value for key, value in result.items() if key in fields or key in extra}
+
+def _request_deadline(deadline_ms):
+    """Wall-clock time by which the engine must finish, counted from request arrival"""
+    elapsed = time.perf_counter() - g.request_start
+    return time.time() - elapsed + (deadline_ms - DEADLINE_RESERVE_MS) / 1000
+
+def _choose_route(runs, engine_mode):
+    """Execution route for a simulation and its estimated engine seconds"""
+    estimated_seconds = estimate_seconds(runs, engine_mode, SCHEDULER_SECONDS_PER_RUN)
+    # Profiled requests run inline so the profiler sees the engine
+    if g.get('profiling') or SIMULATION_EXECUTION == 'inline':
+        return 'inline', estimated_seconds
+    if SIMULATION_EXECUTION == 'pool':
+        return 'pool', estimated_seconds
+    route = choose_route(estimated_seconds, SCHEDULER_INLINE_MAX_SECONDS, SCHEDULER_JOB_MIN_SECONDS)
+    if route == 'job' and not ASYNC_JOBS:
+        route = 'pool'
+    return route, estimated_seconds
+
+def _execute_simulation(
+    route, crop_profile, environment, terrain_modifiers, runs, engine_mode, trace_memory, deadline,
+    summary, explain, examples, stratify_examples
+):
+    """Run the engine on the process pool or the calling thread; returns (outcome, execution)"""
+    pool = get_simulation_pool() if route != 'inline' else None
+    if pool is not None:
+        outcome = pool.run(
+            crop_profile, environment, terrain_modifiers,
+            runs=runs, timeout=SIMULATION_TIMEOUT, summary=summary,
+            mode=engine_mode, trace_memory=trace_memory, deadline=deadline, explain=explain,
+            examples=examples, stratify_examples=stratify_examples
+        )
+        return outcome, 'pool'
+    outcome = run_simulation(
+        crop_profile, environment, terrain_modifiers, runs=runs, summary=summary,
+        mode=engine_mode, trace_memory=trace_memory, deadline=deadline, explain=explain,
+        examples=examples, stratify_examples=stratify_examples
+    )
+    return outcome, 'inline'
+
+def _simulation_result(outcome):
+    """Response payload of an engine outcome"""
+    yield_range = outcome['yield_range']
+    result = {
+        "success_probability": round(outcome['success_rate'], 3),
+        "expected_yield": round(outcome['avg_yield'], 2),
+        "risk_level": outcome['risk_level'],
+        "explanation": outcome['explanation'],
+        "is_override": outcome['is_override'],
+        "yield_range": {
+            "min": round(yield_range[0], 2),
+            "avg": round(yield_range[1], 2),
+            "max": round(yield_range[2], 2)
+        },
+        "simulation_runs": outcome['simulation_runs']
+    }
+    if outcome['intervals'] is not None:
+        intervals = outcome['intervals']
+        result['truncated'] = outcome['truncated']
+        result['confidence_interval'] = {
+            "success_probability": [round(bound, 3) for bound in intervals['success_probability']],
+            "expected_yield": [round(bound, 2) for bound in intervals['expected_yield']]
+        }
+    if outcome['examples'] is not None:
+        result['examples'] = outcome['examples']
+    return result
+
+def _complete_simulation(data, storage, environment, outcome, execution, persist=True):
+    """Record metrics, persist (unless skipped) and index a finished simulation; returns the response payload"""
+    observe_stages(outcome['timings'])
+    SIMULATIONS.inc(execution=execution)
+    SIMULATION_RUNS.inc(outcome['simulation_runs'])
+    memory = outcome['memory']
+    SIMULATION_MEMORY_DECISIONS.inc(decision=memory['mode'])
+    if memory['peak_bytes'] is not None:
+        SIMULATION_PEAK_MEMORY.observe(memory['peak_bytes'], mode=memory['mode'])
+        log_event(
+            logger, logging.INFO, 'simulate.memory', mode=memory['mode'], runs=outcome['simulation_runs'],
+            estimated_bytes=memory['estimated_bytes'], peak_bytes=memory['peak_bytes']
+        )
+    
+    result = _simulation_result(outcome)
+    success_rate = outcome['success_rate']
+    avg_yield = outcome['avg_yield']
+    risk_level = outcome['risk_level']
+    is_override = outcome['is_override']
+    explanation = outcome['explanation']
+    
+    if outcome['truncated']:
+        SIMULATIONS_TRUNCATED.inc()
+    
+    simulation_record = {
+        "crop_name": data['crop'],
+        "latitude": data['location']['lat'],
+        "longitude": data['location']['lon'],
+        "terrain": data['terrain'],
+        "avg_temp": environment['avg_temp'],
+        # The column is an INTEGER (mm); climatology means are fractional
+        "avg_rainfall": round(environment['avg_rainfall']),
+        "humidity": environment['humidity'],
+        "wind_speed": environment['wind_speed'],
+        "success_probability": success_rate,
+        "expected_yield": avg_yield,
+        "risk_level": risk_level,
+        "is_override": is_override,
+        "simulation_runs": outcome['simulation_runs'],
+        "explanation": explanation,
+        "summary": outcome['summary']
+    }
+    
+    # Resolve the index before persisting so a first-time warm load
+    # does not pick up this row without its result
+    index = spatial_index.get(timeout=0)
+    
+    # Save simulation (if storage available and the client wants it saved)
+    if storage and persist:
+        with time_stage('persist'):
+            try:
+                inserted = storage.insert_simulation(simulation_record)
+                simulation_record['id'] = inserted.get('id')
+                simulation_record['created_at'] = inserted.get('created_at')
+                result['simulation_id'] = simulation_record['id']
+            except Exception as e:
+                # Continue even if database save fails
+                log_event(logger, logging.WARNING, 'simulation.persist_failed', error=str(e)[:100])
+    
+    if index is not None:
+        # Only complete results may later be served in place of a new run:
+        # not those without an explanation or cut short by a deadline.
+        # Example runs are left out to keep index entries small.
+        complete = explanation is not None and not outcome['truncated']
+        indexed = {key: value for key, value in result.items() if key != 'examples'}
+        index.add(simulation_entry(
+            dict(simulation_record, elevation=environment['elevation']),
+            indexed if complete else None
+        ))
+    
+    return result
+
+def _run_simulation_job(data, storage, simulation, persist, fields):
+    """Job body: run the engine without holding an admission slot, then finish as usual"""
+    outcome, _ = _execute_simulation('pool', *simulation)
+    return _project(_complete_simulation(data, storage, simulation[1], outcome, 'job', persist), fields)
+
+def _job_payload(job):
+    payload = {key: job[key] for key in ('id', 'status', 'estimated_seconds') if key in job}
+    payload['status_url'] = f"/api/jobs/{job['id']}"
+    for key in ('result', 'error'):
+        if key in job:
+            payload[key] = job[key]
+    return payload
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of an asynchronous simulation job, with its result once done"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(_job_payload(job))
+
+# Inputs a what-if edit may change; the number of runs is fixed by the draws
+WHATIF_EDITABLE = ('crop', 'terrain', 'weather', 'location', 'elevation', 'fields', 'examples')
+
+@app.route('/api/whatif', methods=['POST'])
+def create_whatif_session():
+    """
+    Start a what-if session: simulate a scenario and keep its random draws.
+
+    Takes the /api/simulate payload (reuse and deadline_ms are ignored).
+    Edits sent to PATCH /api/whatif/<session_id> are re-scored against the
+    same draws, so answers differ only by the effect of the edit. What-if
+    results are not persisted.
+
+    Returns:
+        201 with session_id, expires_in (seconds) and the simulation result
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    data = {key: value for key, value in data.items() if key not in ('reuse', 'deadline_ms')}
+    validation_error = validate_input(data, max_runs=MAX_SIMULATION_RUNS)
+    if validation_error:
+        return jsonify({"error": validation_error}), 400
+
+    runs = data.get('runs', DEFAULT_SIMULATION_RUNS)
+    if choose_mode(runs, int(SIMULATION_MEMORY_BUDGET_MB * 2 ** 20), False) is None:
+        SIMULATION_MEMORY_DECISIONS.inc(decision='rejected')
+        return jsonify({
+            "error": f"{runs} runs are over the {SIMULATION_MEMORY_BUDGET_MB:g} MB simulation memory budget"
+        }), 422
+
+    scenario = _resolve_scenario(get_storage(), data)
+    if not scenario[0]:
+        return jsonify({"error": f"Crop '{data['crop']}' not found"}), 404
+
+    client = request.headers.get('X-Client-Id') or request.remote_addr or ''
+    try:
+        with admission.slot(client) as waited:
+            ADMISSION_WAIT.observe(waited)
+            draws = RunDraws.sample(runs)
+            result = _score_whatif(scenario, data, draws)
+    except AdmissionRejected as e:
+        return _whatif_rejected(e, client)
+
+    session = whatif_sessions.create(data, draws)
+    log_event(logger, logging.INFO, 'whatif.created', session_id=session['id'], runs=runs)
+    response = jsonify(dict(result, session_id=session['id'], expires_in=round(WHATIF_SESSION_TTL)))
+    response.headers['Location'] = f"/api/whatif/{session['id']}"
+    return response, 201
+
+@app.route('/api/whatif/<session_id>', methods=['PATCH'])
+def edit_whatif_session(session_id):
+    """
+    Apply an edit to a what-if session and re-score its draws.
+
+    The body holds the inputs to change (see WHATIF_EDITABLE); weather
+    fields are merged into the current weather, other inputs replaced.
+
+    Returns:
+        The simulation result for the edited inputs, 404 for an unknown or
+        expired session
+    """
+    session = whatif_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "What-if session not found"}), 404
+    edits = request.get_json(silent=True)
+    if not isinstance(edits, dict) or not edits:
+        return jsonify({"error": "Request body must be a non-empty JSON object"}), 400
+    fixed = sorted(key for key in edits if key not in WHATIF_EDITABLE)
+    if fixed:
+        return jsonify({"error": f"Cannot edit in a what-if session: {', '.join(fixed)}"}), 400
+
+    data = dict(session['inputs'])
+    for key, value in edits.items():
+        if key == 'weather' and isinstance(value, dict) and isinstance(data.get('weather'), dict):
+            data['weather'] = dict(data['weather'], **value)
+        else:
+            data[key] = value
+    validation_error = validate_input(data, max_runs=MAX_SIMULATION_RUNS)
+    if validation_error:
+        return jsonify({"error": validation_error}), 400
+
+    scenario = _resolve_scenario(get_storage(), data)
+    if not scenario[0]:
+        return jsonify({"error": f"Crop '{data['crop']}' not found"}), 404
+
+    client = request.headers.get('X-Client-Id') or request.remote_addr or ''
+    try:
+        with admission.slot(client) as waited:
+            ADMISSION_WAIT.observe(waited)
+            result = _score_whatif(scenario, data, session['draws'])
+    except AdmissionRejected as e:
+        return _whatif_rejected(e, client)
+
+    if not whatif_sessions.update(session_id, data):
+        # Evicted while re-scoring; the answer is still valid
+        log_event(logger, logging.INFO, 'whatif.evicted', session_id=session_id)
+    return jsonify(dict(result, session_id=session_id, expires_in=round(WHATIF_SESSION_TTL)))
+
+@app.route('/api/whatif/<session_id>', methods=['DELETE'])
+def delete_whatif_session(session_id):
+    """End a what-if session and release its draws"""
+    if not whatif_sessions.delete(session_id):
+        return jsonify({"error": "What-if session not found"}), 404
+    return '', 204
+
+def _score_whatif(scenario, data, draws):
+    """Run the engine over a session's draws for the given inputs; returns the projected result"""
+    crop_profile, terrain_modifiers, environment = scenario
+    fields = data.get('fields')
+    example_runs, stratify_examples = _example_options(data.get('examples'), fields)
+    # Sessions are checked against the budget when created
+    engine_mode = choose_mode(len(draws), int(SIMULATION_MEMORY_BUDGET_MB * 2 ** 20), False) or 'streaming'
+    outcome = run_simulation(
+        crop_profile, environment, terrain_modifiers, mode=engine_mode,
+        explain=fields is None or 'explanation' in fields,
+        examples=example_runs, stratify_examples=stratify_examples, draws=draws
+    )
+    observe_stages(outcome['timings'])
+    SIMULATIONS.inc(execution='whatif')
+    SIMULATION_RUNS.inc(outcome['simulation_runs'])
+    return _project(_simulation_result(outcome), fields)
+
+def _whatif_rejected(error, client):
+    ADMISSION_REJECTIONS.inc(reason=error.reason)
+    log_event(logger, logging.INFO, 'whatif.rejected', reason=error.reason, client=client)
+    response = jsonify({"error": "Too many simulations in progress, please retry shortly"})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+def _find_reusable_simulation(data, environment, runs):
+    """Recent nearby simulation with matching inputs and at least as many runs, as a response payload, or None"""
+    index = spatial_index.get(timeout=0)
+    if index is None:
+        return None
+    
+    options = data['reuse'] if isinstance(data['reuse'], dict) else {}
+    radius_km = float(options.get('radius_km', REUSE_RADIUS_KM))
+    max_age_hours = float(options.get('max_age_hours', REUSE_MAX_AGE_HOURS))
+    
+    matches = index.nearest(
+        environment['latitude'], environment['longitude'], data['crop'], data['terrain'],
+        k=1, max_distance_km=radius_km, max_age_seconds=max_age_hours * 3600,
+        predicate=lambda entry: can_reuse(entry, environment, runs)
+    )
+    if not matches:
+        return None
+    
+    distance_km, entry = matches[0]
+    reused = dict(entry['result'])
+    reused['reused'] = True
+    reused['reused_from'] = {
+        key: value for key, value in entry_to_json(entry, distance_km).items()
+        if key in ('id', 'latitude', 'longitude', 'distance_km', 'created_at')
+    }
+    return reused
+
+@app.route('/api/simulations/nearby', methods=['GET'])
+def get_nearby_simulations():
+    """
+    Past simulations of a crop and terrain nearest to a location.
+    
+    Query parameters: lat, lon, crop, terrain (required); k (default 5,
+    max 50); radius_km and max_age_hours (optional).
+    """
+    try:
+        lat = float(request.args['lat'])
+        lon = float(request.args['lon'])
+        crop = request.args['crop']
+        terrain = request.args['terrain']
+        k = min(int(request.args.get('k', 5)), 50)
+        radius_km = request.args.get('radius_km', type=float)
+        max_age_hours = request.args.get('max_age_hours', type=float)
+    except (KeyError, ValueError):
+        return jsonify({"error": "lat, lon, crop and terrain are required; k must be an integer"}), 400
+    
+    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180) or k < 1:
+        return jsonify({"error": "Invalid coordinates or k"}), 400
+    
+    index = spatial_index.get()
+    if index is None:
+        return jsonify([])
+    
+    matches = index.nearest(
+        lat, lon, crop, terrain, k=k, max_distance_km=radius_km,
+        max_age_seconds=max_age_hours * 3600 if max_age_hours is not None else None
+    )
+    return jsonify([entry_to_json(entry, distance) for distance, entry in matches])
+
 @app.route('/api/simulations/history', methods=['GET'])
 def get_simulation_history():
-    """Fetch simulation history"""
+    """
+    Fetch simulation history, newest first.
+    
+    Pages are addressed with a keyset cursor: the response body is the list of
+    rows and the X-Next-Cursor header (plus a Link rel="next") points at the
+    following page. See utils.history_query for filters and projection.
+    """
+    query, error = parse_history_query(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    rows, next_cursor = [], None
+    try:
+        storage = get_storage()
+        if storage:
+            rows, next_cursor = paginate(storage.list_simulations(query), query['limit'])
+    except Exception as e:
+        log_event(logger, logging.WARNING, 'history.query_failed', error=str(e)[:100])
+    
+    # Empty list in mock mode
+    response = jsonify(rows)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        next_args = request.args.to_dict()
+        next_args['cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(next_args)}>; rel="next"'
+    return response
+
+def _storage_unavailable(error):
+    """503 for a storage call refused by the open circuit breaker or timed out"""
+    log_event(logger, logging.WARNING, 'storage.unavailable', error=str(error))
+    response = jsonify({"error": "Simulation storage unavailable, please retry shortly"})
+    response.headers['Retry-After'] = str(max(1, round(STORAGE_BREAKER_RESET_SECONDS)))
+    return response, 503
+
+def _export_response(batches, columns, export_format, filename):
+    """Stream encoded batches as a file download"""
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = Response(
+        stream_with_context(encode(batches, columns, export_format)),
+        content_type=content_type
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+@app.route('/api/simulations/export', methods=['GET'])
+def export_simulations():
+    """
+    Stream stored simulations as CSV, Arrow IPC or Parquet.
+    
+    Query parameters: format (csv, arrow, parquet; default csv), columns
+    (comma-separated projection) and the history filters (crop, terrain,
+    risk_level, created_from, created_to, lat/lon bounds). Rows are read in
+    keyset-paged batches, so memory use does not grow with the export size.
+    """
+    query, error = parse_history_query({k: v for k, v in request.args.items() if k != 'columns'})
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        export_format = check_format(request.args.get('format'))
+        columns = resolve_columns(request.args.get('columns'), HISTORY_COLUMNS)
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    storage = get_storage()
+    if not storage:
+        return jsonify({"error": "Simulation storage unavailable"}), 503
+    
+    query['columns'] = columns
+    batches = iter_simulation_batches(storage, query)
+    # Read the first page before streaming so an unavailable store is a 503
+    # rather than a broken download
+    try:
+        first = next(batches, None)
+    except StorageUnavailableError as e:
+        return _storage_unavailable(e)
+    if first is not None:
+        batches = itertools.chain([first], batches)
+    return _export_response(batches, columns, export_format, 'simulations')
+
+@app.route('/api/simulations/<simulation_id>/runs', methods=['GET'])
+def export_simulation_runs(simulation_id):
+    """
+    Stream the raw per-run results of a stored simulation.
+    
+    Runs are regenerated from the stored seed and inputs rather than stored.
+    Query parameters: format (csv, arrow, parquet; default csv) and columns
+    (subset of run, success, yield, temp, rainfall, humidity, had_pest,
+    had_disease, had_extreme_weather, limiting_factors).
+    """
+    try:
+        export_format = check_format(request.args.get('format'))
+        columns = resolve_columns(request.args.get('columns'), RUN_COLUMNS)
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    storage = get_storage()
+    if not storage:
+        return jsonify({"error": "Simulation storage unavailable"}), 503
+    try:
+        simulation = storage.get_simulation(simulation_id)
+    except StorageUnavailableError as e:
+        return _storage_unavailable(e)
+    if not simulation:
+        return jsonify({"error": "Simulation not found"}), 404
+    
+    crop_profile = resolve_crop(storage, simulation['crop_name'])
+    if not crop_profile:
+        return jsonify({"error": "Crop not found"}), 404
+    try:
+        simulator = build_run_simulator(
+            simulation, crop_profile, resolve_terrain_modifiers(storage, simulation['terrain'])
+        )
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 409
+    
+    return _export_response(
+        iter_run_batches(simulator), columns, export_format, f'simulation-{simulation_id}-runs'
+    )
+
+@app.route('/api/simulations/compare', methods=['GET'])
+def compare_simulations():
+    """
+    Compare stored simulations from their distribution summaries.
+    
+    Query parameters: ids (comma-separated, 2 to 10). The first id is the
+    reference; each other simulation is compared against it.
+    """
+    ids = [i.strip() for i in request.args.get('ids', '').split(',') if i.strip()]
+    ids = list(dict.fromkeys(ids))
+    if not (2 <= len(ids) <= MAX_COMPARE_SIMULATIONS):
+        return jsonify({"error": f"Provide between 2 and {MAX_COMPARE_SIMULATIONS} simulation ids"}), 400
+    
+    storage = get_storage()
+    if not storage:
+        return jsonify({"error": "Simulation storage unavailable"}), 503
+    
     try:
-        if supabase:
-            limit = int(request.args.get('limit', 50))
-            response = supabase.table('simulations').select('*').order(
-                'created_at', desc=True
-            ).limit(limit).execute()
-            return jsonify(response.data)
-    except:
-        pass
-    
-    # Return empty list in mock mode
-    return jsonify([])
+        rows = {row['id']: row for row in storage.get_simulations(ids)}
+    except StorageUnavailableError as e:
+        return _storage_unavailable(e)
+    missing = [i for i in ids if i not in rows]
+    if missing:
+        return jsonify({"error": f"Simulations not found: {', '.join(missing)}"}), 404
+    without_summary = [i for i in ids if not (rows[i].get('summary') or {}).get('runs')]
+    if without_summary:
+        return jsonify({"error": f"Simulations have no stored summary: {', '.join(without_summary)}"}), 422
+    
+    base = rows[ids[0]]['summary']
+    return jsonify({
+        "simulations": [
+            {key: rows[i].get(key) for key in ('id', 'crop_name', 'terrain', 'latitude', 'longitude', 'created_at', 'summary')}
+            for i in ids
+        ],
+        "comparisons": [
+            dict(compare_summaries(base, rows[i]['summary']), id=i) for i in ids[1:]
+        ]
+    })
+
+@app.route('/api/simulations/<simulation_id>', methods=['GET'])
+def get_simulation(simulation_id):
+    """Fetch one stored simulation, including its distribution summary"""
+    storage = get_storage()
+    if not storage:
+        return jsonify({"error": "Simulation storage unavailable"}), 503
+    
+    try:
+        simulation = storage.get_simulation(simulation_id)
+    except StorageUnavailableError as e:
+        return _storage_unavailable(e)
+    except Exception as e:
+        log_event(logger, logging.WARNING, 'simulation.query_failed', error=str(e)[:100])
+        simulation = None
+    if not simulation:
+        return jsonify({"error": "Simulation not found"}), 404
+    return jsonify(simulation)
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """
+    Average success probability, yield and risk mix per group.
+    
+    Served from incrementally maintained rollups (week x crop x terrain x
+    region cell), so the cost scales with the number of groups rather than
+    the number of simulations. See utils.rollups for parameters. A query
+    with more than MAX_ANALYTICS_GROUPS groups gets a 422.
+    """
+    query, error = parse_analytics_query(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    rows = []
+    try:
+        storage = get_storage()
+        if storage:
+            rows = storage.list_rollups(query)
+    except TooManyGroupsError as e:
+        return jsonify({"error": str(e)}), 422
+    except Exception as e:
+        log_event(logger, logging.WARNING, 'analytics.query_failed', error=str(e)[:100])
+    
+    # Empty list in mock mode
+    return jsonify(aggregate(rows, query['group_by']))
+
+@app.route('/api/simulations/<simulation_id>/feedback', methods=['POST'])
+def submit_feedback(simulation_id):
+    """
+    Record user feedback on a simulation.
+    Expected payload:
+    {
+        "accuracy_rating": 4,
+        "actual_yield": 5200,
+        "comments": "..."
+    }
+    """
+    data = request.get_json(silent=True)
+    validation_error = validate_feedback(data)
+    if validation_error:
+        return jsonify({"error": validation_error}), 400
+    
+    storage = get_storage()
+    if not storage:
+        return jsonify({"error": "Feedback storage unavailable"}), 503
+    
+    try:
+        feedback = storage.insert_feedback({
+            "simulation_id": simulation_id,
+            "accuracy_rating": data.get('accuracy_rating'),
+            "actual_yield": data.get('actual_yield'),
+            "comments": data.get('comments')
+        })
+    except Exception as e:
+        log_event(logger, logging.WARNING, 'feedback.insert_failed', error=str(e)[:100])
+        return jsonify({"error": "Failed to save feedback"}), 500
+    return jsonify(feedback), 201
 
 if __name__ == '__main__':
-    app.run(debug=False, host='0.0.0.0', port=5000, use_reloader=False)
\ No newline at end of file
+    app.run(debug=False, host='0.0.0.0', port=5000, use_reloader=False, threaded=True)
\ No newline at end of file
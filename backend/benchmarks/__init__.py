@@ -0,0 +1,11 @@
+"""
+Performance benchmarks for the simulation engine and API.
+
+Modules:
+    runner: Timing, JSON baselines and regression comparison
+    cases: Benchmark cases (engine, scoring, explanation, /api/simulate)
+    stubs: In-process Supabase and HTTP weather stand-ins
+    loadtest: Multi-process load generator with latency and resource reports
+
+Run with tools/benchmark.py and tools/loadtest.py.
+"""
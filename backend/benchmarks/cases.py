@@ -0,0 +1,175 @@
+"""
+Benchmark cases.
+
+Engine cases use fixed seeds and built-in crop profiles, so they need no
+storage or network. The /api/simulate cases run the Flask app through its
+test client against an in-memory SQLite store (standing in for Supabase)
+with no weather API key and no climatology grid, so weather never leaves
+the process.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from engine import (
+    MonteCarloSimulator, PenaltyEngine, compute_metrics, calculate_risk_level,
+    generate_explanation, run_simulation
+)
+from engine.scoring import analyze_failure_patterns
+from utils.reference_data import MOCK_CROPS, find_crop, default_terrain_modifiers
+
+from .runner import Case
+
+RUN_COUNTS = (1000, 10000)
+
+# (crop, terrain, environment) fixtures covering the main engine paths
+SCENARIOS = {
+    'rice-favorable': ('Rice', 'plain', {'avg_temp': 27, 'avg_rainfall': 1500, 'humidity': 75, 'wind_speed': 8}),
+    'wheat-stressed': ('Wheat', 'mountain', {'avg_temp': 31, 'avg_rainfall': 1300, 'humidity': 85, 'wind_speed': 25}),
+    'rice-mismatch': ('Rice', 'coastal', {'avg_temp': 8, 'avg_rainfall': 300, 'humidity': 30, 'wind_speed': 12}),
+}
+
+SEED = 20240501
+
+
+def _inputs(scenario: str):
+    crop_name, terrain, weather = SCENARIOS[scenario]
+    environment = dict(weather, elevation=100, terrain=terrain, latitude=13.08, longitude=80.27)
+    return find_crop(MOCK_CROPS, crop_name), environment, default_terrain_modifiers(terrain)
+
+
+def _simulator(scenario: str, runs: int) -> MonteCarloSimulator:
+    crop_profile, environment, terrain_modifiers = _inputs(scenario)
+    return MonteCarloSimulator(
+        crop_profile=crop_profile,
+        environment=environment,
+        penalty_engine=PenaltyEngine(crop_profile, environment, terrain_modifiers),
+        runs=runs,
+        seed=SEED
+    )
+
+
+def _results(scenario: str, runs: int = 10000) -> List[Dict]:
+    return _simulator(scenario, runs).run()
+
+
+# ============================================
+# Engine cases
+# ============================================
+
+def simulator_case(scenario: str, runs: int) -> Case:
+    def setup():
+        return _simulator(scenario, runs).run
+    return Case(f"simulator.run[{scenario}-{runs}]", setup)
+
+
+def pipeline_case(scenario: str, runs: int) -> Case:
+    # The whole engine as /api/simulate runs it (scheduler calibration)
+    def setup():
+        crop_profile, environment, terrain_modifiers = _inputs(scenario)
+        return lambda: run_simulation(crop_profile, environment, terrain_modifiers, runs, seed=SEED, summary=True)
+    return Case(f"pipeline.run_simulation[{scenario}-{runs}]", setup)
+
+
+def compute_metrics_case(scenario: str) -> Case:
+    def setup():
+        results = _results(scenario)
+        return lambda: compute_metrics(results)
+    return Case(f"scoring.compute_metrics[{scenario}]", setup)
+
+
+def risk_level_case(scenario: str) -> Case:
+    def setup():
+        results = _results(scenario)
+        yields = [r['yield'] for r in results]
+        avg_yield = sum(yields) / len(yields)
+        yield_std = (sum((y - avg_yield) ** 2 for y in yields) / len(yields)) ** 0.5
+        success_rate = sum(1 for r in results if r['success']) / len(results)
+        return lambda: calculate_risk_level(success_rate, yield_std, avg_yield, results)
+    return Case(f"scoring.calculate_risk_level[{scenario}]", setup)
+
+
+def failure_patterns_case(scenario: str) -> Case:
+    def setup():
+        results = _results(scenario)
+        return lambda: analyze_failure_patterns(results)
+    return Case(f"scoring.analyze_failure_patterns[{scenario}]", setup)
+
+
+def explanation_case(scenario: str) -> Case:
+    def setup():
+        crop_profile, environment, terrain_modifiers = _inputs(scenario)
+        is_override = PenaltyEngine(crop_profile, environment, terrain_modifiers).check_compatibility()
+        results = _results(scenario)
+        return lambda: generate_explanation(results, crop_profile, environment, is_override)
+    return Case(f"explainability.generate_explanation[{scenario}]", setup)
+
+
+# ============================================
+# API cases
+# ============================================
+
+_client = None
+
+
+def _api_client():
+    """Flask test client with in-memory storage and offline weather"""
+    global _client
+    if _client is None:
+        os.environ.update({
+            'STORAGE_BACKEND': 'sqlite',
+            'SQLITE_PATH': ':memory:',
+            'BACKGROUND_INIT': 'false',
+            'WEATHER_API_KEY': '',
+            'CLIMATOLOGY_PATH': '',
+            'SIMULATION_EXECUTION': 'inline',
+        })
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        import app as api
+        _client = api.app.test_client()
+    return _client
+
+
+def api_simulate_case(scenario: str, with_weather: bool = True) -> Case:
+    crop_name, terrain, weather = SCENARIOS[scenario]
+    payload = {'crop': crop_name, 'terrain': terrain, 'location': {'lat': 13.08, 'lon': 80.27}}
+    if with_weather:
+        payload['weather'] = {
+            'temp': weather['avg_temp'], 'rainfall': weather['avg_rainfall'],
+            'humidity': weather['humidity'], 'wind': weather['wind_speed']
+        }
+
+    def setup():
+        client = _api_client()
+
+        def call():
+            response = client.post('/api/simulate', json=payload)
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/simulate returned {response.status_code}: {response.get_data(as_text=True)}")
+        return call
+
+    suffix = '' if with_weather else '-defaults'
+    return Case(f"api.simulate[{scenario}{suffix}]", setup)
+
+
+def all_cases() -> List[Case]:
+    cases = [simulator_case(scenario, runs) for scenario in SCENARIOS for runs in RUN_COUNTS]
+    cases.extend(pipeline_case(scenario, runs) for scenario in SCENARIOS for runs in RUN_COUNTS)
+    for scenario in SCENARIOS:
+        cases.extend([
+            compute_metrics_case(scenario),
+            risk_level_case(scenario),
+            failure_patterns_case(scenario),
+            explanation_case(scenario),
+        ])
+    cases.append(api_simulate_case('rice-favorable'))
+    cases.append(api_simulate_case('wheat-stressed', with_weather=False))
+    return cases
+
+
+def select_cases(patterns: Optional[List[str]] = None) -> List[Case]:
+    """Cases whose name contains any of the patterns (all if none given)"""
+    cases = all_cases()
+    if not patterns:
+        return cases
+    return [case for case in cases if any(pattern in case.name for pattern in patterns)]
@@ -0,0 +1,434 @@
+"""
+Local load-testing harness.
+
+start_workers() launches the API in several worker processes, each on its
+own port, with the in-process Supabase stand-in and WeatherService pointed
+at the weather stub (see benchmarks.stubs). run_load() replays a weighted
+mix of crops, weather, simulate and history requests against them, either
+closed-loop (a fixed number of concurrent clients) or open-loop (a target
+request rate, with latency measured from each request's scheduled start so
+a slow server cannot hide queueing delay). Worker CPU and memory are
+sampled from /proc while the load runs.
+"""
+
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+ENDPOINTS = ('crops', 'weather', 'simulate', 'history')
+DEFAULT_MIX = {'crops': 2, 'weather': 2, 'simulate': 4, 'history': 2}
+
+CROP_NAMES = ('Wheat', 'Rice', 'Corn', 'Soybean')
+TERRAINS = ('plain', 'plateau', 'mountain', 'valley', 'coastal')
+
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a request mix such as "crops=1,weather=1,simulate=3,history=1".
+
+    Raises:
+        ValueError: for unknown endpoints or non-positive total weight
+    """
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Mix weights must add up to more than zero")
+    return mix
+
+
+# ============================================
+# Request generation
+# ============================================
+
+def _location(rng: random.Random) -> Dict:
+    return {'lat': round(rng.uniform(8, 32), 4), 'lon': round(rng.uniform(68, 92), 4)}
+
+
+def build_request(endpoint: str, rng: random.Random) -> Tuple[str, str, Optional[Dict], Optional[Dict]]:
+    """
+    One request for an endpoint.
+
+    Returns:
+        (method, path, query params, JSON body)
+    """
+    if endpoint == 'crops':
+        return 'GET', '/api/crops', None, None
+    if endpoint == 'weather':
+        return 'GET', '/api/weather', _location(rng), None
+    if endpoint == 'history':
+        params = {'limit': 20}
+        if rng.random() < 0.5:
+            params['crop'] = rng.choice(CROP_NAMES)
+        return 'GET', '/api/simulations/history', params, None
+
+    payload = {
+        'crop': rng.choice(CROP_NAMES),
+        'terrain': rng.choice(TERRAINS),
+        'location': _location(rng),
+    }
+    if rng.random() < 0.7:
+        payload['weather'] = {
+            'temp': round(rng.uniform(12, 36), 1),
+            'rainfall': round(rng.uniform(300, 2200)),
+            'humidity': round(rng.uniform(30, 95)),
+            'wind': round(rng.uniform(2, 30), 1),
+        }
+    return 'POST', '/api/simulate', None, payload
+
+
+# ============================================
+# Workers
+# ============================================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _serve_worker(port: int, env: Dict[str, str], storage_latency: float):
+    """Worker process: API server backed by the Supabase stand-in"""
+    import logging
+    os.environ.update(env)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    import storage
+    from storage import SupabaseStorage
+    from benchmarks.stubs import FakeSupabaseClient
+    client = FakeSupabaseClient(latency=storage_latency)
+    storage.connect_supabase = lambda url=None, key=None: SupabaseStorage(client)
+
+    from werkzeug.serving import make_server
+    import app as api
+    # Spawned processes skip the app's background start-up; initialize
+    # before serving so measurements do not include start-up work
+    api._initialize_subsystems()
+    make_server('127.0.0.1', port, api.app, threaded=True).serve_forever()
+
+
+class Worker:
+    def __init__(self, process: multiprocessing.Process, url: str):
+        self.process = process
+        self.url = url
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+
+def start_workers(
+    count: int,
+    weather_url: str,
+    env: Optional[Dict[str, str]] = None,
+    storage_latency: float = 0.0,
+    ready_timeout: float = 60.0
+) -> List[Worker]:
+    """
+    Start API worker processes and wait until each reports ready.
+
+    Args:
+        count: Number of worker processes
+        weather_url: Weather stub URL (WEATHER_API_URL)
+        env: Extra environment for the workers (e.g. SIMULATION_EXECUTION)
+        storage_latency: Seconds added to every Supabase stand-in query
+        ready_timeout: Seconds to wait for /health/ready
+
+    Raises:
+        RuntimeError: if a worker exits or does not become ready in time
+    """
+    worker_env = {
+        'STORAGE_BACKEND': 'supabase',
+        'WEATHER_API_KEY': 'stub',
+        'WEATHER_API_URL': weather_url,
+        'CLIMATOLOGY_PATH': '',
+        'LOG_LEVEL': 'WARNING',
+    }
+    worker_env.update(env or {})
+
+    context = multiprocessing.get_context('spawn')
+    workers = []
+    for _ in range(count):
+        port = _free_port()
+        # Not daemonic: a worker may start its own simulation pool processes
+        process = context.Process(target=_serve_worker, args=(port, worker_env, storage_latency))
+        process.start()
+        workers.append(Worker(process, f"http://127.0.0.1:{port}"))
+
+    deadline = time.monotonic() + ready_timeout
+    for worker in workers:
+        while True:
+            if not worker.process.is_alive():
+                stop_workers(workers)
+                raise RuntimeError(f"Worker {worker.pid} exited during start-up")
+            try:
+                if requests.get(f"{worker.url}/health/ready", timeout=1).status_code == 200:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                stop_workers(workers)
+                raise RuntimeError(f"Worker {worker.pid} not ready after {ready_timeout}s")
+            time.sleep(0.1)
+    return workers
+
+
+def stop_workers(workers: List[Worker]):
+    for worker in workers:
+        if worker.process.is_alive():
+            worker.process.terminate()
+    for worker in workers:
+        worker.process.join(timeout=5)
+
+
+# ============================================
+# Resource sampling
+# ============================================
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def process_usage(pid: int) -> Optional[Tuple[float, int]]:
+    """(CPU seconds, resident bytes) of a process from /proc, or None"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    # utime and stime are fields 14 and 15 of stat (11 and 12 after the command)
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    return cpu_seconds, resident_pages * _PAGE_SIZE
+
+
+class ResourceMonitor:
+    """Samples CPU and memory of worker processes on a background thread"""
+
+    def __init__(self, pids: List[int], interval: float = 0.5):
+        self.pids = pids
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='resource-monitor', daemon=True)
+        self._start: Dict[int, Tuple[float, float]] = {}
+        self._peak_rss: Dict[int, int] = {}
+        self._last: Dict[int, Tuple[float, int]] = {}
+
+    def start(self):
+        now = time.perf_counter()
+        for pid in self.pids:
+            usage = process_usage(pid)
+            if usage:
+                self._start[pid] = (now, usage[0])
+                self._record(pid, usage)
+        self._thread.start()
+        return self
+
+    def _record(self, pid: int, usage: Tuple[float, int]):
+        self._last[pid] = usage
+        self._peak_rss[pid] = max(self._peak_rss.get(pid, 0), usage[1])
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for pid in self.pids:
+                usage = process_usage(pid)
+                if usage:
+                    self._record(pid, usage)
+
+    def stop(self) -> List[Dict]:
+        """Stop sampling and return per-worker CPU % and RSS"""
+        self._stop.set()
+        self._thread.join()
+        now = time.perf_counter()
+        report = []
+        for pid in self.pids:
+            usage = process_usage(pid) or self._last.get(pid)
+            if pid not in self._start or usage is None:
+                report.append({'pid': pid, 'cpu_percent': None, 'rss_mb': None, 'peak_rss_mb': None})
+                continue
+            self._record(pid, usage)
+            started, cpu_start = self._start[pid]
+            report.append({
+                'pid': pid,
+                'cpu_seconds': round(usage[0] - cpu_start, 2),
+                'cpu_percent': round((usage[0] - cpu_start) / max(now - started, 1e-9) * 100, 1),
+                'rss_mb': round(usage[1] / 2 ** 20, 1),
+                'peak_rss_mb': round(self._peak_rss[pid] / 2 ** 20, 1),
+            })
+        return report
+
+
+# ============================================
+# Load generation
+# ============================================
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of pre-sorted values"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize_samples(samples: List[Tuple[str, float, bool]], duration: float) -> Dict:
+    """
+    Throughput, latency percentiles and error rate, overall and per endpoint.
+
+    Args:
+        samples: (endpoint, latency seconds, ok) per request
+        duration: Measurement window in seconds
+    """
+    def stats(entries):
+        latencies = sorted(latency for _, latency, _ in entries)
+        errors = sum(1 for _, _, ok in entries if not ok)
+        result = {
+            'requests': len(entries),
+            'throughput_rps': round(len(entries) / duration, 2) if duration else None,
+            'error_rate': round(errors / len(entries), 4) if entries else None,
+        }
+        for p in PERCENTILES:
+            value = percentile(latencies, p)
+            result[f'p{p}_ms'] = round(value * 1000, 2) if value is not None else None
+        result['max_ms'] = round(latencies[-1] * 1000, 2) if latencies else None
+        return result
+
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[0], []).append(sample)
+    return {
+        'overall': stats(samples),
+        'endpoints': {endpoint: stats(entries) for endpoint, entries in sorted(by_endpoint.items())},
+    }
+
+
+def run_load(
+    urls: List[str],
+    mix: Dict[str, float],
+    duration: float,
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    warmup: float = 0.0,
+    timeout: float = 30.0,
+    seed: Optional[int] = None,
+    on_tick: Optional[Callable[[int], None]] = None
+) -> Dict:
+    """
+    Send a weighted request mix to the workers.
+
+    Args:
+        urls: Worker base URLs (requests are spread round-robin)
+        mix: Endpoint weights (see parse_mix)
+        duration: Measured seconds
+        concurrency: Closed-loop clients, or the in-flight cap with rate
+        rate: Open-loop target requests per second (None for closed loop)
+        warmup: Seconds of load before measurement starts
+        timeout: Per-request timeout in seconds
+        seed: Seed for the request mix
+        on_tick: Optional callback(completed requests) once per second
+
+    Returns:
+        summarize_samples() output plus mode, duration and dropped count
+        (open-loop requests that could not start because all clients were busy)
+    """
+    endpoints = list(mix)
+    weights = [mix[endpoint] for endpoint in endpoints]
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    local = threading.local()
+    counter = iter(range(1 << 62))
+    samples: List[Tuple[str, float, bool]] = []
+    samples_lock = threading.Lock()
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def next_request():
+        with rng_lock:
+            endpoint = rng.choices(endpoints, weights)[0]
+            return endpoint, build_request(endpoint, rng), urls[next(counter) % len(urls)]
+
+    def send(scheduled: Optional[float] = None):
+        endpoint, (method, path, params, body), base_url = next_request()
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        began = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, params=params, json=body, timeout=timeout)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        finished = time.perf_counter()
+        origin = scheduled if scheduled is not None else began
+        if origin >= measure_from and finished <= stop_at + timeout:
+            with samples_lock:
+                samples.append((endpoint, finished - origin, ok))
+
+    dropped = 0
+    ticker_stop = threading.Event()
+    if on_tick:
+        def tick():
+            while not ticker_stop.wait(1.0):
+                on_tick(len(samples))
+        threading.Thread(target=tick, daemon=True).start()
+
+    try:
+        if rate is None:
+            def client():
+                while time.perf_counter() < stop_at:
+                    send()
+            threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            in_flight = threading.BoundedSemaphore(concurrency)
+            interval = 1.0 / rate
+
+            def release_after(scheduled):
+                try:
+                    send(scheduled)
+                finally:
+                    in_flight.release()
+
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                scheduled = start
+                while scheduled < stop_at:
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    if in_flight.acquire(blocking=False):
+                        executor.submit(release_after, scheduled)
+                    elif scheduled >= measure_from:
+                        dropped += 1
+                    scheduled += interval
+    finally:
+        ticker_stop.set()
+
+    report = summarize_samples(samples, duration)
+    report.update({
+        'mode': 'open' if rate is not None else 'closed',
+        'rate': rate,
+        'concurrency': concurrency,
+        'duration_s': duration,
+        'dropped': dropped,
+    })
+    return report
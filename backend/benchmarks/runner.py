@@ -0,0 +1,206 @@
+"""
+Benchmark timing, JSON baselines and regression comparison.
+
+Each case is timed in several samples; a sample calls the case enough times
+to last at least `min_time` seconds, and per-call times are reported. The
+median per-call time is what baselines are compared on, with the spread of
+the samples kept for judging noise.
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+BASELINE_FORMAT = 1
+
+# A case whose median grows by more than this fraction is a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+class Case:
+    """
+    A named benchmark.
+
+    `setup` builds the state once and returns the zero-argument callable that
+    is timed, so fixtures (e.g. simulation results) stay out of the timings.
+    """
+
+    def __init__(self, name: str, setup: Callable[[], Callable[[], object]], group: str = ''):
+        self.name = name
+        self.setup = setup
+        self.group = group or name.split('.')[0]
+
+
+def time_case(case: Case, repeat: int = 5, min_time: float = 0.2) -> Dict:
+    """
+    Time one case.
+
+    Args:
+        case: Benchmark case
+        repeat: Number of samples
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Per-call timings in seconds (median, mean, min, max, stdev) and the
+        number of calls per sample
+    """
+    fn = case.setup()
+    fn()  # warm-up
+
+    # Calibrate calls per sample so one sample lasts at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'number': number,
+        'repeat': len(samples),
+    }
+
+
+def environment_info() -> Dict:
+    """Machine and interpreter details stored with a baseline"""
+    from engine import __version__
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'engine_version': __version__,
+    }
+
+
+def run_cases(
+    cases: Iterable[Case],
+    repeat: int = 5,
+    min_time: float = 0.2,
+    report: Optional[Callable[[str, Dict], None]] = None
+) -> Dict:
+    """
+    Time every case.
+
+    Args:
+        cases: Cases to run
+        repeat: Samples per case
+        min_time: Minimum sample duration in seconds
+        report: Optional callback(name, timing) after each case
+
+    Returns:
+        Baseline document: format, created_at, environment and results
+    """
+    results = {}
+    for case in cases:
+        results[case.name] = time_case(case, repeat, min_time)
+        if report:
+            report(case.name, results[case.name])
+    return {
+        'format': BASELINE_FORMAT,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment_info(),
+        'results': results,
+    }
+
+
+def save_baseline(document: Dict, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_baseline(path: str) -> Dict:
+    """
+    Raises:
+        ValueError: if the file is not a benchmark baseline
+    """
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    if document.get('format') != BASELINE_FORMAT or 'results' not in document:
+        raise ValueError(f"Not a benchmark baseline: {path}")
+    return document
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare two benchmark documents case by case.
+
+    Args:
+        baseline: Reference document
+        current: New document
+        threshold: Relative change of the median beyond which a case counts
+            as a regression (slower) or improvement (faster)
+
+    Returns:
+        One entry per case with baseline and current medians, their ratio
+        and a status: 'regression', 'improvement', 'ok', 'new' or 'missing'.
+        A change counts only if it also exceeds the sum of both standard
+        deviations.
+    """
+    base_results, current_results = baseline['results'], current['results']
+    rows = []
+    for name in sorted(set(base_results) | set(current_results)):
+        before, after = base_results.get(name), current_results.get(name)
+        row = {'name': name, 'baseline': before and before['median'], 'current': after and after['median'], 'ratio': None}
+        if before is None:
+            row['status'] = 'new'
+        elif after is None:
+            row['status'] = 'missing'
+        else:
+            row['ratio'] = after['median'] / before['median'] if before['median'] else float('inf')
+            # Changes within the combined sample spread are treated as noise
+            significant = abs(after['median'] - before['median']) > before['stdev'] + after['stdev']
+            if significant and row['ratio'] > 1 + threshold:
+                row['status'] = 'regression'
+            elif significant and row['ratio'] < 1 - threshold:
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+    return rows
+
+
+def format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def print_comparison(rows: List[Dict], stream=None):
+    stream = stream or sys.stdout
+    width = max([len(row['name']) for row in rows] + [4])
+    print(f"{'case':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}  status", file=stream)
+    for row in rows:
+        change = f"{(row['ratio'] - 1) * 100:+.1f}%" if row['ratio'] is not None else '-'
+        print(
+            f"{row['name']:<{width}}  {format_seconds(row['baseline']):>10}  "
+            f"{format_seconds(row['current']):>10}  {change:>8}  {row['status']}",
+            file=stream
+        )
@@ -0,0 +1,239 @@
+"""
+Stand-ins for external services used by load tests.
+
+FakeSupabaseClient implements the subset of the supabase-py query builder
+that storage.supabase_storage uses, over in-memory tables, so the
+SupabaseStorage code path runs unchanged without a network or credentials.
+start_weather_stub serves OpenWeatherMap-shaped responses over HTTP for
+WeatherService (via WEATHER_API_URL). Both can add a fixed latency to model
+the real services.
+"""
+
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from storage.sqlite_storage import utc_timestamp
+from utils.reference_data import MOCK_CROPS, TERRAIN_DEFAULTS
+
+
+# ============================================
+# Supabase stand-in
+# ============================================
+
+class _Response:
+    def __init__(self, data: List[Dict]):
+        self.data = data
+
+
+_CONDITION = re.compile(r'^(\w+)\.(eq|neq|lt|lte|gt|gte)\."?(.*?)"?$')
+_OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+}
+
+
+def _split_top_level(expression: str) -> List[str]:
+    """Split a PostgREST logic expression on commas outside quotes and parentheses"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == ',' and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+def _parse_logic(expression: str, combine=any) -> Callable[[Dict], bool]:
+    """Predicate for an or=(...) / and(...) PostgREST filter expression"""
+    predicates = []
+    for part in _split_top_level(expression):
+        if part.startswith(('and(', 'or(')) and part.endswith(')'):
+            inner = part[part.index('(') + 1:-1]
+            predicates.append(_parse_logic(inner, all if part.startswith('and(') else any))
+            continue
+        match = _CONDITION.match(part)
+        if not match:
+            raise ValueError(f"Unsupported filter: {part}")
+        column, operator, value = match.groups()
+        predicates.append(
+            lambda row, c=column, o=_OPERATORS[operator], v=value: row.get(c) is not None and o(str(row[c]), v)
+        )
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+class _Query:
+    """Chainable query over one in-memory table"""
+
+    def __init__(self, client: 'FakeSupabaseClient', table: str):
+        self._client = client
+        self._table = table
+        self._columns: Optional[List[str]] = None
+        self._predicates: List[Callable[[Dict], bool]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._insert: Optional[List[Dict]] = None
+
+    def select(self, columns: str = '*'):
+        self._columns = None if columns.strip() == '*' else [c.strip() for c in columns.split(',')]
+        return self
+
+    def _filter(self, column, operator, value):
+        compare = _OPERATORS[operator]
+        self._predicates.append(lambda row: row.get(column) is not None and compare(row[column], value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column, values):
+        values = set(values)
+        self._predicates.append(lambda row: row.get(column) in values)
+        return self
+
+    def or_(self, expression: str):
+        self._predicates.append(_parse_logic(expression))
+        return self
+
+    def order(self, column, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def insert(self, rows):
+        self._insert = [rows] if isinstance(rows, dict) else list(rows)
+        return self
+
+    def execute(self) -> _Response:
+        if self._client.latency:
+            time.sleep(self._client.latency)
+        with self._client.lock:
+            rows = self._client.tables.setdefault(self._table, [])
+            if self._insert is not None:
+                inserted = [self._client.new_row(row) for row in self._insert]
+                rows.extend(inserted)
+                return _Response([dict(row) for row in inserted])
+
+            matched = [row for row in rows if all(predicate(row) for predicate in self._predicates)]
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        if self._columns:
+            return _Response([{column: row.get(column) for column in self._columns} for row in matched])
+        return _Response([dict(row) for row in matched])
+
+
+class FakeSupabaseClient:
+    """
+    In-memory replacement for the client returned by supabase.create_client.
+
+    Tables start with the built-in crops and terrain modifiers. Inserted rows
+    get an id and created_at like the database defaults would assign.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds added to every query (models the network round trip)
+        """
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.tables: Dict[str, List[Dict]] = {
+            'crops': [dict(crop, id=str(uuid.uuid4())) for crop in MOCK_CROPS],
+            'terrain_modifiers': [
+                dict(modifiers, id=str(uuid.uuid4()), terrain_type=terrain)
+                for terrain, modifiers in TERRAIN_DEFAULTS.items()
+            ],
+        }
+
+    def new_row(self, row: Dict) -> Dict:
+        row = dict(row)
+        row.setdefault('id', str(uuid.uuid4()))
+        if not row.get('created_at'):
+            row['created_at'] = utc_timestamp()
+        return row
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+
+# ============================================
+# Weather API stand-in
+# ============================================
+
+def stub_weather(lat: float, lon: float) -> Dict:
+    """Deterministic OpenWeatherMap-style current weather for a coordinate"""
+    temp = round(30 - abs(lat) * 0.45 + (lon % 7) * 0.3, 1)
+    humidity = int(40 + (abs(lat * 3 + lon) % 50))
+    return {
+        'coord': {'lat': lat, 'lon': lon},
+        'main': {'temp': temp, 'humidity': humidity, 'pressure': 1012},
+        'wind': {'speed': round(2 + (abs(lon) % 5), 1)},
+        'weather': [{'description': 'scattered clouds'}],
+    }
+
+
+def start_weather_stub(latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+    """
+    Serve stub_weather() responses on a background thread.
+
+    Args:
+        latency: Seconds added to every response
+        host: Bind address
+        port: Port (0 picks a free one)
+
+    Returns:
+        (server, url); call server.shutdown() to stop it
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            try:
+                body = stub_weather(float(params['lat'][0]), float(params['lon'][0]))
+                status = 200
+            except (KeyError, ValueError):
+                body, status = {'cod': 400, 'message': 'lat and lon are required'}, 400
+            if latency:
+                time.sleep(latency)
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='weather-stub', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/data/2.5/weather"
@@ -3,8 +3,18 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from storage import DEFAULT_SQLITE_PATH
+from utils import export, history_query, logging_utils, profiling, rollups
+
 class Config:
-    """Application configuration"""
+    """
+    Application configuration.
+    
+    Every setting is read from the environment here, once; app.py and the
+    tools import it from this class. Settings owned by a utility module
+    (history paging, export batches, rollups, profiling, logging) are read
+    by that module and only referenced here.
+    """
     
     # Flask
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -14,13 +24,132 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY')
     
+    # Storage backend: 'auto' uses Supabase when configured and the embedded
+    # SQLite store otherwise; 'supabase', 'sqlite', or 'none' to keep
+    # everything in memory (mock mode)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'auto').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', DEFAULT_SQLITE_PATH)
+    
+    # Supabase calls are abandoned after STORAGE_CALL_TIMEOUT seconds; after
+    # STORAGE_BREAKER_FAILURES consecutive failures the circuit breaker fails
+    # calls fast (serving the last good reference data) until a probe succeeds
+    # STORAGE_BREAKER_RESET_SECONDS later
+    STORAGE_CALL_TIMEOUT = float(os.getenv('STORAGE_CALL_TIMEOUT', 2.0))
+    STORAGE_BREAKER_FAILURES = int(os.getenv('STORAGE_BREAKER_FAILURES', 5))
+    STORAGE_BREAKER_RESET_SECONDS = float(os.getenv('STORAGE_BREAKER_RESET_SECONDS', 30))
+    
+    # Crop profiles carry ETag/Last-Modified validators; clients and shared
+    # caches may reuse them for this many seconds before revalidating
+    REFERENCE_CACHE_MAX_AGE = int(os.getenv('REFERENCE_CACHE_MAX_AGE', 300))
+    
+    # gzip/brotli by Accept-Encoding for JSON, MessagePack and export bodies;
+    # buffered bodies smaller than COMPRESSION_MIN_BYTES are sent as they are
+    RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'true').lower() == 'true'
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+    
     # Weather API
     WEATHER_API_KEY = os.getenv('WEATHER_API_KEY')
+    WEATHER_API_URL = os.getenv('WEATHER_API_URL')
+    
+    # Offline climatology grid (built with tools/build_climatology.py)
+    CLIMATOLOGY_PATH = os.getenv('CLIMATOLOGY_PATH')
     
     # Simulation
     DEFAULT_SIMULATION_RUNS = int(os.getenv('DEFAULT_SIMULATION_RUNS', 10000))
     MAX_SIMULATION_RUNS = int(os.getenv('MAX_SIMULATION_RUNS', 50000))
     
+    # Simulation execution: 'inline' runs the engine on the request thread,
+    # 'pool' runs it in a pre-warmed process pool so I/O endpoints stay responsive,
+    # 'auto' routes each request by its estimated cost (utils.scheduler)
+    SIMULATION_EXECUTION = os.getenv('SIMULATION_EXECUTION', 'inline').lower()
+    SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', os.cpu_count() or 1))
+    SIMULATION_QUEUE_DEPTH = int(os.getenv('SIMULATION_QUEUE_DEPTH', SIMULATION_WORKERS * 2))
+    SIMULATION_TIMEOUT = float(os.getenv('SIMULATION_TIMEOUT', 120))
+    
+    # Cost-based routing for SIMULATION_EXECUTION=auto: simulations estimated
+    # below the inline limit run on the request thread, those at or above the
+    # job limit become asynchronous jobs, the rest go to the process pool.
+    # SCHEDULER_BASELINE points at a benchmark baseline to calibrate estimates.
+    SCHEDULER_INLINE_MAX_SECONDS = float(os.getenv('SCHEDULER_INLINE_MAX_SECONDS', 0.02))
+    SCHEDULER_JOB_MIN_SECONDS = float(os.getenv('SCHEDULER_JOB_MIN_SECONDS', 0.25))
+    SCHEDULER_BASELINE = os.getenv('SCHEDULER_BASELINE')
+    
+    # Jobs are kept in the web worker that accepted them, so a poll only finds
+    # its job with a single worker: with WEB_CONCURRENCY > 1 (gunicorn workers)
+    # simulations that would become jobs run on the process pool instead
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+    ASYNC_JOBS = WEB_CONCURRENCY == 1
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 1))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', 100))
+    JOB_RESULT_TTL = float(os.getenv('JOB_RESULT_TTL', 3600))
+    
+    # Admission control in front of the engine: simulations running at once,
+    # how many may wait for a slot and for how long, and how many slots one
+    # client (X-Client-Id header, else remote address) may hold (0 = no limit)
+    SIMULATION_CONCURRENCY = int(os.getenv('SIMULATION_CONCURRENCY', SIMULATION_WORKERS))
+    ADMISSION_QUEUE_DEPTH = int(os.getenv('ADMISSION_QUEUE_DEPTH', SIMULATION_CONCURRENCY * 2))
+    ADMISSION_MAX_WAIT = float(os.getenv('ADMISSION_MAX_WAIT', 10))
+    ADMISSION_CLIENT_LIMIT = int(os.getenv('ADMISSION_CLIENT_LIMIT', 0))
+    
+    # Concurrent identical simulations share one computation
+    SIMULATION_COALESCING = os.getenv('SIMULATION_COALESCING', 'true').lower() == 'true'
+    
+    # What-if sessions keep a scenario's random draws so edits are re-scored
+    # against the same draws: idle lifetime (seconds), sessions kept and the
+    # memory their draws may hold (about 33 bytes per run)
+    WHATIF_SESSION_TTL = float(os.getenv('WHATIF_SESSION_TTL', 900))
+    WHATIF_MAX_SESSIONS = int(os.getenv('WHATIF_MAX_SESSIONS', 100))
+    WHATIF_MEMORY_MB = float(os.getenv('WHATIF_MEMORY_MB', 64))
+    
+    # Part of a request's deadline_ms kept back for persisting and responding
+    DEADLINE_RESERVE_MS = float(os.getenv('DEADLINE_RESERVE_MS', 20))
+    
+    # Simulations whose estimated peak memory exceeds the budget aggregate runs
+    # as they are generated (streaming) or, if that still does not fit, are
+    # rejected. Peak allocation is measured with tracemalloc for a sample.
+    SIMULATION_MEMORY_BUDGET_MB = float(os.getenv('SIMULATION_MEMORY_BUDGET_MB', 64))
+    MEMORY_TRACE_SAMPLE_RATE = float(os.getenv('MEMORY_TRACE_SAMPLE_RATE', 0.01))
+    
+    # Persist a compact distribution summary (quantiles, histogram, factors,
+    # seed) with each simulation so history views never re-run the engine
+    SIMULATION_SUMMARIES = os.getenv('SIMULATION_SUMMARIES', 'true').lower() == 'true'
+    
+    # Spatial index of past simulations for nearby lookups and result reuse
+    SPATIAL_INDEX_CELL_DEGREES = float(os.getenv('SPATIAL_INDEX_CELL_DEGREES', 0.5))
+    SPATIAL_INDEX_MAX_ENTRIES = int(os.getenv('SPATIAL_INDEX_MAX_ENTRIES', 100000))
+    SPATIAL_INDEX_WARM_ROWS = int(os.getenv('SPATIAL_INDEX_WARM_ROWS', 5000))
+    SIMULATION_REUSE_RADIUS_KM = float(os.getenv('SIMULATION_REUSE_RADIUS_KM', 5))
+    SIMULATION_REUSE_MAX_AGE_HOURS = float(os.getenv('SIMULATION_REUSE_MAX_AGE_HOURS', 24))
+    
+    # Subsystems start on a background thread after import unless disabled
+    # (e.g. serverless, where everything initializes on first use)
+    BACKGROUND_INIT = os.getenv('BACKGROUND_INIT', 'true').lower() == 'true'
+    # How long a request waits for storage still being set up before falling
+    # back to mock data
+    DB_INIT_WAIT = float(os.getenv('DB_INIT_WAIT', 2.0))
+    
+    # Simulation history paging (utils.history_query)
+    DEFAULT_HISTORY_PAGE_SIZE = history_query.DEFAULT_HISTORY_PAGE_SIZE
+    MAX_HISTORY_PAGE_SIZE = history_query.MAX_HISTORY_PAGE_SIZE
+    
+    # Streaming export, rows per encoded batch (utils.export)
+    EXPORT_BATCH_SIZE = export.EXPORT_BATCH_SIZE
+    
+    # Analytics rollups (utils.rollups; the region cell size is fixed at
+    # 1 degree to match the Supabase trigger)
+    MAX_ANALYTICS_GROUPS = rollups.MAX_ANALYTICS_GROUPS
+    
+    # Per-request profiling (utils.profiling: X-Profile: <token>, or a
+    # sampled fraction written to PROFILE_DIR)
+    PROFILE_TOKEN = profiling.PROFILE_TOKEN
+    PROFILE_SAMPLE_RATE = profiling.PROFILE_SAMPLE_RATE
+    PROFILE_DIR = profiling.PROFILE_DIR
+    
+    # Logging (utils.logging_utils: structured JSON lines; per-request debug
+    # events are sampled)
+    LOG_LEVEL = logging_utils.LOG_LEVEL
+    LOG_SAMPLE_RATE = logging_utils.LOG_SAMPLE_RATE
+    
     # CORS
     ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')
     
@@ -8,20 +8,39 @@ Modules:
     penalties: Environmental mismatch and terrain penalty calculations
     scoring: Success rate and risk level computation
     explainability: Natural language explanation generation
+    pipeline: End-to-end run of one scenario
+    pool: Process pool for running simulations off the request threads
+    sketch: Compact distribution summaries of simulation results
+    accumulator: Streaming aggregation of simulation runs
+    memory: Memory estimates, engine mode selection and peak tracing
+    reservoir: Reservoir sampling of example runs
 """
 
-from .simulator import MonteCarloSimulator
+from .simulator import MonteCarloSimulator, RunDraws
 from .penalties import PenaltyEngine
 from .scoring import compute_metrics, calculate_risk_level
 from .explainability import generate_explanation
+from .pipeline import run_simulation
+from .sketch import summarize, compare_summaries
+from .accumulator import RunAccumulator
+from .memory import estimate_memory, choose_mode
+from .reservoir import RunReservoir
 
 __version__ = "1.0.0"
 __author__ = "Agricultural Simulation Team"
 
 __all__ = [
     'MonteCarloSimulator',
+    'RunDraws',
     'PenaltyEngine',
     'compute_metrics',
     'calculate_risk_level',
-    'generate_explanation'
+    'generate_explanation',
+    'run_simulation',
+    'summarize',
+    'compare_summaries',
+    'RunAccumulator',
+    'estimate_memory',
+    'choose_mode',
+    'RunReservoir'
 ]
\ No newline at end of file
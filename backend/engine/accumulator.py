@@ -0,0 +1,105 @@
+"""
+Streaming aggregation of simulation runs.
+
+RunAccumulator consumes runs one at a time (MonteCarloSimulator.iter_runs)
+and keeps only what the metrics, explanation and summary need: the yields
+in a packed float array plus a handful of counters. Its outputs equal
+those computed from the full list of per-run dicts for the same runs, at
+a fraction of the memory.
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from .scoring import failure_factor_type, failure_percentages, risk_level_from_rates
+from .explainability import explanation_factor_type, explanation_from_counts
+from .sketch import build_summary
+
+
+class RunAccumulator:
+    """Aggregates per-run results without retaining them"""
+
+    def __init__(self):
+        self.yields = array('d')
+        self.successes = 0
+        self.pests = 0
+        self.diseases = 0
+        self.extreme_events = 0
+        self.failed = 0
+        # Failure factor counts over failed runs, in first-seen order
+        self.failure_counts: Dict[str, int] = {}
+        # Explanation categories over all runs
+        self.explanation_counts: Counter = Counter()
+        self.factor_total = 0
+
+    def add(self, run: Dict):
+        """Add one run (a result dict from MonteCarloSimulator.iter_runs)"""
+        self.yields.append(run['yield'])
+        if run['success']:
+            self.successes += 1
+        else:
+            self.failed += 1
+            for factor in run['limiting_factors']:
+                factor_type = failure_factor_type(factor)
+                self.failure_counts[factor_type] = self.failure_counts.get(factor_type, 0) + 1
+        if run.get('had_pest', False):
+            self.pests += 1
+        if run.get('had_disease', False):
+            self.diseases += 1
+        if run.get('had_extreme_weather', False):
+            self.extreme_events += 1
+        for factor in run['limiting_factors']:
+            self.factor_total += 1
+            category = explanation_factor_type(factor)
+            if category:
+                self.explanation_counts[category] += 1
+
+    def __len__(self) -> int:
+        return len(self.yields)
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / len(self.yields) if self.yields else 0
+
+    def metrics(self) -> Tuple[float, float, str, Tuple[float, float, float]]:
+        """Same as scoring.compute_metrics over the accumulated runs"""
+        n = len(self.yields)
+        if not n:
+            return 0.0, 0.0, "High", (0, 0, 0)
+
+        avg_yield = sum(self.yields) / n
+        variance = sum((y - avg_yield) ** 2 for y in self.yields) / n
+        yield_std = variance ** 0.5
+
+        threshold = avg_yield * 0.1
+        failure_rate = sum(1 for y in self.yields if y < threshold) / n
+        adverse_event_rate = self.pests / n + self.diseases / n + self.extreme_events / n
+
+        risk_level = risk_level_from_rates(
+            self.successes / n, yield_std, avg_yield, failure_rate, adverse_event_rate
+        )
+        return (
+            self.successes / n,
+            avg_yield,
+            risk_level,
+            (min(self.yields), avg_yield, max(self.yields))
+        )
+
+    def failure_patterns(self) -> Dict[str, float]:
+        """Same as scoring.analyze_failure_patterns over the accumulated runs"""
+        return failure_percentages(self.failure_counts, self.failed)
+
+    def explanation(self, crop_profile: Dict, environment: Dict, is_override: bool) -> str:
+        """Same as explainability.generate_explanation over the accumulated runs"""
+        return explanation_from_counts(
+            self.explanation_counts, self.factor_total, len(self.yields), self.success_rate,
+            crop_profile, environment, is_override
+        )
+
+    def summary(self, ideal_yield: float, seed: Optional[int] = None, environment: Optional[Dict] = None) -> Dict:
+        """Same as sketch.summarize over the accumulated runs"""
+        return build_summary(
+            sorted(self.yields), self.successes, self.failure_patterns(),
+            ideal_yield, seed, environment
+        )
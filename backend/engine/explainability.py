@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from collections import Counter
 
 def generate_explanation(
@@ -29,28 +29,63 @@ def generate_explanation(
     for run in results:
         all_factors.extend(run['limiting_factors'])
     
-    # If no limiting factors, generate positive explanation
-    if not all_factors:
-        return generate_positive_explanation(crop_profile, environment, success_rate)
-    
     # Count factor occurrences
     factor_counts = Counter()
     for factor in all_factors:
-        # Categorize factors
-        if 'Temperature' in factor:
-            factor_counts['Temperature Stress'] += 1
-        elif 'Rainfall' in factor or 'rainfall' in factor:
-            factor_counts['Water Availability'] += 1
-        elif 'humidity' in factor:
-            factor_counts['Humidity Imbalance'] += 1
-        elif 'wind' in factor or 'Wind' in factor:
-            factor_counts['Wind Damage'] += 1
-        elif 'Pest' in factor:
-            factor_counts['Pest Infestation'] += 1
-        elif 'Disease' in factor:
-            factor_counts['Disease Outbreak'] += 1
-        elif 'Extreme' in factor:
-            factor_counts['Extreme Weather Events'] += 1
+        factor_type = explanation_factor_type(factor)
+        if factor_type:
+            factor_counts[factor_type] += 1
+    
+    return explanation_from_counts(
+        factor_counts, len(all_factors), total_runs, success_rate,
+        crop_profile, environment, is_override
+    )
+
+def explanation_factor_type(factor: str) -> Optional[str]:
+    """Explanation category of a limiting factor, or None if uncategorized"""
+    if 'Temperature' in factor:
+        return 'Temperature Stress'
+    elif 'Rainfall' in factor or 'rainfall' in factor:
+        return 'Water Availability'
+    elif 'humidity' in factor:
+        return 'Humidity Imbalance'
+    elif 'wind' in factor or 'Wind' in factor:
+        return 'Wind Damage'
+    elif 'Pest' in factor:
+        return 'Pest Infestation'
+    elif 'Disease' in factor:
+        return 'Disease Outbreak'
+    elif 'Extreme' in factor:
+        return 'Extreme Weather Events'
+    return None
+
+def explanation_from_counts(
+    factor_counts: Counter,
+    factor_total: int,
+    total_runs: int,
+    success_rate: float,
+    crop_profile: Dict,
+    environment: Dict,
+    is_override: bool
+) -> str:
+    """
+    Explanation from aggregated factor counts (see generate_explanation).
+    
+    Args:
+        factor_counts: Occurrences per explanation category
+        factor_total: Limiting factors seen, categorized or not
+        total_runs: Number of simulation runs
+        success_rate: Proportion of successful runs
+        crop_profile: Crop requirements
+        environment: Environmental conditions
+        is_override: Whether this is an override scenario
+        
+    Returns:
+        Human-readable explanation string
+    """
+    # If no limiting factors, generate positive explanation
+    if not factor_total:
+        return generate_positive_explanation(crop_profile, environment, success_rate)
     
     # Get top factors
     top_factors = factor_counts.most_common(3)
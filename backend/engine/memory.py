@@ -0,0 +1,108 @@
+"""
+Memory estimates and peak-allocation tracing for simulations.
+
+The engine can aggregate runs in two modes:
+
+    full: every run's result dict is kept until metrics, explanation and
+        summary have been computed (a few hundred bytes per run)
+    streaming: runs are folded into a RunAccumulator as they are generated;
+        only a packed array of yields is kept (tens of bytes per run)
+
+Both produce the same outcome for the same seed. estimate_memory() gives
+the expected peak allocation of a simulation from its run count, and
+choose_mode() picks the mode that fits a per-request memory budget.
+Estimates are calibrated against tracemalloc peaks of the pipeline and
+err on the high side.
+"""
+
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+ENGINE_MODES = ('full', 'streaming')
+
+# Peak bytes per run by mode: the result dict, its limiting factor strings
+# and the lists scoring/explanation build over them for 'full' (measured
+# 560-730); one packed float for 'streaming' (measured 8.5)
+BYTES_PER_RUN = {'full': 760, 'streaming': 10}
+# The summary sorts a copy of the yields; 'full' already holds larger
+# temporaries at that point, 'streaming' peaks with the float list
+SUMMARY_BYTES_PER_RUN = {'full': 0, 'streaming': 36}
+# Simulator, penalty engine and outcome, independent of the run count
+BASE_BYTES = 16 * 1024
+
+# tracemalloc is process-wide; only one simulation is traced at a time
+_trace_lock = threading.Lock()
+
+
+def estimate_memory(runs: int, mode: str = 'full', summary: bool = False) -> int:
+    """
+    Estimate the peak allocation of one simulation.
+
+    Args:
+        runs: Number of Monte Carlo runs
+        mode: Engine mode ('full' or 'streaming')
+        summary: Whether a distribution summary is built
+
+    Returns:
+        Estimated peak bytes
+    """
+    per_run = BYTES_PER_RUN[mode] + (SUMMARY_BYTES_PER_RUN[mode] if summary else 0)
+    return BASE_BYTES + runs * per_run
+
+
+def choose_mode(runs: int, budget_bytes: Optional[int], summary: bool = False) -> Optional[str]:
+    """
+    Pick the engine mode for a simulation under a memory budget.
+
+    Args:
+        runs: Number of Monte Carlo runs
+        budget_bytes: Per-simulation memory budget (None or 0 for no budget)
+        summary: Whether a distribution summary is built
+
+    Returns:
+        'full' when it fits, otherwise 'streaming' when that fits, otherwise
+        None (the simulation should be rejected)
+    """
+    for mode in ENGINE_MODES:
+        if not budget_bytes or estimate_memory(runs, mode, summary) <= budget_bytes:
+            return mode
+    return None
+
+
+class PeakAllocation:
+    """Peak traced allocation of a trace_peak block (None when not traced)"""
+
+    def __init__(self):
+        self.bytes: Optional[int] = None
+
+
+@contextmanager
+def trace_peak(enabled: bool = True):
+    """
+    Measure the peak memory allocated while the block runs.
+
+    Tracing is skipped (bytes stays None) when disabled, when another
+    simulation is already being traced, or when tracemalloc was started
+    elsewhere, since its peak would then include unrelated allocations.
+
+    Yields:
+        PeakAllocation whose bytes is set when the block exits
+    """
+    peak = PeakAllocation()
+    if not enabled or not _trace_lock.acquire(blocking=False):
+        yield peak
+        return
+    try:
+        if tracemalloc.is_tracing():
+            yield peak
+            return
+        tracemalloc.start()
+        try:
+            yield peak
+        finally:
+            peak.bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    finally:
+        _trace_lock.release()
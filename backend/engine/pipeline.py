@@ -0,0 +1,211 @@
+import time
+from typing import Dict, Iterator, Optional
+
+from .simulator import MonteCarloSimulator, RunDraws
+from .penalties import PenaltyEngine
+from .scoring import compute_metrics, estimate_intervals
+from .explainability import generate_explanation
+from .sketch import summarize
+from .accumulator import RunAccumulator
+from .reservoir import RunReservoir
+from .memory import ENGINE_MODES, estimate_memory, trace_peak
+
+# Runs between deadline checks, and runs always completed before stopping
+DEADLINE_CHECK_INTERVAL = 250
+MIN_RUNS_BEFORE_DEADLINE = 250
+# Metrics, explanation and summary time as a fraction of simulation time
+# (measured up to 0.42 in full mode, 0.1 streaming); reserved for them when
+# a deadline stops the runs
+POST_SIMULATION_FRACTION = {'full': 0.5, 'streaming': 0.15}
+
+
+def run_simulation(
+    crop_profile: Dict,
+    environment: Dict,
+    terrain_modifiers: Dict,
+    runs: int = 10000,
+    seed: Optional[int] = None,
+    summary: bool = False,
+    mode: str = 'full',
+    trace_memory: bool = False,
+    deadline: Optional[float] = None,
+    explain: bool = True,
+    examples: int = 0,
+    stratify_examples: bool = False,
+    draws: Optional[RunDraws] = None
+) -> Dict:
+    """
+    Run the full engine pipeline for one scenario.
+    
+    Penalty setup, Monte Carlo runs, metrics and explanation are computed
+    here so the same code path serves the API (inline or in a worker
+    process) and offline tools. Only the aggregate outcome is returned; the
+    per-run results stay local, which keeps inter-process payloads small.
+    
+    Args:
+        crop_profile: Crop requirements
+        environment: Environmental conditions
+        terrain_modifiers: Terrain-specific adjustment factors
+        runs: Number of simulation iterations
+        seed: Random seed (drawn at random if omitted)
+        summary: Also build a compact distribution summary (engine.sketch)
+        mode: 'full' keeps every run's result dict; 'streaming' aggregates
+            runs as they are generated (engine.accumulator) and gives the
+            same outcome in a fraction of the memory
+        trace_memory: Measure peak allocation with tracemalloc (slow;
+            enable for a sample of requests)
+        deadline: Wall-clock time (time.time()) by which the outcome is
+            needed; runs stop early, leaving time for scoring, and the
+            outcome is marked truncated
+        explain: Generate the explanation (failure pattern analysis); skip
+            it when the caller does not need it
+        examples: Example runs to keep (engine.reservoir), in O(examples)
+            memory; 0 for none
+        stratify_examples: Keep that many examples of successful runs and
+            of failed runs per limiting factor type
+        draws: Random draws to re-score (RunDraws.sample) instead of
+            sampling new ones; they set runs and seed
+        
+    Returns:
+        Dictionary with success_rate, avg_yield, risk_level, yield_range,
+        explanation (or None), is_override, simulation_runs, seed, summary
+        (or None), per-stage timings in seconds, memory ({mode, estimated_bytes,
+        peak_bytes}; peak_bytes is None unless traced), truncated and, when
+        a deadline is given, 95% confidence intervals (else None) and
+        examples (RunReservoir.examples(), or None)
+    """
+    if mode not in ENGINE_MODES:
+        raise ValueError(f"Unknown engine mode: {mode}")
+    if draws is not None:
+        runs = len(draws)
+    timings = {}
+    
+    penalty_engine = PenaltyEngine(crop_profile, environment, terrain_modifiers)
+    
+    # Determine if this is an override scenario
+    is_override = penalty_engine.check_compatibility()
+    
+    simulator = MonteCarloSimulator(
+        crop_profile=crop_profile,
+        environment=environment,
+        penalty_engine=penalty_engine,
+        runs=runs,
+        seed=seed,
+        draws=draws
+    )
+    reservoir = RunReservoir(examples, stratify_examples, simulator.seed) if examples else None
+    with trace_peak(trace_memory) as peak:
+        if mode == 'streaming':
+            outcome = _aggregate_streaming(
+                simulator, crop_profile, environment, is_override, summary, explain, reservoir, timings, deadline
+            )
+        else:
+            outcome = _aggregate_full(
+                simulator, crop_profile, environment, is_override, summary, explain, reservoir, timings, deadline
+            )
+    success_rate, avg_yield, risk_level, yield_range, explanation, run_summary, run_count, intervals = outcome
+    
+    return {
+        "success_rate": success_rate,
+        "avg_yield": avg_yield,
+        "risk_level": risk_level,
+        "yield_range": yield_range,
+        "explanation": explanation,
+        "is_override": is_override,
+        "simulation_runs": run_count,
+        "seed": simulator.seed,
+        "summary": run_summary,
+        "timings": timings,
+        "memory": {
+            "mode": mode,
+            "estimated_bytes": estimate_memory(runs, mode, summary),
+            "peak_bytes": peak.bytes
+        },
+        "truncated": run_count < runs,
+        "intervals": intervals,
+        "examples": reservoir.examples() if reservoir is not None else None
+    }
+
+
+def _runs_until(runs: Iterator[Dict], deadline: float, post_fraction: float) -> Iterator[Dict]:
+    """Pass runs through until the time left would not cover scoring them"""
+    start = time.time()
+    for count, run in enumerate(runs, 1):
+        yield run
+        if count % DEADLINE_CHECK_INTERVAL == 0 and count >= MIN_RUNS_BEFORE_DEADLINE:
+            now = time.time()
+            if now + (now - start) * post_fraction >= deadline:
+                return
+
+
+def _aggregate_full(simulator, crop_profile, environment, is_override, summary, explain, reservoir, timings, deadline):
+    start = time.perf_counter()
+    if deadline is None:
+        results = simulator.run()
+    else:
+        results = list(_runs_until(simulator.iter_runs(), deadline, POST_SIMULATION_FRACTION['full']))
+    timings['simulate'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    success_rate, avg_yield, risk_level, yield_range = compute_metrics(results)
+    timings['metrics'] = time.perf_counter() - start
+    
+    explanation = None
+    if explain:
+        start = time.perf_counter()
+        explanation = generate_explanation(results, crop_profile, environment, is_override)
+        timings['explanation'] = time.perf_counter() - start
+    
+    if reservoir is not None:
+        start = time.perf_counter()
+        for run in results:
+            reservoir.add(run)
+        timings['examples'] = time.perf_counter() - start
+    
+    run_summary = None
+    if summary:
+        start = time.perf_counter()
+        run_summary = summarize(results, crop_profile.get('ideal_yield', 5000), simulator.seed, environment)
+        timings['summary'] = time.perf_counter() - start
+    
+    intervals = None
+    if deadline is not None:
+        successes = sum(1 for r in results if r['success'])
+        intervals = estimate_intervals(successes, [r['yield'] for r in results])
+    
+    return success_rate, avg_yield, risk_level, yield_range, explanation, run_summary, len(results), intervals
+
+
+def _aggregate_streaming(simulator, crop_profile, environment, is_override, summary, explain, reservoir, timings, deadline):
+    accumulator = RunAccumulator()
+    runs = simulator.iter_runs()
+    if deadline is not None:
+        runs = _runs_until(runs, deadline, POST_SIMULATION_FRACTION['streaming'])
+    start = time.perf_counter()
+    for run in runs:
+        accumulator.add(run)
+        if reservoir is not None:
+            reservoir.add(run)
+    timings['simulate'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    success_rate, avg_yield, risk_level, yield_range = accumulator.metrics()
+    timings['metrics'] = time.perf_counter() - start
+    
+    explanation = None
+    if explain:
+        start = time.perf_counter()
+        explanation = accumulator.explanation(crop_profile, environment, is_override)
+        timings['explanation'] = time.perf_counter() - start
+    
+    run_summary = None
+    if summary:
+        start = time.perf_counter()
+        run_summary = accumulator.summary(crop_profile.get('ideal_yield', 5000), simulator.seed, environment)
+        timings['summary'] = time.perf_counter() - start
+    
+    intervals = None
+    if deadline is not None:
+        intervals = estimate_intervals(accumulator.successes, accumulator.yields)
+    
+    return success_rate, avg_yield, risk_level, yield_range, explanation, run_summary, len(accumulator), intervals
@@ -0,0 +1,258 @@
+"""
+Pre-warmed process pool for CPU-bound simulations.
+
+The Monte Carlo loop holds the GIL for its whole duration, so running it on a
+request thread starves every other endpoint served by the same worker. The
+pool moves the engine into separate processes; request threads only wait on
+a future, which releases the GIL for I/O endpoints.
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from .pipeline import run_simulation
+
+
+# Reference data preloaded into each worker process by _init_worker
+_worker_crops: Dict[str, Dict] = {}
+_worker_terrain: Dict[str, Dict] = {}
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the pool's queue is full and a task cannot be accepted"""
+
+
+class PoolUnavailableError(RuntimeError):
+    """Raised when an accepted task gives no outcome: a worker died or it timed out"""
+
+
+def _init_worker(crops: List[Dict], terrain_modifiers: Dict[str, Dict]):
+    """Process initializer: cache crop and terrain reference data in the worker"""
+    _worker_crops.clear()
+    _worker_crops.update({crop['name'].lower(): crop for crop in crops})
+    _worker_terrain.clear()
+    _worker_terrain.update(terrain_modifiers)
+
+
+def _warm_up() -> int:
+    """No-op task used to force worker start-up before the first request"""
+    return os.getpid()
+
+
+def _run_task(
+    crop_name: str,
+    crop_profile: Optional[Dict],
+    terrain: str,
+    terrain_modifiers: Optional[Dict],
+    environment: Dict,
+    runs: int,
+    seed: Optional[int] = None,
+    summary: bool = False,
+    mode: str = 'full',
+    trace_memory: bool = False,
+    deadline: Optional[float] = None,
+    explain: bool = True,
+    examples: int = 0,
+    stratify_examples: bool = False
+) -> Dict:
+    """Worker entry point; resolves reference data from the preloaded cache when not sent"""
+    if crop_profile is None:
+        crop_profile = _worker_crops[crop_name.lower()]
+    if terrain_modifiers is None:
+        terrain_modifiers = _worker_terrain[terrain]
+    return run_simulation(
+        crop_profile, environment, terrain_modifiers, runs,
+        seed=seed, summary=summary, mode=mode, trace_memory=trace_memory, deadline=deadline,
+        explain=explain, examples=examples, stratify_examples=stratify_examples
+    )
+
+
+class SimulationPool:
+    """
+    Process pool that runs the simulation pipeline off the request threads.
+
+    Admission is bounded: at most `workers` tasks run and `queue_depth` more
+    wait. Further submissions fail fast with PoolSaturatedError instead of
+    piling up behind a backlog. A task whose worker dies or that outlives its
+    timeout fails with PoolUnavailableError; both are worth retrying.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_depth: Optional[int] = None,
+        crops: Optional[List[Dict]] = None,
+        terrain_modifiers: Optional[Dict[str, Dict]] = None,
+        start_method: str = 'spawn'
+    ):
+        """
+        Initialize pool (workers are started by start())
+
+        Args:
+            workers: Number of worker processes (default: CPU count)
+            queue_depth: Tasks allowed to wait for a free worker (default: 2 x workers)
+            crops: Crop profiles to preload in every worker
+            terrain_modifiers: Terrain modifiers keyed by terrain type to preload
+            start_method: multiprocessing start method
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_depth = self.workers * 2 if queue_depth is None else queue_depth
+        self.crops = list(crops or [])
+        self.terrain_modifiers = dict(terrain_modifiers or {})
+        self.start_method = start_method
+
+        self._crops_by_name = {crop['name'].lower(): crop for crop in self.crops}
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._in_flight = 0
+        self._executor = None
+
+    def start(self, timeout: float = 60.0) -> 'SimulationPool':
+        """Start worker processes and wait until each one has loaded reference data"""
+        with self._start_lock:
+            if self._executor is not None:
+                return self
+
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.crops, self.terrain_modifiers)
+            )
+            warm_ups = [executor.submit(_warm_up) for _ in range(self.workers)]
+            for future in warm_ups:
+                future.result(timeout=timeout)
+            self._executor = executor
+        return self
+
+    def run(
+        self,
+        crop_profile: Dict,
+        environment: Dict,
+        terrain_modifiers: Dict,
+        runs: int = 10000,
+        timeout: Optional[float] = None,
+        seed: Optional[int] = None,
+        summary: bool = False,
+        mode: str = 'full',
+        trace_memory: bool = False,
+        deadline: Optional[float] = None,
+        explain: bool = True,
+        examples: int = 0,
+        stratify_examples: bool = False
+    ) -> Dict:
+        """
+        Run one simulation in a worker process and wait for the outcome.
+
+        Args:
+            crop_profile: Crop requirements
+            environment: Environmental conditions
+            terrain_modifiers: Terrain-specific adjustment factors
+            runs: Number of simulation iterations
+            timeout: Seconds to wait for the result
+            seed: Random seed (drawn at random if omitted)
+            summary: Also build a compact distribution summary
+            mode: Engine mode ('full' or 'streaming', see engine.memory)
+            trace_memory: Measure peak allocation in the worker
+            deadline: Wall-clock time by which the outcome is needed
+            explain: Generate the explanation (failure pattern analysis)
+            examples: Example runs to keep (see engine.reservoir)
+            stratify_examples: Sample examples per outcome and limiting factor
+
+        Returns:
+            Outcome dictionary from run_simulation()
+
+        Raises:
+            PoolSaturatedError: if running and queued tasks are at capacity
+            PoolUnavailableError: if a worker process died (the pool is
+                replaced for later tasks) or the timeout expired
+        """
+        executor = self._executor
+        if executor is None:
+            executor = self.start()._executor
+
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturatedError("Simulation queue is full")
+
+        with self._lock:
+            self._in_flight += 1
+
+        try:
+            # Profiles matching the preloaded data are resolved in the worker,
+            # so only small keys cross the process boundary
+            crop_name = crop_profile.get('name', '')
+            preloaded_crop = self._crops_by_name.get(crop_name.lower()) == crop_profile
+            terrain = environment.get('terrain', 'plain')
+            preloaded_terrain = self.terrain_modifiers.get(terrain) == terrain_modifiers
+
+            future = executor.submit(
+                _run_task,
+                crop_name,
+                None if preloaded_crop else crop_profile,
+                terrain,
+                None if preloaded_terrain else terrain_modifiers,
+                environment,
+                runs,
+                seed,
+                summary,
+                mode,
+                trace_memory,
+                deadline,
+                explain,
+                examples,
+                stratify_examples
+            )
+        except BrokenProcessPool as e:
+            self._release()
+            self._discard(executor)
+            raise PoolUnavailableError("Simulation worker process died") from e
+        except Exception:
+            self._release()
+            raise
+
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=timeout)
+        except BrokenProcessPool as e:
+            self._discard(executor)
+            raise PoolUnavailableError("Simulation worker process died") from e
+        except FutureTimeoutError as e:
+            # Drops the task if it is still queued; a running one keeps its
+            # slot until the worker finishes it
+            future.cancel()
+            raise PoolUnavailableError("Simulation did not finish in time") from e
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Drop a broken executor; the next run() starts a new one"""
+        with self._start_lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Current load: tasks running or waiting, and total capacity"""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            'workers': self.workers,
+            'in_flight': in_flight,
+            'queued': max(0, in_flight - self.workers),
+            'capacity': self.workers + self.queue_depth
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,90 @@
+"""
+Reservoir sampling of example simulation runs.
+
+RunReservoir keeps a fixed number of runs drawn uniformly from all runs it
+sees (Vitter's Algorithm R), so concrete example runs can be shown next to
+the aggregates without retaining every run. With stratification, one
+reservoir is kept per stratum: successful runs, and failed runs by their
+primary limiting factor type. Rare outcomes (a pest outbreak in 3% of
+runs) then still get examples. Memory is O(size x strata) whatever the
+number of runs; there are at most nine strata.
+
+Sampling uses its own random generator seeded from the simulation seed, so
+the simulated runs are unchanged and the same seed gives the same examples.
+"""
+
+import random
+from typing import Dict, List, Optional
+
+from .scoring import failure_factor_type
+
+SUCCESS_STRATUM = 'success'
+FAILURE_STRATUM = 'failure'
+
+# Run fields reported for an example, with the decimals they are rounded to
+EXAMPLE_FIELDS = {'yield': 2, 'temp': 2, 'rainfall': 1, 'humidity': 3}
+
+
+def run_stratum(run: Dict) -> str:
+    """Stratum of a run: 'success', or 'failure:<factor type>' of its first limiting factor"""
+    if run['success']:
+        return SUCCESS_STRATUM
+    factors = run['limiting_factors']
+    factor_type = failure_factor_type(factors[0]) if factors else 'Other Factors'
+    return f"{FAILURE_STRATUM}:{factor_type}"
+
+
+class RunReservoir:
+    """Fixed-size uniform sample of runs, optionally per stratum"""
+
+    def __init__(self, size: int, stratify: bool = False, seed: Optional[int] = None):
+        """
+        Args:
+            size: Runs kept (per stratum when stratified)
+            stratify: Sample successful runs and each failure factor separately
+            seed: Simulation seed; the sampling stream is derived from it
+        """
+        self.size = size
+        self.stratify = stratify
+        self.rng = random.Random(f"examples-{seed}" if seed is not None else None)
+        self._samples: Dict[str, List[Dict]] = {}
+        self._seen: Dict[str, int] = {}
+
+    def add(self, run: Dict):
+        """Offer one run (a result dict from MonteCarloSimulator.iter_runs)"""
+        stratum = run_stratum(run) if self.stratify else 'all'
+        seen = self._seen.get(stratum, 0) + 1
+        self._seen[stratum] = seen
+        sample = self._samples.setdefault(stratum, [])
+        if seen <= self.size:
+            sample.append(run)
+        else:
+            slot = self.rng.randrange(seen)
+            if slot < self.size:
+                sample[slot] = run
+
+    def examples(self) -> Dict:
+        """
+        The sampled runs, ready for a response.
+
+        Returns:
+            Dictionary with runs (rounded run dicts, each with its stratum
+            when stratified, ordered by stratum then yield) and strata
+            (number of runs each stratum stands for)
+        """
+        examples = []
+        for stratum in sorted(self._samples):
+            for run in sorted(self._samples[stratum], key=lambda r: r['yield']):
+                example = {
+                    'success': run['success'],
+                    'limiting_factors': list(run['limiting_factors']),
+                    'had_pest': run.get('had_pest', False),
+                    'had_disease': run.get('had_disease', False),
+                    'had_extreme_weather': run.get('had_extreme_weather', False),
+                }
+                for field, decimals in EXAMPLE_FIELDS.items():
+                    example[field] = round(run[field], decimals)
+                if self.stratify:
+                    example['stratum'] = stratum
+                examples.append(example)
+        return {'runs': examples, 'strata': dict(sorted(self._seen.items()))}
@@ -1,5 +1,6 @@
+import math
 from statistics import variance
-from typing import List, Dict, Tuple
+from typing import List, Dict, Sequence, Tuple
 #import numpy as np
 
 def compute_metrics(results: List[Dict]) -> Tuple[float, float, str, Tuple[float, float, float]]:
@@ -70,6 +71,40 @@ def calculate_risk_level(
         avg_yield: Average yield across all runs
         results: Full simulation results
         
+    Returns:
+        Risk level: "Low", "Medium", or "High"
+    """
+    # Factor 3: Catastrophic failure rate (weighted 30%)
+    # Count runs with near-zero yield
+    catastrophic_failures = sum(1 for r in results if r['yield'] < avg_yield * 0.1)
+    failure_rate = catastrophic_failures / len(results)
+    
+    # Factor 4: Frequency of random adverse events
+    pest_frequency = sum(1 for r in results if r.get('had_pest', False)) / len(results)
+    disease_frequency = sum(1 for r in results if r.get('had_disease', False)) / len(results)
+    extreme_weather_frequency = sum(1 for r in results if r.get('had_extreme_weather', False)) / len(results)
+    
+    adverse_event_rate = pest_frequency + disease_frequency + extreme_weather_frequency
+    
+    return risk_level_from_rates(success_rate, yield_std, avg_yield, failure_rate, adverse_event_rate)
+
+def risk_level_from_rates(
+    success_rate: float,
+    yield_std: float,
+    avg_yield: float,
+    failure_rate: float,
+    adverse_event_rate: float
+) -> str:
+    """
+    Risk level from aggregate rates (see calculate_risk_level).
+    
+    Args:
+        success_rate: Proportion of successful runs
+        yield_std: Standard deviation of yield
+        avg_yield: Average yield across all runs
+        failure_rate: Proportion of runs below 10% of the average yield
+        adverse_event_rate: Sum of pest, disease and extreme weather frequencies
+        
     Returns:
         Risk level: "Low", "Medium", or "High"
     """
@@ -95,21 +130,12 @@ def calculate_risk_level(
             risk_score += 1
     
     # Factor 3: Catastrophic failure rate (weighted 30%)
-    # Count runs with near-zero yield
-    catastrophic_failures = sum(1 for r in results if r['yield'] < avg_yield * 0.1)
-    failure_rate = catastrophic_failures / len(results)
-    
     if failure_rate > 0.15:
         risk_score += 2
     elif failure_rate > 0.05:
         risk_score += 1
     
     # Factor 4: Frequency of random adverse events
-    pest_frequency = sum(1 for r in results if r.get('had_pest', False)) / len(results)
-    disease_frequency = sum(1 for r in results if r.get('had_disease', False)) / len(results)
-    extreme_weather_frequency = sum(1 for r in results if r.get('had_extreme_weather', False)) / len(results)
-    
-    adverse_event_rate = pest_frequency + disease_frequency + extreme_weather_frequency
     if adverse_event_rate > 0.12:  # Above expected combined rate
         risk_score += 1
     
@@ -163,31 +189,71 @@ def analyze_failure_patterns(results: List[Dict]) -> Dict[str, float]:
     factor_counts = {}
     for run in failed_runs:
         for factor in run['limiting_factors']:
-            # Extract factor type (remove specific values)
-            if 'Temperature' in factor:
-                factor_type = 'Temperature Stress'
-            elif 'Rainfall' in factor or 'rainfall' in factor:
-                factor_type = 'Water Availability'
-            elif 'humidity' in factor:
-                factor_type = 'Humidity Issues'
-            elif 'wind' in factor:
-                factor_type = 'Wind Damage'
-            elif 'Pest' in factor:
-                factor_type = 'Pest Damage'
-            elif 'Disease' in factor:
-                factor_type = 'Disease Outbreak'
-            elif 'Extreme' in factor:
-                factor_type = 'Extreme Weather'
-            else:
-                factor_type = 'Other Factors'
-            
+            factor_type = failure_factor_type(factor)
             factor_counts[factor_type] = factor_counts.get(factor_type, 0) + 1
     
-    # Convert to percentages
-    total_failed = len(failed_runs)
+    return failure_percentages(factor_counts, len(failed_runs))
+
+def failure_factor_type(factor: str) -> str:
+    """Factor type of a limiting factor description (specific values removed)"""
+    if 'Temperature' in factor:
+        return 'Temperature Stress'
+    elif 'Rainfall' in factor or 'rainfall' in factor:
+        return 'Water Availability'
+    elif 'humidity' in factor:
+        return 'Humidity Issues'
+    elif 'wind' in factor:
+        return 'Wind Damage'
+    elif 'Pest' in factor:
+        return 'Pest Damage'
+    elif 'Disease' in factor:
+        return 'Disease Outbreak'
+    elif 'Extreme' in factor:
+        return 'Extreme Weather'
+    return 'Other Factors'
+
+def failure_percentages(factor_counts: Dict[str, int], total_failed: int) -> Dict[str, float]:
+    """Factor counts over failed runs as percentages, most frequent first"""
+    if not total_failed:
+        return {}
     factor_percentages = {
         k: (v / total_failed) * 100 
         for k, v in factor_counts.items()
     }
     
-    return dict(sorted(factor_percentages.items(), key=lambda x: x[1], reverse=True))
\ No newline at end of file
+    return dict(sorted(factor_percentages.items(), key=lambda x: x[1], reverse=True))
+
+
+def estimate_intervals(successes: int, yields: Sequence[float], z: float = 1.96) -> Dict[str, Tuple[float, float]]:
+    """
+    Confidence intervals of the success probability and expected yield.
+    
+    Used when a simulation stops early: the fewer runs, the wider the
+    intervals. Success probability uses the Wilson score interval, which
+    stays inside [0, 1] when nearly all runs succeed or fail.
+    
+    Args:
+        successes: Number of successful runs
+        yields: Yields of all runs
+        z: Standard normal quantile (1.96 for 95%)
+        
+    Returns:
+        {'success_probability': (low, high), 'expected_yield': (low, high)}
+    """
+    n = len(yields)
+    if not n:
+        return {'success_probability': (0.0, 1.0), 'expected_yield': (0.0, 0.0)}
+    
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    centre = (p + z ** 2 / (2 * n)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    
+    mean = sum(yields) / n
+    std = (sum((y - mean) ** 2 for y in yields) / n) ** 0.5
+    yield_margin = z * std / math.sqrt(n)
+    
+    return {
+        'success_probability': (max(0.0, centre - margin), min(1.0, centre + margin)),
+        'expected_yield': (mean - yield_margin, mean + yield_margin)
+    }
@@ -1,6 +1,92 @@
 import random
 #import numpy as np
-from typing import List, Dict, Tuple
+from array import array
+from typing import List, Dict, Tuple, Optional, Iterator
+
+# Random event probabilities per run
+PEST_PROBABILITY = 0.05
+DISEASE_PROBABILITY = 0.03
+EXTREME_WEATHER_PROBABILITY = 0.02
+
+# Event flags packed into RunDraws.events
+_PEST, _DISEASE, _EXTREME = 1, 2, 4
+
+
+class RunDraws:
+    """
+    The random draws of a simulation, independent of its inputs.
+    
+    Weather is kept as standard normal deviates and random events as flags,
+    so the same draws can be re-scored after an input changes: each run's
+    weather becomes the new mean plus the same deviate times the new spread.
+    Re-scoring with unchanged inputs reproduces the original runs exactly.
+    Takes 33 bytes per run.
+    """
+    
+    def __init__(self, seed: int):
+        """
+        Args:
+            seed: Seed the draws were sampled with
+        """
+        self.seed = seed
+        self.temp = array('d')
+        self.rainfall = array('d')
+        self.humidity = array('d')
+        self.wind = array('d')
+        self.events = bytearray()
+    
+    def append(self, z_temp, z_rainfall, z_humidity, z_wind, pest, disease, extreme):
+        self.temp.append(z_temp)
+        self.rainfall.append(z_rainfall)
+        self.humidity.append(z_humidity)
+        self.wind.append(z_wind)
+        self.events.append((pest and _PEST) | (disease and _DISEASE) | (extreme and _EXTREME))
+    
+    def __len__(self) -> int:
+        return len(self.events)
+    
+    def __iter__(self) -> Iterator[Tuple[float, float, float, float, bool, bool, bool]]:
+        for z_temp, z_rainfall, z_humidity, z_wind, flags in zip(
+            self.temp, self.rainfall, self.humidity, self.wind, self.events
+        ):
+            yield (
+                z_temp, z_rainfall, z_humidity, z_wind,
+                bool(flags & _PEST), bool(flags & _DISEASE), bool(flags & _EXTREME)
+            )
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self) * (4 * self.temp.itemsize + 1)
+    
+    @classmethod
+    def sample(cls, runs: int, seed: Optional[int] = None) -> 'RunDraws':
+        """
+        Sample the draws of a simulation.
+        
+        Args:
+            runs: Number of simulation iterations
+            seed: Random seed (drawn at random if omitted); a simulator with
+                the same seed samples the same draws
+        """
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        draws = cls(seed)
+        for draw in _iter_draws(random.Random(seed), runs):
+            draws.append(*draw)
+        return draws
+
+
+def _iter_draws(rng: random.Random, runs: int) -> Iterator[Tuple[float, float, float, float, bool, bool, bool]]:
+    gauss, uniform = rng.gauss, rng.random
+    for iteration in range(runs):
+        # Weather deviates, then random events (pests, disease, extreme weather)
+        yield (
+            gauss(0.0, 1.0), gauss(0.0, 1.0), gauss(0.0, 1.0), gauss(0.0, 1.0),
+            uniform() < PEST_PROBABILITY,
+            uniform() < DISEASE_PROBABILITY,
+            uniform() < EXTREME_WEATHER_PROBABILITY
+        )
+
 
 class MonteCarloSimulator:
     """
@@ -8,7 +94,15 @@ class MonteCarloSimulator:
     Runs thousands of randomized scenarios to compute probabilistic outcomes.
     """
     
-    def __init__(self, crop_profile: Dict, environment: Dict, penalty_engine, runs: int = 10000):
+    def __init__(
+        self,
+        crop_profile: Dict,
+        environment: Dict,
+        penalty_engine,
+        runs: int = 10000,
+        seed: Optional[int] = None,
+        draws: Optional[RunDraws] = None
+    ):
         """
         Initialize simulator
         
@@ -17,12 +111,21 @@ class MonteCarloSimulator:
             environment: Environmental conditions
             penalty_engine: PenaltyEngine instance
             runs: Number of simulation iterations
+            seed: Random seed; the same seed and inputs reproduce the same
+                runs. A fresh seed is drawn (and kept in self.seed) if omitted.
+            draws: Previously sampled draws (RunDraws.sample) to re-score
+                instead of sampling; they set the runs and seed
         """
         self.crop = crop_profile
         self.env = environment
         self.penalty_engine = penalty_engine
+        self.draws = draws
+        if draws is not None:
+            runs, seed = len(draws), draws.seed
         self.runs = runs
         self.results = []
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
         
         # Extract crop requirements
         self.temp_min = crop_profile.get('temp_min', 15)
@@ -31,6 +134,8 @@ class MonteCarloSimulator:
         self.rainfall_max = crop_profile.get('rainfall_max', 2000)
         self.ideal_yield = crop_profile.get('ideal_yield', 5000)
         self.humidity_tolerance = crop_profile.get('humidity_tolerance', 0.7)
+        # Depends on terrain and crop only, so it is the same for every run
+        self.terrain_penalty = penalty_engine.calculate_terrain_penalty()
         
     def run(self) -> List[Dict]:
         """
@@ -39,17 +144,39 @@ class MonteCarloSimulator:
         Returns:
             List of simulation results, each containing success status, yield, and reasons
         """
-        for iteration in range(self.runs):
-            # Randomize environmental factors with realistic variance
-            temp = self._randomize_temperature()
-            rainfall = self._randomize_rainfall()
-            humidity = self._randomize_humidity()
-            wind = self._randomize_wind()
-            
-            # Simulate random events (pests, disease, extreme weather)
-            pest_event = random.random() < 0.05  # 5% chance
-            disease_event = random.random() < 0.03  # 3% chance
-            extreme_weather = random.random() < 0.02  # 2% chance
+        for result in self.iter_runs():
+            self.results.append(result)
+        
+        return self.results
+    
+    def iter_runs(self) -> Iterator[Dict]:
+        """
+        Generate simulation results one run at a time without keeping them.
+        
+        Yields the same sequence as run() for the same seed, so raw runs of a
+        stored simulation can be streamed with constant memory. With draws,
+        those are re-scored instead of sampling new ones.
+        """
+        draws = iter(self.draws) if self.draws is not None else _iter_draws(self.rng, self.runs)
+        # Environmental factors vary around the inputs: mean + z * spread,
+        # exactly as random.gauss(mean, spread) computes it
+        base_temp = self.env['avg_temp']
+        base_rainfall = self.env['avg_rainfall']
+        base_humidity = self.env['humidity']
+        base_wind = self.env['wind_speed']
+        # Standard deviation of 3°C to simulate daily/seasonal variation
+        temp_spread = 3.0
+        # Rainfall has high variance (20-30%)
+        rainfall_spread = base_rainfall * 0.25
+        # Lower variance for humidity (10%)
+        humidity_spread = 10
+        wind_spread = base_wind * 0.3
+        
+        for z_temp, z_rainfall, z_humidity, z_wind, pest_event, disease_event, extreme_weather in draws:
+            temp = base_temp + z_temp * temp_spread
+            rainfall = max(0, base_rainfall + z_rainfall * rainfall_spread)
+            humidity = max(0, min(100, base_humidity + z_humidity * humidity_spread))
+            wind = max(0, base_wind + z_wind * wind_spread)
             
             # Evaluate this simulation run
             success, yield_value, limiting_factors = self._evaluate_run(
@@ -57,7 +184,7 @@ class MonteCarloSimulator:
                 pest_event, disease_event, extreme_weather
             )
             
-            self.results.append({
+            yield {
                 "success": success,
                 "yield": yield_value,
                 "limiting_factors": limiting_factors,
@@ -67,33 +194,7 @@ class MonteCarloSimulator:
                 "had_pest": pest_event,
                 "had_disease": disease_event,
                 "had_extreme_weather": extreme_weather
-            })
-        
-        return self.results
-    
-    def _randomize_temperature(self) -> float:
-        """Generate randomized temperature with seasonal variance"""
-        base_temp = self.env['avg_temp']
-        # Standard deviation of 3°C to simulate daily/seasonal variation
-        return random.gauss(base_temp, 3.0)
-    
-    def _randomize_rainfall(self) -> float:
-        """Generate randomized rainfall with high variance"""
-        base_rainfall = self.env['avg_rainfall']
-        # Rainfall has high variance (20-30%)
-        std_dev = base_rainfall * 0.25
-        return max(0, random.gauss(base_rainfall, std_dev))
-    
-    def _randomize_humidity(self) -> float:
-        """Generate randomized humidity"""
-        base_humidity = self.env['humidity']
-        # Lower variance for humidity (10%)
-        return max(0, min(100, random.gauss(base_humidity, 10)))
-    
-    def _randomize_wind(self) -> float:
-        """Generate randomized wind speed"""
-        base_wind = self.env['wind_speed']
-        return max(0, random.gauss(base_wind, base_wind * 0.3))
+            }
     
     def _evaluate_run(
         self, 
@@ -160,8 +261,7 @@ class MonteCarloSimulator:
             penalty_multiplier *= 0.5
         
         # Apply terrain-based penalties from penalty engine
-        terrain_penalty = self.penalty_engine.calculate_terrain_penalty()
-        penalty_multiplier *= (1 - terrain_penalty)
+        penalty_multiplier *= (1 - self.terrain_penalty)
         
         # Apply mismatch penalties for override scenarios
         mismatch_penalty = self.penalty_engine.calculate_mismatch_penalty(
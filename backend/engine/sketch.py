@@ -0,0 +1,179 @@
+"""
+Compact distribution summaries of simulation results.
+
+A summary keeps what history and comparison views need from the full set
+of Monte Carlo runs in a few hundred bytes of JSON: yield quantiles, a
+fixed-range yield histogram, failure factor frequencies, and the seed and
+engine version needed to regenerate the raw runs exactly.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from .scoring import analyze_failure_patterns
+
+SUMMARY_FORMAT = 1
+
+QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+# Histogram bins span [0, ideal yield]; yields never exceed the ideal yield
+HISTOGRAM_BINS = 20
+
+
+def _quantile(sorted_values: Sequence[float], q: float) -> float:
+    """Linearly interpolated quantile of pre-sorted values"""
+    position = q * (len(sorted_values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def _quantile_key(q: float) -> str:
+    return f"p{round(q * 100):02d}"
+
+
+# Environment fields kept at full precision so the runs can be regenerated
+INPUT_FIELDS = ('avg_temp', 'avg_rainfall', 'humidity', 'wind_speed')
+
+
+def summarize(
+    results: List[Dict],
+    ideal_yield: float,
+    seed: Optional[int] = None,
+    environment: Optional[Dict] = None
+) -> Dict:
+    """
+    Build a compact summary of simulation results.
+
+    Args:
+        results: Per-run results from MonteCarloSimulator.run()
+        ideal_yield: Crop ideal yield (upper bound of the histogram range)
+        seed: Seed the runs were generated with
+        environment: Environment the runs were generated from; its inputs
+            are kept exactly (database columns may round them)
+
+    Returns:
+        JSON-serializable summary dictionary
+    """
+    yields = sorted(r['yield'] for r in results)
+    successes = sum(1 for r in results if r['success'])
+    return build_summary(yields, successes, analyze_failure_patterns(results), ideal_yield, seed, environment)
+
+
+def build_summary(
+    yields: Sequence[float],
+    successes: int,
+    factors: Dict[str, float],
+    ideal_yield: float,
+    seed: Optional[int] = None,
+    environment: Optional[Dict] = None
+) -> Dict:
+    """
+    Build a summary from already aggregated runs (see summarize).
+
+    Args:
+        yields: Yields of all runs, sorted ascending
+        successes: Number of successful runs
+        factors: Failure factor frequencies (scoring.analyze_failure_patterns)
+        ideal_yield: Crop ideal yield (upper bound of the histogram range)
+        seed: Seed the runs were generated with
+        environment: Environment the runs were generated from
+
+    Returns:
+        JSON-serializable summary dictionary
+    """
+    from . import __version__
+
+    n = len(yields)
+    summary = {
+        'format': SUMMARY_FORMAT,
+        'engine_version': __version__,
+        'seed': seed,
+        'runs': n,
+    }
+    if environment is not None:
+        summary['inputs'] = {field: environment.get(field) for field in INPUT_FIELDS}
+    if not n:
+        return summary
+
+    mean = sum(yields) / n
+    std = (sum((y - mean) ** 2 for y in yields) / n) ** 0.5
+
+    upper = float(ideal_yield) if ideal_yield and ideal_yield > 0 else (yields[-1] or 1.0)
+    counts = [0] * HISTOGRAM_BINS
+    for y in yields:
+        counts[min(HISTOGRAM_BINS - 1, int(y / upper * HISTOGRAM_BINS))] += 1
+
+    summary.update({
+        'success_rate': round(successes / n, 4),
+        # Yields in whole kg/ha keep the summary to a few hundred bytes
+        'yield': {
+            'mean': round(mean),
+            'std': round(std),
+            'min': round(yields[0]),
+            'max': round(yields[-1]),
+        },
+        'quantiles': {_quantile_key(q): round(_quantile(yields, q)) for q in QUANTILES},
+        'histogram': {'max': round(upper), 'counts': counts},
+        'factors': {k: round(v, 1) for k, v in factors.items()},
+    })
+    return summary
+
+
+def histogram_cdf(summary: Dict) -> List[float]:
+    """Cumulative fraction of runs at each histogram bin's upper edge"""
+    counts = summary['histogram']['counts']
+    total = sum(counts) or 1
+    cdf, running = [], 0
+    for count in counts:
+        running += count
+        cdf.append(running / total)
+    return cdf
+
+
+def compare_summaries(base: Dict, other: Dict) -> Dict:
+    """
+    Compare two simulation summaries without re-running either.
+
+    Args:
+        base: Reference summary
+        other: Summary compared against the reference
+
+    Raises:
+        ValueError: if either summary has no runs
+
+    Returns:
+        Differences (other - base) in success rate, mean yield and each
+        quantile; a histogram distance (max CDF gap, Kolmogorov-Smirnov
+        style) when both histograms cover the same range; and factor
+        frequency changes
+    """
+    if 'yield' not in base or 'yield' not in other:
+        raise ValueError("Cannot compare summaries without runs")
+
+    comparison = {
+        'success_rate_delta': round(other.get('success_rate', 0) - base.get('success_rate', 0), 4),
+        'mean_yield_delta': other['yield']['mean'] - base['yield']['mean'],
+        'quantile_deltas': {
+            key: other['quantiles'][key] - value
+            for key, value in base.get('quantiles', {}).items()
+            if key in other.get('quantiles', {})
+        },
+        'histogram_distance': None,
+        'factor_deltas': {
+            factor: round(other.get('factors', {}).get(factor, 0) - base.get('factors', {}).get(factor, 0), 1)
+            for factor in sorted(set(base.get('factors', {})) | set(other.get('factors', {})))
+        },
+        'same_engine_version': base.get('engine_version') == other.get('engine_version'),
+    }
+
+    base_hist, other_hist = base.get('histogram'), other.get('histogram')
+    same_bins = (
+        base_hist and other_hist and base_hist['max'] == other_hist['max']
+        and len(base_hist['counts']) == len(other_hist['counts'])
+    )
+    if same_bins:
+        comparison['histogram_distance'] = round(max(
+            abs(a - b) for a, b in zip(histogram_cdf(base), histogram_cdf(other))
+        ), 4)
+    return comparison
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for the simulation API.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Request handling uses lightweight threads (gthread): /health, /api/crops and
+/api/weather are I/O bound and are served concurrently by the threads, while
+with SIMULATION_EXECUTION=pool (or auto) the CPU-bound Monte Carlo loop runs in each
+worker's pre-warmed simulation process pool.
+
+Asynchronous jobs and what-if sessions are held in the worker that created
+them. With WEB_CONCURRENCY > 1 the API runs would-be jobs on the process pool
+instead, and what-if clients need sticky routing to one worker.
+"""
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+threads = int(os.getenv("WEB_THREADS", 16))
+timeout = int(os.getenv("WEB_TIMEOUT", 180))
+
+# The process pool must be created after fork, never in the master
+preload_app = False
+
+
+def post_worker_init(worker):
+    """Start and pre-warm the simulation pool before the worker takes traffic"""
+    import app as application
+    if application.SIMULATION_EXECUTION in ('pool', 'auto'):
+        application.get_simulation_pool()
+
+
+def worker_exit(server, worker):
+    import app as application
+    pool = application.simulation_pool_resource.peek()
+    if pool is not None:
+        pool.shutdown(wait=False)
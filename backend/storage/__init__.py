@@ -0,0 +1,86 @@
+"""
+Pluggable storage for crops, terrain modifiers, simulations and feedback.
+
+Modules:
+    base: StorageProvider interface
+    supabase_storage: Supabase (PostgREST) provider
+    sqlite_storage: Embedded SQLite provider (WAL mode)
+    guarded: Timeouts and a circuit breaker around a remote provider
+"""
+
+import logging
+import os
+from typing import Optional
+
+from utils.logging_utils import get_logger, log_event
+
+from .base import StorageProvider
+from .supabase_storage import SupabaseStorage, connect_supabase
+from .sqlite_storage import SQLiteStorage
+from .guarded import CircuitBreaker, GuardedStorage, StorageUnavailableError
+
+DEFAULT_SQLITE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'terrasim.db'
+)
+
+STORAGE_BACKENDS = ('auto', 'supabase', 'sqlite', 'none')
+
+logger = get_logger('terrasim.storage')
+
+
+def open_storage(backend: str = 'auto', sqlite_path: Optional[str] = None) -> Optional[StorageProvider]:
+    """
+    Open the configured storage provider.
+
+    Args:
+        backend: 'auto' (Supabase when configured, else SQLite), 'supabase',
+            'sqlite' or 'none'
+        sqlite_path: SQLite database file (default: backend/data/terrasim.db)
+
+    Returns:
+        StorageProvider, or None for mock mode (backend 'none', or
+        'supabase' without credentials)
+
+    Raises:
+        ValueError: for an unknown backend; connection errors are raised
+            for 'supabase' and fall back to SQLite for 'auto'
+    """
+    backend = backend.lower()
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    if backend in ('auto', 'supabase'):
+        try:
+            storage = connect_supabase()
+            if storage is None:
+                log_event(logger, logging.WARNING, 'database.unconfigured', detail="Supabase credentials not found")
+        except Exception as e:
+            log_event(logger, logging.WARNING, 'database.unavailable', error=str(e)[:100])
+            if backend == 'supabase':
+                raise
+            storage = None
+        if storage is not None:
+            log_event(logger, logging.INFO, 'database.connected')
+            return storage
+
+    if backend in ('auto', 'sqlite'):
+        path = sqlite_path or DEFAULT_SQLITE_PATH
+        storage = SQLiteStorage(path)
+        log_event(logger, logging.INFO, 'database.local', path=path)
+        return storage
+
+    log_event(logger, logging.WARNING, 'database.disabled', detail="Running in mock mode with hardcoded data")
+    return None
+
+
+__all__ = [
+    'StorageProvider',
+    'SupabaseStorage',
+    'SQLiteStorage',
+    'GuardedStorage',
+    'CircuitBreaker',
+    'StorageUnavailableError',
+    'connect_supabase',
+    'open_storage',
+    'DEFAULT_SQLITE_PATH'
+]
@@ -0,0 +1,106 @@
+"""
+Storage provider interface.
+
+Every read and write of crops, terrain modifiers, simulations and feedback
+goes through a StorageProvider, so the API runs unchanged against Supabase
+or the embedded SQLite store.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+
+class StorageProvider:
+    """
+    Base class for storage backends.
+
+    Rows are plain dicts keyed by the column names of
+    Database/supabase_schema.sql. Methods raise on backend errors; callers
+    decide whether to fall back to reference defaults.
+    """
+
+    name = 'base'
+
+    # ---- Reference data ----
+
+    def list_crops(self) -> List[Dict]:
+        """All crop profiles"""
+        raise NotImplementedError
+
+    def get_crop(self, name: str) -> Optional[Dict]:
+        """Crop profile by name, or None"""
+        raise NotImplementedError
+
+    def list_terrain_modifiers(self) -> List[Dict]:
+        """All terrain_modifiers rows"""
+        raise NotImplementedError
+
+    def get_terrain_modifiers(self, terrain: str) -> Optional[Dict]:
+        """terrain_modifiers row for a terrain type, or None"""
+        raise NotImplementedError
+
+    # ---- Simulations ----
+
+    def insert_simulation(self, record: Dict) -> Dict:
+        """
+        Persist one simulation.
+
+        Returns:
+            The stored row, including the generated id and created_at
+        """
+        return self.insert_simulations([record])[0]
+
+    def insert_simulations(self, records: Sequence[Dict]) -> List[Dict]:
+        """Persist many simulations in one round trip / transaction"""
+        raise NotImplementedError
+
+    def list_simulations(self, query: Dict) -> List[Dict]:
+        """
+        One page of history, newest first.
+
+        Args:
+            query: Parsed query from utils.history_query.parse_history_query
+
+        Returns:
+            Up to query['limit'] + 1 rows (the extra row signals a next page)
+        """
+        raise NotImplementedError
+
+    def get_simulation(self, simulation_id: str) -> Optional[Dict]:
+        """One simulation row by id, or None"""
+        rows = self.get_simulations([simulation_id])
+        return rows[0] if rows else None
+
+    def get_simulations(self, simulation_ids: Sequence[str]) -> List[Dict]:
+        """Simulation rows for the given ids (missing ids are skipped)"""
+        raise NotImplementedError
+
+    def recent_simulations(self, limit: int, columns: Sequence[str]) -> List[Dict]:
+        """The most recent simulations, newest first, projected to columns"""
+        raise NotImplementedError
+
+    # ---- Analytics ----
+
+    def list_rollups(self, query: Dict) -> List[Dict]:
+        """
+        Rollup rows matching an analytics query, merged over its group_by.
+
+        Args:
+            query: Parsed query from utils.rollups.parse_analytics_query
+
+        Returns:
+            One row per group with the group's key columns and the summed
+            counts and sums
+
+        Raises:
+            TooManyGroupsError: if more than MAX_ANALYTICS_GROUPS groups match
+        """
+        raise NotImplementedError
+
+    # ---- Feedback ----
+
+    def insert_feedback(self, record: Dict) -> Dict:
+        """Persist one user_feedback row and return it"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release connections"""
@@ -0,0 +1,212 @@
+"""
+Timeouts and a circuit breaker around a remote storage provider.
+
+GuardedStorage wraps another StorageProvider. Every call runs on a small
+thread pool and is abandoned after a timeout. Failures and timeouts are
+counted by a circuit breaker: after `failure_threshold` consecutive failures
+it opens and calls fail immediately (reference data is served from the last
+successful reads instead) until `reset_timeout` has passed; then a single
+probe call is let through (half-open) and its outcome closes or re-opens
+the breaker.
+
+Callers keep their existing fallbacks: a failed call raises, and the error
+now arrives in milliseconds instead of after the database's own timeout.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Sequence
+
+from utils.logging_utils import get_logger, log_event
+from utils.metrics import STORAGE_CALLS
+
+from .base import StorageProvider
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+logger = get_logger('terrasim.storage')
+
+
+class StorageUnavailableError(RuntimeError):
+    """Raised when a storage call is refused by the open breaker or times out"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a probe
+            clock: Monotonic time source
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the probe when half-open)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                log_event(logger, logging.INFO, 'storage.breaker_closed')
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    log_event(logger, logging.WARNING, 'storage.breaker_opened', failures=self._failures)
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class GuardedStorage(StorageProvider):
+    """StorageProvider wrapper adding per-call timeouts and a circuit breaker"""
+
+    # Reads whose last successful result is served while storage is unavailable
+    CACHED_READS = ('list_crops', 'get_crop', 'list_terrain_modifiers', 'get_terrain_modifiers')
+    # Results kept for them; misses (None) are never cached, and the least
+    # recently used result goes first
+    CACHE_SIZE = 256
+
+    def __init__(
+        self,
+        inner: StorageProvider,
+        timeout: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        workers: int = 8
+    ):
+        """
+        Args:
+            inner: Provider doing the actual reads and writes
+            timeout: Seconds before a call is abandoned and counted as failed
+            breaker: Circuit breaker (default: 5 failures, 30 s reset)
+            workers: Threads running calls; a hung call holds one until the
+                provider's own timeout releases it
+        """
+        self.inner = inner
+        self.name = inner.name
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='storage-call')
+        self._cache: 'OrderedDict[tuple, object]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _call(self, method: str, *args):
+        key = (method,) + args
+        cached = method in self.CACHED_READS
+        if not self.breaker.allow():
+            return self._fallback(method, key, cached, 'rejected', "Storage circuit breaker is open")
+
+        future = self._executor.submit(getattr(self.inner, method), *args)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.breaker.record_failure()
+            return self._fallback(method, key, cached, 'timeout', f"Storage call {method} timed out")
+        except Exception:
+            self.breaker.record_failure()
+            STORAGE_CALLS.inc(method=method, outcome='error')
+            found, value = self._cached(key) if cached else (False, None)
+            if found:
+                return value
+            raise
+
+        self.breaker.record_success()
+        STORAGE_CALLS.inc(method=method, outcome='ok')
+        if cached and result is not None:
+            with self._cache_lock:
+                self._cache[key] = result
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _cached(self, key: tuple):
+        with self._cache_lock:
+            if key not in self._cache:
+                return False, None
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    def _fallback(self, method: str, key: tuple, cached: bool, outcome: str, message: str):
+        found, value = self._cached(key) if cached else (False, None)
+        if found:
+            STORAGE_CALLS.inc(method=method, outcome='cached')
+            return value
+        STORAGE_CALLS.inc(method=method, outcome=outcome)
+        raise StorageUnavailableError(message)
+
+    def list_crops(self) -> List[Dict]:
+        return self._call('list_crops')
+
+    def get_crop(self, name: str) -> Optional[Dict]:
+        return self._call('get_crop', name)
+
+    def list_terrain_modifiers(self) -> List[Dict]:
+        return self._call('list_terrain_modifiers')
+
+    def get_terrain_modifiers(self, terrain: str) -> Optional[Dict]:
+        return self._call('get_terrain_modifiers', terrain)
+
+    def insert_simulations(self, records: Sequence[Dict]) -> List[Dict]:
+        return self._call('insert_simulations', records)
+
+    def list_simulations(self, query: Dict) -> List[Dict]:
+        return self._call('list_simulations', query)
+
+    def get_simulations(self, simulation_ids: Sequence[str]) -> List[Dict]:
+        return self._call('get_simulations', simulation_ids)
+
+    def recent_simulations(self, limit: int, columns: Sequence[str]) -> List[Dict]:
+        return self._call('recent_simulations', limit, columns)
+
+    def list_rollups(self, query: Dict) -> List[Dict]:
+        return self._call('list_rollups', query)
+
+    def insert_feedback(self, record: Dict) -> Dict:
+        return self._call('insert_feedback', record)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.inner.close()
@@ -0,0 +1,472 @@
+"""
+Embedded SQLite storage provider.
+
+Mirrors the tables and indexes of Database/supabase_schema.sql in a local
+database file so single-node and edge deployments keep persistent history
+without a network hop. The database runs in WAL mode: each thread has its
+own connection, readers never block the writer, and bulk inserts go through
+executemany in a single transaction.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from utils.history_query import HISTORY_COLUMNS
+from utils.reference_data import MOCK_CROPS, TERRAIN_DEFAULTS
+from utils.rollups import (
+    ROLLUP_KEY_COLUMNS, ROLLUP_VALUE_COLUMNS, MAX_ANALYTICS_GROUPS, rollup_delta, merge_deltas,
+    group_columns, check_groups
+)
+
+from .base import StorageProvider
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crops (
+    id TEXT PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    category TEXT NOT NULL,
+    temp_min REAL NOT NULL,
+    temp_max REAL NOT NULL,
+    temp_optimal REAL,
+    rainfall_min INTEGER NOT NULL,
+    rainfall_max INTEGER NOT NULL,
+    rainfall_optimal INTEGER,
+    humidity_min REAL DEFAULT 40,
+    humidity_max REAL DEFAULT 90,
+    humidity_tolerance REAL DEFAULT 0.7,
+    soil_ph_min REAL DEFAULT 5.5,
+    soil_ph_max REAL DEFAULT 8.0,
+    soil_type TEXT,
+    root_depth TEXT DEFAULT 'medium',
+    salt_tolerance TEXT DEFAULT 'low',
+    growing_season_days INTEGER DEFAULT 120,
+    ideal_yield INTEGER NOT NULL,
+    description TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS terrain_modifiers (
+    id TEXT PRIMARY KEY,
+    terrain_type TEXT UNIQUE NOT NULL,
+    water_retention_factor REAL NOT NULL,
+    soil_depth_factor REAL NOT NULL,
+    erosion_risk REAL NOT NULL,
+    drainage_quality REAL,
+    temp_modifier REAL DEFAULT 0.0,
+    wind_exposure REAL DEFAULT 0.5,
+    description TEXT,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS simulations (
+    id TEXT PRIMARY KEY,
+    crop_name TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    terrain TEXT NOT NULL,
+    avg_temp REAL,
+    avg_rainfall INTEGER,
+    humidity REAL,
+    wind_speed REAL,
+    success_probability REAL NOT NULL,
+    expected_yield REAL NOT NULL,
+    risk_level TEXT NOT NULL,
+    is_override INTEGER DEFAULT 0,
+    simulation_runs INTEGER DEFAULT 10000,
+    explanation TEXT,
+    created_at TEXT NOT NULL,
+    summary TEXT
+);
+
+CREATE TABLE IF NOT EXISTS user_feedback (
+    id TEXT PRIMARY KEY,
+    simulation_id TEXT REFERENCES simulations(id) ON DELETE CASCADE,
+    accuracy_rating INTEGER CHECK (accuracy_rating >= 1 AND accuracy_rating <= 5),
+    actual_yield REAL,
+    comments TEXT,
+    created_at TEXT NOT NULL
+);
+
+-- Incrementally maintained aggregates for /api/analytics
+CREATE TABLE IF NOT EXISTS simulation_rollups (
+    week_start TEXT NOT NULL,
+    crop_name TEXT NOT NULL,
+    terrain TEXT NOT NULL,
+    region_lat REAL NOT NULL,
+    region_lon REAL NOT NULL,
+    simulation_count INTEGER NOT NULL DEFAULT 0,
+    sum_success_probability REAL NOT NULL DEFAULT 0,
+    sum_expected_yield REAL NOT NULL DEFAULT 0,
+    low_risk_count INTEGER NOT NULL DEFAULT 0,
+    medium_risk_count INTEGER NOT NULL DEFAULT 0,
+    high_risk_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week_start, crop_name, terrain, region_lat, region_lon)
+);
+
+CREATE INDEX IF NOT EXISTS idx_crops_category ON crops(category);
+CREATE INDEX IF NOT EXISTS idx_simulations_location ON simulations(latitude, longitude);
+CREATE INDEX IF NOT EXISTS idx_simulations_created_id ON simulations(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_simulations_crop_created ON simulations(crop_name, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_simulations_terrain_created ON simulations(terrain, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_simulations_risk_created ON simulations(risk_level, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_feedback_simulation ON user_feedback(simulation_id);
+CREATE INDEX IF NOT EXISTS idx_rollups_crop_week ON simulation_rollups(crop_name, week_start);
+"""
+
+ROLLUP_UPSERT = (
+    f"INSERT INTO simulation_rollups ({','.join(ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS)}) "
+    f"VALUES ({','.join('?' for _ in ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS)}) "
+    f"ON CONFLICT ({','.join(ROLLUP_KEY_COLUMNS)}) DO UPDATE SET "
+    + ', '.join(f'{column} = {column} + excluded.{column}' for column in ROLLUP_VALUE_COLUMNS)
+)
+
+SIMULATION_COLUMNS = HISTORY_COLUMNS
+
+FEEDBACK_COLUMNS = ('id', 'simulation_id', 'accuracy_rating', 'actual_yield', 'comments', 'created_at')
+
+CROP_COLUMNS = (
+    'id', 'name', 'category', 'temp_min', 'temp_max', 'temp_optimal',
+    'rainfall_min', 'rainfall_max', 'rainfall_optimal',
+    'humidity_min', 'humidity_max', 'humidity_tolerance',
+    'soil_ph_min', 'soil_ph_max', 'soil_type', 'root_depth', 'salt_tolerance',
+    'growing_season_days', 'ideal_yield', 'description', 'created_at', 'updated_at'
+)
+
+TERRAIN_COLUMNS = (
+    'id', 'terrain_type', 'water_retention_factor', 'soil_depth_factor', 'erosion_risk',
+    'drainage_quality', 'temp_modifier', 'wind_exposure', 'description', 'created_at'
+)
+
+
+def utc_timestamp(value: Optional[datetime] = None) -> str:
+    """
+    Fixed-width ISO 8601 UTC timestamp.
+
+    Always carries microseconds and an explicit offset so timestamps sort
+    correctly as text, which the keyset indexes rely on.
+    """
+    value = value or datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f+00:00')
+
+
+def _normalize_timestamp(value: str) -> str:
+    return utc_timestamp(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
+# Columns added after the first release, applied to existing databases
+MIGRATIONS = (
+    ('simulations', 'summary', 'TEXT'),
+)
+
+
+def _row_to_simulation(row: sqlite3.Row) -> Dict:
+    record = dict(row)
+    if record.get('is_override') is not None:
+        record['is_override'] = bool(record['is_override'])
+    if isinstance(record.get('summary'), str):
+        record['summary'] = json.loads(record['summary'])
+    return record
+
+
+class SQLiteStorage(StorageProvider):
+    """StorageProvider backed by a local SQLite database file"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, seed_reference_data: bool = True):
+        """
+        Open (creating if needed) the database.
+
+        Args:
+            path: Database file path, or ':memory:' for a private in-memory
+                database (one shared connection; used by tests)
+            seed_reference_data: Populate empty crops and terrain_modifiers
+                tables with the built-in reference data
+        """
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._shared = None
+
+        if path == ':memory:':
+            self._shared = self._open()
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        with self._write_lock:
+            self._migrate(connection)
+            connection.executescript(SCHEMA)
+            if seed_reference_data:
+                self._seed(connection)
+            self._backfill_rollups(connection)
+            connection.commit()
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        if self.path != ':memory:':
+            connection.execute('PRAGMA journal_mode=WAL')
+            # WAL keeps committed transactions durable across application
+            # crashes with NORMAL; only an OS crash can lose the last commits
+            connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('PRAGMA busy_timeout=5000')
+        # Off by default and set per connection; feedback references simulations
+        connection.execute('PRAGMA foreign_keys=ON')
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._shared is not None:
+            return self._shared
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._open()
+        return connection
+
+    @contextmanager
+    def _read(self):
+        if self._shared is not None:
+            # A single in-memory connection cannot interleave statements
+            with self._write_lock:
+                yield self._shared
+        else:
+            yield self._connection()
+
+    @contextmanager
+    def _transaction(self):
+        """Serialize this process's writers and commit (or roll back) as one unit"""
+        connection = self._connection()
+        with self._write_lock:
+            try:
+                yield connection
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def _seed(self, connection: sqlite3.Connection):
+        now = utc_timestamp()
+        if connection.execute('SELECT COUNT(*) FROM crops').fetchone()[0] == 0:
+            rows = []
+            for crop in MOCK_CROPS:
+                row = {column: crop.get(column) for column in CROP_COLUMNS}
+                row.update(id=str(uuid.uuid4()), created_at=now, updated_at=now)
+                rows.append(row)
+            self._insert_rows(connection, 'crops', CROP_COLUMNS, rows, defaults=True)
+        if connection.execute('SELECT COUNT(*) FROM terrain_modifiers').fetchone()[0] == 0:
+            rows = []
+            for terrain, modifiers in TERRAIN_DEFAULTS.items():
+                row = {column: modifiers.get(column) for column in TERRAIN_COLUMNS}
+                row.update(id=str(uuid.uuid4()), terrain_type=terrain, created_at=now)
+                rows.append(row)
+            self._insert_rows(connection, 'terrain_modifiers', TERRAIN_COLUMNS, rows, defaults=True)
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection):
+        """Add columns missing from tables created by an older schema"""
+        for table, column, column_type in MIGRATIONS:
+            existing = {row[1] for row in connection.execute(f'PRAGMA table_info({table})')}
+            if existing and column not in existing:
+                connection.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+
+    def _backfill_rollups(self, connection: sqlite3.Connection):
+        """Build rollups for databases created before the rollup table existed"""
+        if connection.execute('SELECT 1 FROM simulation_rollups LIMIT 1').fetchone():
+            return
+        rows = connection.execute(
+            'SELECT crop_name, terrain, latitude, longitude, success_probability, '
+            'expected_yield, risk_level, created_at FROM simulations'
+        )
+        self._apply_rollups(connection, (dict(row) for row in rows))
+
+    @staticmethod
+    def _apply_rollups(connection: sqlite3.Connection, rows):
+        deltas = merge_deltas(rollup_delta(row) for row in rows)
+        connection.executemany(ROLLUP_UPSERT, [
+            tuple(delta[column] for column in ROLLUP_KEY_COLUMNS + ROLLUP_VALUE_COLUMNS)
+            for delta in deltas
+        ])
+
+    @staticmethod
+    def _insert_rows(
+        connection: sqlite3.Connection,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Dict],
+        defaults: bool = False
+    ):
+        """executemany insert; with defaults, columns left as None take the table default"""
+        if defaults:
+            groups: Dict[tuple, List[Dict]] = {}
+            for row in rows:
+                present = tuple(column for column in columns if row.get(column) is not None)
+                groups.setdefault(present, []).append(row)
+        else:
+            groups = {tuple(columns): list(rows)}
+        for present, group in groups.items():
+            placeholders = ','.join('?' for _ in present)
+            connection.executemany(
+                f"INSERT INTO {table} ({','.join(present)}) VALUES ({placeholders})",
+                [tuple(row.get(column) for column in present) for row in group]
+            )
+
+    # ---- Reference data ----
+
+    def list_crops(self) -> List[Dict]:
+        with self._read() as connection:
+            return [dict(row) for row in connection.execute('SELECT * FROM crops ORDER BY name')]
+
+    def get_crop(self, name: str) -> Optional[Dict]:
+        with self._read() as connection:
+            row = connection.execute('SELECT * FROM crops WHERE name = ? COLLATE NOCASE', (name,)).fetchone()
+        return dict(row) if row else None
+
+    def list_terrain_modifiers(self) -> List[Dict]:
+        with self._read() as connection:
+            return [dict(row) for row in connection.execute('SELECT * FROM terrain_modifiers ORDER BY terrain_type')]
+
+    def get_terrain_modifiers(self, terrain: str) -> Optional[Dict]:
+        with self._read() as connection:
+            row = connection.execute(
+                'SELECT * FROM terrain_modifiers WHERE terrain_type = ?', (terrain,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    # ---- Simulations ----
+
+    def insert_simulations(self, records: Sequence[Dict]) -> List[Dict]:
+        rows = []
+        for record in records:
+            row = {column: record.get(column) for column in SIMULATION_COLUMNS}
+            row['id'] = str(record.get('id') or uuid.uuid4())
+            row['created_at'] = (
+                _normalize_timestamp(record['created_at']) if record.get('created_at') else utc_timestamp()
+            )
+            if row['is_override'] is None:
+                row['is_override'] = False
+            if row['simulation_runs'] is None:
+                row['simulation_runs'] = 10000
+            rows.append(row)
+        stored = [
+            dict(row, summary=json.dumps(row['summary'], separators=(',', ':')))
+            if row['summary'] is not None else row
+            for row in rows
+        ]
+        if not rows:
+            return []
+
+        with self._transaction() as connection:
+            self._insert_rows(connection, 'simulations', SIMULATION_COLUMNS, stored)
+            # Rollups commit atomically with the rows they summarize
+            self._apply_rollups(connection, rows)
+        return rows
+
+    def list_simulations(self, query: Dict) -> List[Dict]:
+        columns = query['columns'] or SIMULATION_COLUMNS
+        clauses, params = [], []
+
+        for column, value in query['filters'].items():
+            clauses.append(f'{column} = ?')
+            params.append(value)
+        for column, (low, high) in query['ranges'].items():
+            if column == 'created_at':
+                low = _normalize_timestamp(low) if low is not None else None
+                high = _normalize_timestamp(high) if high is not None else None
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                params.append(high)
+        if query['cursor']:
+            created_at, row_id = query['cursor']
+            clauses.append('(created_at < ? OR (created_at = ? AND id < ?))')
+            params.extend([created_at, created_at, row_id])
+
+        sql = f"SELECT {','.join(columns)} FROM simulations"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(query['limit'] + 1)
+
+        with self._read() as connection:
+            return [_row_to_simulation(row) for row in connection.execute(sql, params)]
+
+    def get_simulations(self, simulation_ids: Sequence[str]) -> List[Dict]:
+        if not simulation_ids:
+            return []
+        placeholders = ','.join('?' for _ in simulation_ids)
+        with self._read() as connection:
+            rows = connection.execute(
+                f'SELECT * FROM simulations WHERE id IN ({placeholders})', list(simulation_ids)
+            )
+            return [_row_to_simulation(row) for row in rows]
+
+    def recent_simulations(self, limit: int, columns: Sequence[str]) -> List[Dict]:
+        unknown = [column for column in columns if column not in SIMULATION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        with self._read() as connection:
+            rows = connection.execute(
+                f"SELECT {','.join(columns)} FROM simulations ORDER BY created_at DESC, id DESC LIMIT ?",
+                (limit,)
+            )
+            return [_row_to_simulation(row) for row in rows]
+
+    # ---- Analytics ----
+
+    def list_rollups(self, query: Dict) -> List[Dict]:
+        clauses, params = [], []
+        for column, value in query['filters'].items():
+            clauses.append(f'{column} = ?')
+            params.append(value)
+        for column, (low, high) in query['ranges'].items():
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                params.append(high)
+
+        # Group in the database; group_total counts the groups before the limit
+        columns = group_columns(query['group_by'])
+        selected = columns + [f'SUM({column}) AS {column}' for column in ROLLUP_VALUE_COLUMNS]
+        sql = f"SELECT {', '.join(selected)}, COUNT(*) OVER () AS group_total FROM simulation_rollups"
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        if columns:
+            sql += f" GROUP BY {', '.join(columns)}"
+        sql += ' LIMIT ?'
+        params.append(MAX_ANALYTICS_GROUPS)
+
+        with self._read() as connection:
+            rows = [dict(row) for row in connection.execute(sql, params)]
+        return check_groups(rows)
+
+    # ---- Feedback ----
+
+    def insert_feedback(self, record: Dict) -> Dict:
+        row = {column: record.get(column) for column in FEEDBACK_COLUMNS}
+        row['id'] = str(uuid.uuid4())
+        row['created_at'] = utc_timestamp()
+        with self._transaction() as connection:
+            self._insert_rows(connection, 'user_feedback', FEEDBACK_COLUMNS, [row])
+        return row
+
+    def close(self):
+        connection = self._shared or getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+        self._shared = None
+        self._local = threading.local()
@@ -0,0 +1,116 @@
+"""
+Supabase (PostgREST) storage provider.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from utils.history_query import apply_supabase_query
+from utils.rollups import MAX_ANALYTICS_GROUPS, check_groups
+
+from .base import StorageProvider
+
+
+def _patch_httpx_proxy():
+    """Make httpx.Client ignore the proxy argument passed by supabase/gotrue"""
+    import httpx
+    if getattr(httpx.Client.__init__, '_terrasim_patched', False):
+        return
+    original_client_init = httpx.Client.__init__
+
+    def patched_init(self, *args, proxy=None, **kwargs):
+        # Ignore proxy parameter to avoid compatibility issues with supabase/gotrue
+        original_client_init(self, *args, **kwargs)
+
+    patched_init._terrasim_patched = True
+    httpx.Client.__init__ = patched_init
+
+
+def connect_supabase(url: Optional[str] = None, key: Optional[str] = None) -> Optional['SupabaseStorage']:
+    """
+    Connect to Supabase.
+
+    Args:
+        url: Project URL (default: Config.SUPABASE_URL)
+        key: API key (default: Config.SUPABASE_KEY)
+
+    Returns:
+        SupabaseStorage, or None when credentials are not configured
+    """
+    # Imported here: config imports this package for DEFAULT_SQLITE_PATH
+    from config import Config
+    url = url or Config.SUPABASE_URL
+    key = key or Config.SUPABASE_KEY
+    if not (url and key):
+        return None
+
+    # CRITICAL: Patch httpx BEFORE importing supabase to avoid proxy parameter error
+    _patch_httpx_proxy()
+    from supabase import create_client
+    return SupabaseStorage(create_client(url, key))
+
+
+class SupabaseStorage(StorageProvider):
+    """StorageProvider backed by a supabase-py client"""
+
+    name = 'supabase'
+
+    def __init__(self, client):
+        """
+        Args:
+            client: Client returned by supabase.create_client
+        """
+        self.client = client
+
+    def list_crops(self) -> List[Dict]:
+        return self.client.table('crops').select('*').execute().data or []
+
+    def get_crop(self, name: str) -> Optional[Dict]:
+        rows = self.client.table('crops').select('*').eq('name', name).execute().data
+        return rows[0] if rows else None
+
+    def list_terrain_modifiers(self) -> List[Dict]:
+        return self.client.table('terrain_modifiers').select('*').execute().data or []
+
+    def get_terrain_modifiers(self, terrain: str) -> Optional[Dict]:
+        rows = self.client.table('terrain_modifiers').select('*').eq('terrain_type', terrain).execute().data
+        return rows[0] if rows else None
+
+    def insert_simulations(self, records: Sequence[Dict]) -> List[Dict]:
+        if not records:
+            return []
+        return self.client.table('simulations').insert(list(records)).execute().data or []
+
+    def list_simulations(self, query: Dict) -> List[Dict]:
+        return apply_supabase_query(self.client.table('simulations'), query).execute().data or []
+
+    def get_simulations(self, simulation_ids: Sequence[str]) -> List[Dict]:
+        if not simulation_ids:
+            return []
+        return self.client.table('simulations').select('*').in_('id', list(simulation_ids)).execute().data or []
+
+    def recent_simulations(self, limit: int, columns: Sequence[str]) -> List[Dict]:
+        response = self.client.table('simulations').select(','.join(columns)).order(
+            'created_at', desc=True
+        ).limit(limit).execute()
+        return response.data or []
+
+    def list_rollups(self, query: Dict) -> List[Dict]:
+        # Rollups are maintained by the simulations_rollup trigger and grouped
+        # by the analytics_groups function (see supabase_schema.sql). Its
+        # group_total also catches rows cut off by PostgREST's max-rows.
+        params = {
+            'group_by': query['group_by'],
+            'p_crop': query['filters'].get('crop_name'),
+            'p_terrain': query['filters'].get('terrain'),
+            'max_groups': MAX_ANALYTICS_GROUPS,
+        }
+        for column, name in (('week_start', 'week'), ('region_lat', 'lat'), ('region_lon', 'lon')):
+            low, high = query['ranges'].get(column, (None, None))
+            params[f'p_{name}_min'] = low
+            params[f'p_{name}_max'] = high
+        rows = self.client.rpc('analytics_groups', params).execute().data or []
+        return check_groups(rows)
+
+    def insert_feedback(self, record: Dict) -> Dict:
+        rows = self.client.table('user_feedback').insert(record).execute().data
+        return rows[0] if rows else dict(record)
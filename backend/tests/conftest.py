@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the backend tests
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Settings config.Config reads at import: an in-memory store, no background
+# initialization and offline weather, whatever the developer's .env holds
+# (load_dotenv does not override variables that are already set). They are
+# set before any test module is collected, so config is never imported
+# with the developer's settings first.
+TEST_ENVIRONMENT = {
+    'STORAGE_BACKEND': 'sqlite',
+    'SQLITE_PATH': ':memory:',
+    'BACKGROUND_INIT': 'false',
+    'WEATHER_API_KEY': '',
+    'CLIMATOLOGY_PATH': '',
+}
+os.environ.update(TEST_ENVIRONMENT)
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    """The app module, imported with test settings"""
+    return pytest.importorskip('app')
@@ -0,0 +1,85 @@
+"""
+Tests for simulation admission control
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def queue(controller, client, order):
+    """Start a thread that waits for a slot, records its client and releases"""
+    def worker():
+        controller.acquire(client)
+        order.append(client)
+        controller.release(client)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    return thread
+
+
+class TestAdmissionController:
+    """Test slot limits, queue bounds, fairness and retry hints"""
+
+    def test_queue_full_rejected_with_retry_after(self):
+        controller = AdmissionController(max_concurrent=1, queue_depth=1, max_wait=5)
+        controller.acquire('a')
+        order = []
+        thread = queue(controller, 'b', order)
+        wait_until(lambda: controller.stats()['queued'] == 1)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.acquire('c')
+        assert rejected.value.reason == 'queue_full'
+        assert rejected.value.retry_after >= 1
+
+        controller.release('a')
+        thread.join()
+        assert order == ['b']
+        assert controller.stats()['running'] == 0 and controller.stats()['clients'] == 0
+
+    def test_wait_times_out(self):
+        controller = AdmissionController(max_concurrent=1, queue_depth=4, max_wait=0.05)
+        with controller.slot('a') as waited:
+            assert waited == 0.0
+            with pytest.raises(AdmissionRejected) as rejected:
+                controller.acquire('b')
+            assert rejected.value.reason == 'timeout'
+            assert controller.stats()['queued'] == 0
+        assert controller.stats()['running'] == 0
+
+    def test_slots_alternate_between_clients(self):
+        controller = AdmissionController(max_concurrent=1, queue_depth=10, max_wait=5)
+        controller.acquire('holder')
+        order, threads = [], []
+        for client in ('burst', 'burst', 'burst', 'other', 'other'):
+            threads.append(queue(controller, client, order))
+            wait_until(lambda: controller.stats()['queued'] == len(threads))
+        controller.release('holder')
+        for thread in threads:
+            thread.join()
+        assert order == ['burst', 'other', 'burst', 'other', 'burst']
+
+    def test_client_limit(self):
+        controller = AdmissionController(max_concurrent=4, queue_depth=4, client_limit=2)
+        controller.acquire('a')
+        controller.acquire('a')
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.acquire('a')
+        assert rejected.value.reason == 'client_limit'
+        controller.acquire('b')
+        assert controller.stats()['running'] == 3
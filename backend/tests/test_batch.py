@@ -0,0 +1,83 @@
+"""
+Tests for the offline batch runner
+"""
+
+import pytest
+import sys
+import os
+import csv
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.batch import (
+    ScenarioResolver, read_scenarios, run_batch, load_checkpoint, save_checkpoint
+)
+
+
+@pytest.fixture
+def scenario_file(tmp_path):
+    path = tmp_path / 'scenarios.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'crop', 'terrain', 'lat', 'lon', 'temp', 'rainfall', 'runs', 'seed'])
+        for i in range(10):
+            crop = 'Unknown' if i == 4 else ('Rice' if i % 2 else 'Wheat')
+            writer.writerow([f's{i}', crop, 'plain', 13.08, 80.27, 24 + i, 900 + 50 * i, 200, i])
+    return str(path)
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestBatchRunner:
+    """Test scenario parsing, ordered execution and checkpoint resume"""
+
+    def test_reads_flat_and_payload_scenarios(self, scenario_file, tmp_path):
+        scenario = next(read_scenarios(scenario_file))
+        assert scenario['location'] == {'lat': 13.08, 'lon': 80.27}
+        assert scenario['weather'] == {'temp': 24, 'rainfall': 900}
+        assert scenario['runs'] == 200 and scenario['seed'] == 0
+
+        jsonl = tmp_path / 'payloads.jsonl'
+        jsonl.write_text(json.dumps({'crop': 'Rice', 'terrain': 'plain', 'location': {'lat': 1, 'lon': 2}}) + '\n')
+        assert next(read_scenarios(str(jsonl)))['id'] == '1'
+
+    def test_results_in_input_order_with_errors(self, scenario_file, tmp_path):
+        output = str(tmp_path / 'results.jsonl')
+        stats = run_batch(scenario_file, output, ScenarioResolver(), workers=2)
+        rows = read_jsonl(output)
+        assert [row['id'] for row in rows] == [f's{i}' for i in range(10)]
+        assert rows[4]['error'] == 'Crop not found: Unknown'
+        assert rows[0]['simulation_runs'] == 200 and rows[0]['seed'] == 0
+        assert stats['done'] == 10 and stats['failed'] == 1
+        assert load_checkpoint(output)['finished'] is True
+
+    def test_resume_matches_uninterrupted_run(self, scenario_file, tmp_path):
+        full = str(tmp_path / 'full.csv')
+        run_batch(scenario_file, full, ScenarioResolver(), output_format='csv')
+
+        # Simulate a crash after six scenarios with a half-written row
+        partial = str(tmp_path / 'partial.csv')
+        with open(full, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        head = b''.join(lines[:7])
+        with open(partial, 'wb') as f:
+            f.write(head + lines[7][:20])
+        save_checkpoint(partial, {
+            'input': os.path.abspath(scenario_file), 'format': 'csv', 'completed': 6, 'offset': len(head)
+        })
+
+        stats = run_batch(scenario_file, partial, ScenarioResolver(), output_format='csv', resume=True)
+        with open(full, 'rb') as a, open(partial, 'rb') as b:
+            assert a.read() == b.read()
+        assert stats['done'] == 10
+
+    def test_resume_rejects_other_input(self, scenario_file, tmp_path):
+        output = str(tmp_path / 'results.jsonl')
+        save_checkpoint(output, {'input': '/elsewhere.csv', 'format': 'jsonl', 'completed': 1, 'offset': 10})
+        with pytest.raises(ValueError):
+            run_batch(scenario_file, output, ScenarioResolver(), resume=True)
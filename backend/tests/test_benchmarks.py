@@ -0,0 +1,62 @@
+"""
+Tests for the benchmark runner and baseline comparison
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.cases import select_cases
+from benchmarks.runner import Case, run_cases, save_baseline, load_baseline, compare
+
+
+def document(**medians):
+    return {
+        'format': 1,
+        'results': {name: {'median': median, 'stdev': 0.0} for name, median in medians.items()}
+    }
+
+
+class TestBenchmarks:
+    """Test timing, baseline files and regression detection"""
+    
+    def test_suite_covers_engine_and_api(self):
+        groups = {case.group for case in select_cases()}
+        assert groups == {'simulator', 'pipeline', 'scoring', 'explainability', 'api'}
+        assert all('api.simulate' in case.name for case in select_cases(['api.']))
+    
+    def test_run_and_baseline_roundtrip(self, tmp_path):
+        calls = []
+        cases = [Case('noop.append', lambda: lambda: calls.append(1))]
+        result = run_cases(cases, repeat=3, min_time=0.001)
+        timing = result['results']['noop.append']
+        assert timing['repeat'] == 3 and timing['number'] >= 1
+        assert len(calls) >= 1 + timing['repeat'] * timing['number']
+        assert result['environment']['engine_version']
+        
+        path = str(tmp_path / 'baseline.json')
+        save_baseline(result, path)
+        assert load_baseline(path)['results'] == result['results']
+    
+    def test_compare_flags_changes_beyond_threshold(self):
+        baseline = document(fast=1.0, slow=1.0, same=1.0, gone=1.0)
+        current = document(fast=0.5, slow=1.25, same=1.05, added=1.0)
+        statuses = {row['name']: row['status'] for row in compare(baseline, current, threshold=0.1)}
+        assert statuses == {
+            'fast': 'improvement', 'slow': 'regression', 'same': 'ok',
+            'gone': 'missing', 'added': 'new'
+        }
+    
+    def test_compare_ignores_changes_within_noise(self):
+        baseline = {'format': 1, 'results': {'case': {'median': 1.0, 'stdev': 0.2}}}
+        current = {'format': 1, 'results': {'case': {'median': 1.3, 'stdev': 0.2}}}
+        assert compare(baseline, current, threshold=0.1)[0]['status'] == 'ok'
+    
+    def test_load_rejects_other_json(self, tmp_path):
+        path = tmp_path / 'other.json'
+        path.write_text('{"results": {}}')
+        with pytest.raises(ValueError):
+            load_baseline(str(path))
@@ -0,0 +1,85 @@
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.climatology import ClimatologyGrid, build_grid, read_csv_observations
+from utils.weather_service import WeatherService
+
+# ============================================
+# Test Data Fixtures
+# ============================================
+
+@pytest.fixture
+def climatology_file(tmp_path):
+    """Small grid built from three years of observations in two cells"""
+    csv_path = tmp_path / 'observations.csv'
+    csv_path.write_text(
+        "latitude,longitude,year,temp,rainfall,humidity,wind\n"
+        "13.1,80.2,2020,28,1200,75,10\n"
+        "13.2,80.3,2021,30,1400,77,12\n"
+        "13.3,80.1,2022,29,1000,73,14\n"
+        "51.5,-0.1,2020,11,600,80,\n"
+    )
+    grid_path = tmp_path / 'climatology.bin'
+    build_grid(read_csv_observations(str(csv_path)), str(grid_path), resolution=1.0)
+    return str(grid_path)
+
+# ============================================
+# Climatology Grid Tests
+# ============================================
+
+class TestClimatologyGrid:
+    """Test grid ingestion and memory-mapped lookups"""
+    
+    def test_lookup_mean_and_variance(self, climatology_file):
+        """Test that observations in a cell are reduced to mean and variance"""
+        with ClimatologyGrid(climatology_file) as grid:
+            cell = grid.lookup(13.5, 80.5)
+        
+        assert cell['source'] == 'climatology'
+        assert cell['samples'] == 3
+        assert cell['avg_temp_annual'] == pytest.approx(29.0)
+        assert cell['avg_rainfall_annual'] == pytest.approx(1200.0)
+        assert cell['rainfall_variance'] == pytest.approx(80000 / 3, rel=1e-4)
+    
+    def test_missing_variable_omitted(self, climatology_file):
+        """Test that variables absent from the input are left out of the record"""
+        with ClimatologyGrid(climatology_file) as grid:
+            cell = grid.lookup(51.5, -0.1)
+        
+        assert cell['avg_temp_annual'] == pytest.approx(11.0)
+        assert 'avg_wind_annual' not in cell
+    
+    def test_empty_and_out_of_range_cells(self, climatology_file):
+        """Test lookups without data return None"""
+        with ClimatologyGrid(climatology_file) as grid:
+            assert grid.lookup(-40.0, 20.0) is None
+            assert grid.lookup(95.0, 0.0) is None
+            assert grid.cell_index(90.0, 180.0) == (grid.nlat - 1, grid.nlon - 1)
+    
+    def test_rejects_invalid_file(self, tmp_path):
+        """Test that non-grid files are refused"""
+        bogus = tmp_path / 'bogus.bin'
+        bogus.write_bytes(b'not a climatology grid at all, definitely not')
+        with pytest.raises(ValueError):
+            ClimatologyGrid(str(bogus))
+    
+    def test_weather_service_uses_grid(self, climatology_file):
+        """Test that historical climate is served from the grid when configured"""
+        service = WeatherService(climatology_path=climatology_file)
+        climate = service.get_historical_climate(13.08, 80.27)
+        assert climate['avg_rainfall_annual'] == pytest.approx(1200.0)
+        
+        # Estimation from a live response prefers the long-term average
+        rainfall = service._estimate_annual_rainfall({
+            'coord': {'lat': 13.08, 'lon': 80.27},
+            'rain': {'1h': 5.0},
+            'main': {'humidity': 90}
+        })
+        assert rainfall == pytest.approx(1200.0)
+        
+        # Locations outside the grid fall back to defaults
+        assert service.get_historical_climate(-40.0, 20.0)['source'] == 'default'
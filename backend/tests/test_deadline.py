@@ -0,0 +1,87 @@
+"""
+Tests for deadline-bounded simulations
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation
+from engine.scoring import estimate_intervals
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+ENVIRONMENT = {
+    'avg_temp': 26, 'avg_rainfall': 1200, 'humidity': 75, 'wind_speed': 8,
+    'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+}
+
+
+def simulate(runs, deadline=None, mode='full'):
+    return run_simulation(
+        MOCK_CROPS[1], ENVIRONMENT, default_terrain_modifiers('plain'),
+        runs=runs, seed=5, mode=mode, deadline=deadline
+    )
+
+
+class TestDeadline:
+    """Test early stopping, intervals and deadline-bounded admission waits"""
+
+    @pytest.mark.parametrize('mode', ['full', 'streaming'])
+    def test_stops_early_with_intervals(self, mode):
+        start = time.time()
+        outcome = simulate(200000, deadline=start + 0.1, mode=mode)
+        assert time.time() - start < 0.5
+        assert outcome['truncated'] is True
+        assert 250 <= outcome['simulation_runs'] < 200000
+
+        low, high = outcome['intervals']['expected_yield']
+        assert low <= outcome['avg_yield'] <= high
+        low, high = outcome['intervals']['success_probability']
+        assert 0 <= low <= outcome['success_rate'] <= high <= 1
+
+    def test_generous_deadline_matches_unbounded_run(self):
+        bounded = simulate(2000, deadline=time.time() + 60)
+        unbounded = simulate(2000)
+        assert bounded['truncated'] is False and unbounded['intervals'] is None
+        assert bounded['avg_yield'] == unbounded['avg_yield']
+
+    def test_expired_deadline_still_runs_minimum(self):
+        outcome = simulate(5000, deadline=time.time() - 1)
+        assert outcome['simulation_runs'] == 250 and outcome['truncated']
+
+    def test_intervals_narrow_with_more_runs(self):
+        few = estimate_intervals(90, [100.0, 300.0] * 50)
+        many = estimate_intervals(9000, [100.0, 300.0] * 5000)
+        width = lambda interval: interval[1] - interval[0]
+        assert width(many['expected_yield']) < width(few['expected_yield'])
+        assert width(many['success_probability']) < width(few['success_probability'])
+        assert estimate_intervals(100, [1.0] * 100)['success_probability'][1] == pytest.approx(1.0)
+
+    def test_admission_wait_bounded_by_request_timeout(self):
+        controller = AdmissionController(max_concurrent=1, queue_depth=1, max_wait=10)
+        controller.acquire('a')
+        start = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            controller.acquire('b', timeout=0.05)
+        assert time.monotonic() - start < 1
+
+
+class TestDeadlineReuse:
+    """Test that partial results are never reused as full answers"""
+
+    def test_truncated_result_not_reused(self, flask_app, monkeypatch):
+        monkeypatch.setattr(flask_app, 'SIMULATION_COALESCING', False)
+        client = flask_app.app.test_client()
+        payload = {
+            'crop': 'Corn', 'location': {'lat': -31.5, 'lon': 151.5}, 'terrain': 'plain',
+            'weather': {'temp': 24, 'rainfall': 800, 'humidity': 60, 'wind': 6}
+        }
+        body = client.post('/api/simulate', json=dict(payload, runs=50000, deadline_ms=25)).get_json()
+        assert body['truncated'] is True
+        body = client.post('/api/simulate', json=dict(payload, runs=100, reuse=True)).get_json()
+        assert 'reused' not in body
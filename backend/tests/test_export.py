@@ -0,0 +1,107 @@
+"""
+Tests for streaming simulation and raw run exports
+"""
+
+import pytest
+import sys
+import os
+import csv
+import io
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation
+from storage import SQLiteStorage
+from utils.export import (
+    ExportError, resolve_columns, check_format,
+    iter_simulation_batches, iter_run_batches, encode, build_run_simulator
+)
+from utils.history_query import HISTORY_COLUMNS, parse_history_query
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+
+def make_record(crop='Rice', summary=None):
+    return {
+        'crop_name': crop, 'latitude': 13.08, 'longitude': 80.27, 'terrain': 'plain',
+        'avg_temp': 26, 'avg_rainfall': 1201, 'humidity': 75, 'wind_speed': 8,
+        'success_probability': 0.82, 'expected_yield': 5100.5, 'risk_level': 'Low',
+        'is_override': False, 'simulation_runs': 1000, 'explanation': 'ok', 'summary': summary
+    }
+
+
+@pytest.fixture
+def storage():
+    storage = SQLiteStorage(':memory:')
+    yield storage
+    storage.close()
+
+
+def read_csv(chunks):
+    return list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+
+
+class TestExport:
+    """Test batching, column selection, encoders and run regeneration"""
+
+    def test_simulation_batches_cover_all_rows(self, storage):
+        storage.insert_simulations([make_record(crop='Rice')] * 7 + [make_record(crop='Wheat')] * 3)
+        query = parse_history_query({'crop': 'Rice'})[0]
+        query['columns'] = ['id', 'crop_name']
+        batches = list(iter_simulation_batches(storage, query, batch_size=3))
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert len({row['id'] for batch in batches for row in batch}) == 7
+
+    def test_csv_selects_requested_columns(self, storage):
+        storage.insert_simulations([make_record()] * 4)
+        columns = resolve_columns('crop_name,success_probability', HISTORY_COLUMNS)
+        query = parse_history_query({})[0]
+        chunks = list(encode(iter_simulation_batches(storage, dict(query, columns=columns), 2), columns, 'csv'))
+        rows = read_csv(chunks)
+        assert len(chunks) == 2
+        assert list(rows[0]) == ['crop_name', 'success_probability']
+        assert len(rows) == 4 and rows[0]['success_probability'] == '0.82'
+
+    def test_invalid_requests_rejected(self):
+        with pytest.raises(ExportError):
+            resolve_columns('id,bogus', HISTORY_COLUMNS)
+        with pytest.raises(ExportError):
+            check_format('xlsx')
+
+    def test_regenerated_runs_match_original(self):
+        environment = {
+            'avg_temp': 26.3, 'avg_rainfall': 1200.7, 'humidity': 75, 'wind_speed': 8,
+            'elevation': 100, 'terrain': 'plain', 'latitude': 13.08, 'longitude': 80.27
+        }
+        rice = MOCK_CROPS[1]
+        outcome = run_simulation(
+            rice, environment, default_terrain_modifiers('plain'), runs=500, seed=7, summary=True
+        )
+        stored = dict(make_record(summary=outcome['summary']), avg_temp=26, avg_rainfall=1201)
+        simulator = build_run_simulator(stored, rice, default_terrain_modifiers('plain'))
+        runs = [row for batch in iter_run_batches(simulator, batch_size=128) for row in batch]
+        assert len(runs) == 500 and runs[-1]['run'] == 499
+        assert sum(r['success'] for r in runs) / 500 == outcome['success_rate']
+
+        rows = read_csv(encode(iter_run_batches(simulator), ['run', 'yield'], 'csv'))
+        assert list(rows[0]) == ['run', 'yield'] and len(rows) == 500
+
+        with pytest.raises(ExportError):
+            build_run_simulator(make_record(summary={'runs': 500}), rice, default_terrain_modifiers('plain'))
+
+    def test_arrow_and_parquet_streams(self, storage):
+        pa = pytest.importorskip('pyarrow')
+        import pyarrow.parquet as pq
+        storage.insert_simulations([make_record()] * 5)
+        columns = ['id', 'latitude', 'simulation_runs', 'is_override']
+        query = dict(parse_history_query({})[0], columns=columns)
+
+        stream = b''.join(encode(iter_simulation_batches(storage, query, 2), columns, 'arrow'))
+        table = pa.ipc.open_stream(stream).read_all()
+        assert table.column_names == columns and table.num_rows == 5
+        assert table.schema.field('simulation_runs').type == pa.int64()
+
+        parquet = b''.join(encode(iter_simulation_batches(storage, query, 2), columns, 'parquet'))
+        parquet_file = pq.ParquetFile(io.BytesIO(parquet))
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.read().column('latitude').to_pylist() == [13.08] * 5
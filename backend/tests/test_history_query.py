@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.history_query import (
+    parse_history_query, apply_supabase_query, paginate,
+    encode_cursor, decode_cursor, MAX_HISTORY_PAGE_SIZE
+)
+
+ROW_ID = '6f9619ff-8b86-d011-b42d-00cf4fc964ff'
+
+class RecordingQuery:
+    """Stand-in for a PostgREST query builder that records calls"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+class TestHistoryQuery:
+    """Test history query parsing and keyset pagination"""
+    
+    def test_limit_is_capped(self):
+        query, error = parse_history_query({'limit': '100000'})
+        assert error is None
+        assert query['limit'] == MAX_HISTORY_PAGE_SIZE
+    
+    def test_invalid_parameters(self):
+        assert parse_history_query({'limit': 'abc'})[1] is not None
+        assert parse_history_query({'risk_level': 'Extreme'})[1] is not None
+        assert parse_history_query({'lat_min': '95'})[1] is not None
+        assert parse_history_query({'columns': 'crop_name,password'})[1] is not None
+        assert parse_history_query({'cursor': 'not-a-cursor'})[1] == 'Invalid cursor'
+    
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor({'created_at': '2025-01-01T00:00:00.250000+00:00', 'id': ROW_ID})
+        assert decode_cursor(cursor) == ('2025-01-01T00:00:00.250000+00:00', ROW_ID)
+    
+    def test_cursor_values_normalized(self):
+        """Timestamps come back in fixed-width UTC and ids in canonical UUID form"""
+        cursor = encode_cursor({'created_at': '2025-01-01T05:30:00+05:30', 'id': ROW_ID.upper()})
+        assert decode_cursor(cursor) == ('2025-01-01T00:00:00.000000+00:00', ROW_ID)
+    
+    def test_cursor_values_validated(self):
+        """Values that could alter the storage filter are rejected"""
+        injected = '2025-01-01",id.gt."0'
+        for created_at, row_id in (
+            (injected, ROW_ID), ('2025-01-01T00:00:00+00:00', 'abc'),
+            ('2025-01-01T00:00:00+00:00', 42), (None, ROW_ID)
+        ):
+            cursor = encode_cursor({'created_at': created_at, 'id': row_id})
+            with pytest.raises(ValueError, match='Invalid cursor'):
+                decode_cursor(cursor)
+    
+    def test_filters_and_cursor_applied(self):
+        """Test filters, bounding box, projection and keyset condition reach the builder"""
+        cursor = encode_cursor({'created_at': '2025-01-01T00:00:00+00:00', 'id': ROW_ID})
+        query, error = parse_history_query({
+            'limit': '10', 'crop': 'Wheat', 'risk_level': 'High',
+            'lat_min': '10', 'lat_max': '20', 'created_from': '2024-06-01T00:00:00Z',
+            'columns': 'crop_name,success_probability', 'cursor': cursor
+        })
+        assert error is None
+        
+        table = RecordingQuery()
+        apply_supabase_query(table, query)
+        calls = [(name, args) for name, args, _ in table.calls]
+        
+        assert ('select', ('crop_name,success_probability,created_at,id',)) in calls
+        assert ('eq', ('crop_name', 'Wheat')) in calls
+        assert ('eq', ('risk_level', 'High')) in calls
+        assert ('gte', ('latitude', 10.0)) in calls
+        assert ('lte', ('latitude', 20.0)) in calls
+        assert ('gte', ('created_at', '2024-06-01T00:00:00+00:00')) in calls
+        assert ('or_', (
+            'created_at.lt."2025-01-01T00:00:00.000000+00:00",'
+            f'and(created_at.eq."2025-01-01T00:00:00.000000+00:00",id.lt."{ROW_ID}")',
+        )) in calls
+        assert ('limit', (11,)) in calls
+    
+    def test_paginate_uses_look_ahead_row(self):
+        rows = [
+            {'created_at': f'2025-01-0{day}T00:00:00.000000+00:00', 'id': str(uuid.UUID(int=day))}
+            for day in (5, 4, 3)
+        ]
+        page, next_cursor = paginate(rows, 2)
+        assert len(page) == 2
+        assert decode_cursor(next_cursor) == ('2025-01-04T00:00:00.000000+00:00', str(uuid.UUID(int=4)))
+        
+        page, next_cursor = paginate(rows, 3)
+        assert next_cursor is None
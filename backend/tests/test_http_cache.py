@@ -0,0 +1,68 @@
+import pytest, sys, os
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.http_cache import VersionClock, reference_version
+
+
+class TestReferenceVersion:
+    """Test content-derived versions and Last-Modified times"""
+
+    def test_version_ignores_key_order(self):
+        """Equal payloads get the same version regardless of key order"""
+        assert reference_version({'a': 1, 'b': [1, 2]}) == reference_version({'b': [1, 2], 'a': 1})
+        assert reference_version({'a': 1}) != reference_version({'a': 2})
+
+    def test_last_modified_from_rows(self):
+        """The newest row updated_at is used when rows carry one"""
+        clock = VersionClock()
+        rows = [
+            {'name': 'Wheat', 'updated_at': '2024-03-01T10:00:00.250000+00:00'},
+            {'name': 'Rice', 'updated_at': '2024-05-02T08:30:00Z'},
+            {'name': 'Corn', 'updated_at': None},
+        ]
+        assert clock.last_modified(rows, 'v1') == datetime(2024, 5, 2, 8, 30, tzinfo=timezone.utc)
+
+    def test_last_modified_falls_back_to_first_seen(self):
+        """Without timestamps, a version keeps the time it was first served"""
+        clock = VersionClock(max_versions=2)
+        first = clock.last_modified([{'name': 'Wheat'}], 'v1')
+        assert clock.last_modified([{'name': 'Wheat'}], 'v1') == first
+        assert first.microsecond == 0
+        clock.first_seen('v2')
+        clock.first_seen('v3')
+        assert 'v1' not in clock._first_seen
+
+
+class TestConditionalEndpoints:
+    """Test validators and 304 responses on the crop endpoints"""
+
+    @pytest.fixture
+    def client(self, flask_app):
+        return flask_app.app.test_client()
+
+    @pytest.mark.parametrize('path', ['/api/crops', '/api/crops/Wheat'])
+    def test_revalidation(self, client, path):
+        """A matching If-None-Match or If-Modified-Since gets an empty 304"""
+        response = client.get(path)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert etag.startswith('W/"')
+        assert 'max-age=' in response.headers['Cache-Control']
+        assert 'public' in response.headers['Cache-Control']
+
+        cached = client.get(path, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.get_data() == b''
+        assert cached.headers['ETag'] == etag
+
+        since = client.get(path, headers={'If-Modified-Since': response.headers['Last-Modified']})
+        assert since.status_code == 304
+
+    def test_stale_etag_returns_payload(self, client):
+        """A different ETag gets the full payload"""
+        response = client.get('/api/crops', headers={'If-None-Match': 'W/"stale"'})
+        assert response.status_code == 200
+        assert isinstance(response.get_json(), list)
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.lazy import LazyResource, StartupReport
+
+class TestLazyResource:
+    """Test lazy and background subsystem initialization"""
+    
+    def test_initializes_once_on_first_use(self):
+        """Test factory runs once and its timing is reported"""
+        calls = []
+        resource = LazyResource('database', lambda: calls.append(1) or 'client')
+        
+        assert resource.state == 'pending'
+        assert resource.peek() is None
+        assert resource.get() == 'client'
+        assert resource.get() == 'client'
+        assert calls == [1]
+        assert resource.status()['available'] is True
+        assert 'init_ms' in resource.status()
+    
+    def test_failure_returns_none(self):
+        """Test a failing factory marks the resource failed instead of raising"""
+        def broken():
+            raise ConnectionError("database unreachable")
+        
+        resource = LazyResource('database', broken)
+        assert resource.get() is None
+        assert resource.state == 'failed'
+        assert 'unreachable' in resource.status()['error']
+    
+    def test_waiters_time_out_while_initializing(self):
+        """Test callers do not block indefinitely on a slow background init"""
+        release = threading.Event()
+        resource = LazyResource('database', lambda: release.wait(5) and 'client')
+        thread = resource.start_background()
+        
+        assert resource.get(timeout=0.05) is None
+        release.set()
+        thread.join(1)
+        assert resource.get() == 'client'
+    
+    def test_startup_report_readiness(self):
+        """Test readiness waits only on required subsystems"""
+        report = StartupReport()
+        with report.measure_import('engine'):
+            pass
+        required = report.register(LazyResource('weather', lambda: 'service'))
+        report.register(LazyResource('simulation_pool', lambda: 'pool', required=False))
+        
+        assert report.ready is False
+        required.get()
+        assert report.ready is True
+        assert 'engine' in report.report()['imports_ms']
+        assert report.report()['subsystems']['simulation_pool']['state'] == 'pending'
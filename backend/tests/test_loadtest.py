@@ -0,0 +1,79 @@
+"""
+Tests for the load-testing stubs and report helpers
+"""
+
+import pytest
+import sys
+import os
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.loadtest import parse_mix, build_request, percentile, summarize_samples, process_usage
+from benchmarks.stubs import FakeSupabaseClient, start_weather_stub
+from storage import SupabaseStorage
+from utils.history_query import parse_history_query, paginate
+from utils.weather_service import WeatherService
+
+
+class TestLoadTest:
+    """Test the Supabase and weather stand-ins and load report statistics"""
+    
+    def test_fake_supabase_serves_storage_provider(self):
+        storage = SupabaseStorage(FakeSupabaseClient())
+        assert storage.get_crop('Rice')['name'] == 'Rice'
+        assert storage.get_terrain_modifiers('mountain')['erosion_risk'] == 0.7
+        
+        records = [
+            {'crop_name': 'Rice' if i % 3 else 'Wheat', 'latitude': 13.0, 'longitude': 80.0, 'terrain': 'plain'}
+            for i in range(12)
+        ]
+        inserted = [storage.insert_simulation(record) for record in records]
+        assert all(row['id'] and row['created_at'] for row in inserted)
+        
+        # Keyset pages through the or_() cursor filter cover every row once
+        seen, cursor = [], None
+        while True:
+            args = {'limit': '3', 'crop': 'Rice'}
+            if cursor:
+                args['cursor'] = cursor
+            page, cursor = paginate(storage.list_simulations(parse_history_query(args)[0]), 3)
+            seen.extend(row['id'] for row in page)
+            if not cursor:
+                break
+        assert len(seen) == len(set(seen)) == 8
+        assert storage.get_simulation(inserted[0]['id'])['crop_name'] == 'Wheat'
+    
+    def test_weather_stub_behind_weather_service(self):
+        server, url = start_weather_stub()
+        try:
+            weather = WeatherService(api_key='stub', base_url=url).get_current_weather(20.0, 78.0)
+        finally:
+            server.shutdown()
+        assert weather['description'] == 'scattered clouds'
+        assert weather['temp'] == pytest.approx(30 - 20 * 0.45 + (78 % 7) * 0.3)
+    
+    def test_mix_and_requests(self):
+        assert parse_mix('crops=1,simulate=3') == {'crops': 1.0, 'simulate': 3.0}
+        with pytest.raises(ValueError):
+            parse_mix('crops=1,export=2')
+        method, path, params, body = build_request('simulate', random.Random(1))
+        assert (method, path, params) == ('POST', '/api/simulate', None)
+        assert {'crop', 'terrain', 'location'} <= set(body)
+    
+    def test_report_statistics(self):
+        assert percentile(list(range(1, 101)), 95) == 95
+        assert percentile([], 50) is None
+        samples = [('crops', 0.01 * i, i != 10) for i in range(1, 11)]
+        report = summarize_samples(samples, duration=2.0)
+        assert report['overall']['requests'] == 10
+        assert report['overall']['throughput_rps'] == 5.0
+        assert report['overall']['error_rate'] == 0.1
+        assert report['endpoints']['crops']['p50_ms'] == 50.0
+    
+    def test_process_usage(self):
+        usage = process_usage(os.getpid())
+        if usage is None:
+            pytest.skip("/proc not available")
+        assert usage[0] > 0 and usage[1] > 0
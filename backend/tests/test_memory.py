@@ -0,0 +1,68 @@
+"""
+Tests for memory budgeting and streaming aggregation
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation, estimate_memory, choose_mode
+from engine.memory import trace_peak
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+from utils.validators import validate_input
+
+
+def environment(temp=26, rainfall=1200):
+    return {
+        'avg_temp': temp, 'avg_rainfall': rainfall, 'humidity': 75, 'wind_speed': 8,
+        'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+    }
+
+
+def simulate(env, runs=3000, **kwargs):
+    return run_simulation(MOCK_CROPS[1], env, default_terrain_modifiers('plain'), runs=runs, seed=11, **kwargs)
+
+
+class TestMemoryBudget:
+    """Test streaming equivalence, estimates and mode selection"""
+
+    @pytest.mark.parametrize('env', [environment(), environment(temp=41, rainfall=150)])
+    def test_streaming_matches_full(self, env):
+        full = simulate(env, summary=True)
+        streaming = simulate(env, summary=True, mode='streaming')
+        for key in ('success_rate', 'avg_yield', 'risk_level', 'yield_range', 'explanation', 'summary', 'seed'):
+            assert full[key] == streaming[key]
+        assert streaming['memory']['mode'] == 'streaming'
+
+    def test_estimate_bounds_measured_peak(self):
+        for mode in ('full', 'streaming'):
+            outcome = simulate(environment(temp=41, rainfall=150), runs=20000, summary=True, mode=mode, trace_memory=True)
+            memory = outcome['memory']
+            assert memory['peak_bytes'] is not None
+            assert memory['peak_bytes'] <= memory['estimated_bytes'] < memory['peak_bytes'] * 3
+        assert simulate(environment(), runs=100)['memory']['peak_bytes'] is None
+
+    def test_nested_tracing_is_skipped(self):
+        with trace_peak() as outer:
+            with trace_peak() as inner:
+                pass
+        assert inner.bytes is None and outer.bytes is not None
+
+    def test_choose_mode_downgrades_then_rejects(self):
+        full = estimate_memory(50000, 'full')
+        streaming = estimate_memory(50000, 'streaming')
+        assert streaming < full
+        assert choose_mode(50000, full) == 'full'
+        assert choose_mode(50000, full - 1) == 'streaming'
+        assert choose_mode(50000, streaming - 1) is None
+        assert choose_mode(10 ** 9, None) == 'full'
+
+    def test_runs_validation(self):
+        payload = {'crop': 'Rice', 'location': {'lat': 1, 'lon': 2}, 'terrain': 'plain'}
+        assert validate_input(dict(payload, runs=500), max_runs=1000) is None
+        assert validate_input(dict(payload, runs=5000), max_runs=1000) == "Runs cannot exceed 1000"
+        assert validate_input(dict(payload, runs=0)) == "Runs must be a positive integer"
+        assert validate_input(dict(payload, runs=True)) == "Runs must be a positive integer"
@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+import json
+import logging
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.metrics import MetricsRegistry
+from utils.logging_utils import JsonFormatter, get_logger, log_event
+
+# ============================================
+# Metrics Registry Tests
+# ============================================
+
+class TestMetricsRegistry:
+    """Test Prometheus text exposition"""
+    
+    def test_counter_and_gauge_render(self):
+        """Test counters accumulate per label set and callback gauges render on scrape"""
+        registry = MetricsRegistry()
+        requests = registry.counter('test_requests_total', 'Requests', ('endpoint',))
+        requests.inc(endpoint='/api/crops')
+        requests.inc(2, endpoint='/api/crops')
+        registry.gauge('test_queue', 'Queue depth', ('state',), callback=lambda: {('queued',): 3})
+        
+        text = registry.render()
+        assert '# TYPE test_requests_total counter' in text
+        assert 'test_requests_total{endpoint="/api/crops"} 3' in text
+        assert 'test_queue{state="queued"} 3' in text
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        registry = MetricsRegistry()
+        latency = registry.histogram('test_latency_seconds', 'Latency', ('stage',), buckets=(0.1, 1.0))
+        latency.observe(0.05, stage='simulate')
+        latency.observe(0.5, stage='simulate')
+        latency.observe(5.0, stage='simulate')
+        
+        text = registry.render()
+        assert 'test_latency_seconds_bucket{stage="simulate",le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{stage="simulate",le="1"} 2' in text
+        assert 'test_latency_seconds_bucket{stage="simulate",le="+Inf"} 3' in text
+        assert 'test_latency_seconds_count{stage="simulate"} 3' in text
+        assert latency.count(stage='simulate') == 3
+
+# ============================================
+# Structured Logging Tests
+# ============================================
+
+class TestStructuredLogging:
+    """Test JSON log formatting and sampling"""
+    
+    def test_json_fields_and_sampling(self):
+        """Test events carry structured fields and zero sample rate drops them"""
+        records = []
+        
+        class Capture(logging.Handler):
+            def emit(self, record):
+                records.append(JsonFormatter().format(record))
+        
+        logger = get_logger('terrasim.test')
+        logger.addHandler(Capture())
+        logger.setLevel(logging.DEBUG)
+        
+        log_event(logger, logging.INFO, 'simulate.invalid', error='bad terrain')
+        log_event(logger, logging.DEBUG, 'simulate.request', sample_rate=0.0, crop='Wheat')
+        
+        assert len(records) == 1
+        payload = json.loads(records[0])
+        assert payload['event'] == 'simulate.invalid'
+        assert payload['error'] == 'bad terrain'
+        assert payload['level'] == 'info'
+
+# ============================================
+# Endpoint Tests
+# ============================================
+
+class TestMetricsEndpoint:
+    """Test /metrics exposes stage latency after a simulation"""
+    
+    def test_simulate_records_stages(self, flask_app):
+        client = flask_app.app.test_client()
+        
+        response = client.post('/api/simulate', json={
+            'crop': 'Wheat',
+            'location': {'lat': 28.7, 'lon': 77.1},
+            'terrain': 'plain',
+            'weather': {'temp': 18, 'rainfall': 650, 'humidity': 65, 'wind': 10}
+        })
+        assert response.status_code == 200
+        
+        text = client.get('/metrics').get_data(as_text=True)
+        for stage in ('validate', 'crop_lookup', 'simulate', 'metrics', 'explanation'):
+            assert f'terrasim_simulate_stage_duration_seconds_count{{stage="{stage}"}}' in text
+        assert 'terrasim_http_requests_total{endpoint="/api/simulate",method="POST",status="200"}' in text
+        assert 'terrasim_simulation_runs_total' in text
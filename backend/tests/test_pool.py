@@ -0,0 +1,108 @@
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import Future
+
+from engine.pipeline import run_simulation
+from engine.pool import SimulationPool, PoolSaturatedError, PoolUnavailableError
+from utils.reference_data import MOCK_CROPS, TERRAIN_DEFAULTS, find_crop
+
+@pytest.fixture
+def environment():
+    return {
+        'avg_temp': 18,
+        'avg_rainfall': 650,
+        'humidity': 65,
+        'wind_speed': 10,
+        'elevation': 100,
+        'terrain': 'plain',
+        'latitude': 28.7,
+        'longitude': 77.1
+    }
+
+class TestPipeline:
+    """Test the shared engine pipeline"""
+    
+    def test_run_simulation_outcome(self, environment):
+        """Test pipeline returns aggregate outcome only"""
+        outcome = run_simulation(find_crop(MOCK_CROPS, 'wheat'), environment, TERRAIN_DEFAULTS['plain'], runs=200)
+        
+        assert outcome['simulation_runs'] == 200
+        assert 0 <= outcome['success_rate'] <= 1
+        assert outcome['risk_level'] in ['Low', 'Medium', 'High']
+        assert len(outcome['explanation']) > 0
+        assert 'results' not in outcome
+
+class TestSimulationPool:
+    """Test the process pool used for SIMULATION_EXECUTION=pool"""
+    
+    def test_pool_runs_with_preloaded_data(self, environment):
+        """Test workers resolve preloaded profiles and accept custom ones"""
+        pool = SimulationPool(workers=1, queue_depth=1, crops=MOCK_CROPS, terrain_modifiers=TERRAIN_DEFAULTS)
+        try:
+            pool.start()
+            outcome = pool.run(find_crop(MOCK_CROPS, 'Wheat'), environment, TERRAIN_DEFAULTS['plain'], runs=100)
+            assert outcome['simulation_runs'] == 100
+            
+            custom_crop = dict(find_crop(MOCK_CROPS, 'Wheat'), name='Custom Wheat')
+            outcome = pool.run(custom_crop, environment, {'water_retention_factor': 0.5}, runs=50)
+            assert outcome['simulation_runs'] == 50
+            assert pool.stats()['in_flight'] == 0
+        finally:
+            pool.shutdown()
+    
+    def test_pool_rejects_when_full(self, environment):
+        """Test submissions beyond workers + queue depth fail fast"""
+        pool = SimulationPool(workers=1, queue_depth=0)
+        pool._executor = object()  # Never reached: admission fails first
+        pool._slots.acquire()
+        with pytest.raises(PoolSaturatedError):
+            pool.run(find_crop(MOCK_CROPS, 'Wheat'), environment, TERRAIN_DEFAULTS['plain'], runs=10)
+    
+    def test_broken_pool_is_replaced(self, environment):
+        """Test a dead worker fails the task as retryable and the next task gets a new pool"""
+        pool = SimulationPool(workers=1, queue_depth=1, crops=MOCK_CROPS, terrain_modifiers=TERRAIN_DEFAULTS)
+        wheat = find_crop(MOCK_CROPS, 'Wheat')
+        try:
+            pool.start()
+            broken = pool._executor
+            for process in list(broken._processes.values()):
+                process.kill()
+                process.join()
+            with pytest.raises(PoolUnavailableError):
+                pool.run(wheat, environment, TERRAIN_DEFAULTS['plain'], runs=100, timeout=30)
+            assert pool.stats()['in_flight'] == 0
+            
+            outcome = pool.run(wheat, environment, TERRAIN_DEFAULTS['plain'], runs=100, timeout=30)
+            assert outcome['simulation_runs'] == 100
+            assert pool._executor is not broken
+        finally:
+            pool.shutdown()
+    
+    def test_timeout_cancels_queued_task(self, environment):
+        """Test a task still waiting at the timeout is cancelled and frees its slot"""
+        class StalledExecutor:
+            def submit(self, *args):
+                return Future()
+        
+        pool = SimulationPool(workers=1, queue_depth=0)
+        pool._executor = StalledExecutor()
+        with pytest.raises(PoolUnavailableError):
+            pool.run(find_crop(MOCK_CROPS, 'Wheat'), environment, TERRAIN_DEFAULTS['plain'], runs=10, timeout=0.01)
+        assert pool.stats()['in_flight'] == 0
+    
+    def test_simulate_maps_pool_failure_to_503(self, flask_app, monkeypatch):
+        """Test /api/simulate answers a failed pool task with a retryable 503"""
+        def fail(*args):
+            raise PoolUnavailableError("Simulation worker process died")
+        
+        monkeypatch.setattr(flask_app, '_execute_simulation', fail)
+        response = flask_app.app.test_client().post('/api/simulate', json={
+            'crop': 'Wheat', 'location': {'lat': 28.7, 'lon': 77.1}, 'terrain': 'plain', 'runs': 100
+        })
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,63 @@
+"""
+Tests for on-demand request profiling
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation
+from utils.profiling import profile_options, start_profiler, write_profile
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+
+def simulate():
+    environment = {
+        'avg_temp': 26, 'avg_rainfall': 1200, 'humidity': 75, 'wind_speed': 8,
+        'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+    }
+    return run_simulation(MOCK_CROPS[1], environment, default_terrain_modifiers('plain'), runs=3000, seed=1)
+
+
+class TestProfiling:
+    """Test triggering, profile summaries and profile files"""
+    
+    def test_only_authorized_or_sampled_requests_profiled(self):
+        assert profile_options({'X-Profile': 'secret'}, {}, token='secret', sample_rate=0, directory='')['respond']
+        assert profile_options({}, {'profile': 'secret', 'profile_mode': 'sampling'}, token='secret')['mode'] == 'sampling'
+        assert profile_options({'X-Profile': 'guess'}, {}, token='secret', sample_rate=0, directory='') is None
+        # Without a configured token nothing can be requested
+        assert profile_options({'X-Profile': ''}, {}, token='', sample_rate=0, directory='') is None
+        sampled = profile_options({}, {}, token='', sample_rate=1.0, directory='/tmp/profiles')
+        assert sampled == {'mode': 'sampling', 'trigger': 'sampled', 'respond': False}
+    
+    def test_deterministic_summary_names_engine_functions(self):
+        profiler = start_profiler('deterministic')
+        simulate()
+        profiler.stop()
+        summary = profiler.summary(top=50)
+        functions = [row['function'] for row in summary['top']]
+        assert any('_evaluate_run' in name for name in functions)
+        assert any('calculate_mismatch_penalty' in name for name in functions)
+        assert summary['categories']['simulation'] > 0
+        assert summary['categories']['penalties'] > 0
+        assert len(summary['top']) <= 50
+    
+    def test_sampling_profile_written_to_directory(self, tmp_path):
+        profiler = start_profiler('sampling')
+        simulate()
+        profiler.stop()
+        summary = profiler.summary()
+        assert summary['mode'] == 'sampling' and summary['samples'] > 0
+        
+        path = write_profile(profiler, summary, 'simulate-test', str(tmp_path))
+        assert path.endswith('.folded')
+        with open(path) as f:
+            stack, count = f.readline().rsplit(' ', 1)
+        assert int(count) >= 1 and ';' in stack
+        with open(tmp_path / 'simulate-test.json') as f:
+            assert json.load(f)['total_ms'] == summary['total_ms']
@@ -0,0 +1,102 @@
+"""
+Tests for response field projection on /api/simulate
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation
+from utils.validators import validate_input
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+ENVIRONMENT = {
+    'avg_temp': 26, 'avg_rainfall': 1200, 'humidity': 75, 'wind_speed': 8,
+    'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+}
+
+PAYLOAD = {'crop': 'Rice', 'location': {'lat': 13.0, 'lon': 80.0}, 'terrain': 'plain', 'runs': 500}
+
+
+class RecordingStorage:
+    """Storage stand-in that records persisted simulations"""
+
+    name = 'recording'
+
+    def __init__(self):
+        self.inserted = []
+
+    def get_crop(self, name):
+        return None
+
+    def get_terrain_modifiers(self, terrain):
+        return None
+
+    def insert_simulation(self, record):
+        self.inserted.append(record)
+        return {'id': f'sim-{len(self.inserted)}', 'created_at': None}
+
+
+class TestEngineStages:
+    """Test skipping the explanation stage in the engine"""
+
+    @pytest.mark.parametrize('mode', ['full', 'streaming'])
+    def test_skip_explanation(self, mode):
+        """Without explain the outcome is the same minus the explanation"""
+        args = (MOCK_CROPS[1], ENVIRONMENT, default_terrain_modifiers('plain'))
+        full = run_simulation(*args, runs=1000, seed=3, mode=mode)
+        lean = run_simulation(*args, runs=1000, seed=3, mode=mode, explain=False)
+        assert lean['explanation'] is None
+        assert 'explanation' not in lean['timings']
+        for key in ('success_rate', 'avg_yield', 'risk_level', 'yield_range'):
+            assert lean[key] == full[key]
+
+
+class TestFieldsValidation:
+    """Test validation of the fields parameter"""
+
+    def test_accepts_known_fields(self):
+        assert validate_input(dict(PAYLOAD, fields=['success_probability', 'simulation_id'])) is None
+
+    @pytest.mark.parametrize('fields', [[], 'success_probability', [1], ['histogram']])
+    def test_rejects_invalid_fields(self, fields):
+        assert validate_input(dict(PAYLOAD, fields=fields)) is not None
+
+
+class TestSimulateProjection:
+    """Test projected responses and skipped stages through the API"""
+
+    @pytest.fixture
+    def api(self, flask_app, monkeypatch):
+        storage = RecordingStorage()
+        monkeypatch.setattr(flask_app, 'get_storage', lambda: storage)
+        monkeypatch.setattr(flask_app, 'SIMULATION_COALESCING', False)
+        return flask_app.app.test_client(), storage
+
+    def test_projection_skips_explanation_and_persistence(self, api):
+        """Only requested fields are returned and nothing is stored"""
+        client, storage = api
+        response = client.post('/api/simulate', json=dict(
+            PAYLOAD, fields=['success_probability', 'expected_yield']
+        ))
+        assert response.status_code == 200
+        assert set(response.get_json()) == {'success_probability', 'expected_yield'}
+        assert storage.inserted == []
+
+    def test_simulation_id_persists_with_explanation(self, api):
+        """Asking for simulation_id stores the full record"""
+        client, storage = api
+        response = client.post('/api/simulate', json=dict(PAYLOAD, fields=['simulation_id']))
+        assert response.get_json() == {'simulation_id': 'sim-1'}
+        assert storage.inserted[0]['explanation'] is not None
+
+    def test_default_response_unchanged(self, api):
+        """Without fields every field is returned and the simulation stored"""
+        client, storage = api
+        body = client.post('/api/simulate', json=PAYLOAD).get_json()
+        assert body['explanation'] is not None
+        assert body['simulation_id'] == 'sim-1'
+        assert len(storage.inserted) == 1
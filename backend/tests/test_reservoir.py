@@ -0,0 +1,103 @@
+"""
+Tests for reservoir-sampled example runs
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation, RunReservoir
+from engine.reservoir import run_stratum
+from utils.validators import validate_input
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+ENVIRONMENT = {
+    'avg_temp': 26, 'avg_rainfall': 1200, 'humidity': 75, 'wind_speed': 8,
+    'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+}
+
+
+def make_run(index, success=True, factors=()):
+    return {
+        'success': success, 'yield': float(index), 'limiting_factors': list(factors),
+        'temp': 25.0, 'rainfall': 900.0, 'humidity': 0.7,
+        'had_pest': False, 'had_disease': False, 'had_extreme_weather': False
+    }
+
+
+class TestRunReservoir:
+    """Test sampling, stratification and determinism"""
+
+    def test_keeps_fixed_size(self):
+        """No more than size runs are kept however many are offered"""
+        reservoir = RunReservoir(5, seed=1)
+        for i in range(10000):
+            reservoir.add(make_run(i))
+        examples = reservoir.examples()
+        assert len(examples['runs']) == 5
+        assert examples['strata'] == {'all': 10000}
+
+    def test_sample_is_uniform(self):
+        """Early and late runs are equally likely to be kept"""
+        counts = [0] * 10
+        for seed in range(2000):
+            reservoir = RunReservoir(1, seed=seed)
+            for i in range(10):
+                reservoir.add(make_run(i))
+            counts[int(reservoir.examples()['runs'][0]['yield'])] += 1
+        assert min(counts) > 140 and max(counts) < 260
+
+    def test_stratified_keeps_rare_failures(self):
+        """Each failure factor gets its own examples"""
+        reservoir = RunReservoir(2, stratify=True, seed=1)
+        for i in range(5000):
+            reservoir.add(make_run(i))
+        reservoir.add(make_run(1, success=False, factors=['Pest infestation reduced yield']))
+        examples = reservoir.examples()
+        assert examples['strata'] == {'failure:Pest Damage': 1, 'success': 5000}
+        assert [run['stratum'] for run in examples['runs']] == ['failure:Pest Damage', 'success', 'success']
+
+    def test_run_stratum(self):
+        assert run_stratum(make_run(0)) == 'success'
+        assert run_stratum(make_run(0, success=False)) == 'failure:Other Factors'
+
+
+class TestPipelineExamples:
+    """Test example runs returned by the pipeline"""
+
+    @pytest.mark.parametrize('stratify', [False, True])
+    def test_examples_match_across_modes(self, stratify):
+        """Both engine modes sample the same examples and keep the same aggregates"""
+        args = (MOCK_CROPS[1], ENVIRONMENT, default_terrain_modifiers('plain'))
+        plain = run_simulation(*args, runs=2000, seed=9)
+        full = run_simulation(*args, runs=2000, seed=9, examples=3, stratify_examples=stratify)
+        streaming = run_simulation(
+            *args, runs=2000, seed=9, mode='streaming', examples=3, stratify_examples=stratify
+        )
+        assert plain['examples'] is None
+        assert full['examples'] == streaming['examples']
+        assert full['success_rate'] == plain['success_rate']
+        assert sum(full['examples']['strata'].values()) == 2000
+
+    def test_validation(self):
+        payload = {'crop': 'Rice', 'location': {'lat': 13.0, 'lon': 80.0}, 'terrain': 'plain'}
+        assert validate_input(dict(payload, examples=5)) is None
+        assert validate_input(dict(payload, examples={'size': 2, 'stratify': True})) is None
+        assert validate_input(dict(payload, examples=500)) is not None
+        assert validate_input(dict(payload, examples={'stratify': 'yes'})) is not None
+
+    def test_api_examples(self, flask_app):
+        """The simulate endpoint returns examples when asked, and only then"""
+        client = flask_app.app.test_client()
+        payload = {
+            'crop': 'Rice', 'location': {'lat': 13.0, 'lon': 80.0}, 'terrain': 'plain', 'runs': 500,
+            'fields': ['success_probability', 'examples'], 'examples': {'size': 2, 'stratify': True}
+        }
+        body = client.post('/api/simulate', json=payload).get_json()
+        assert set(body) == {'success_probability', 'examples'}
+        assert sum(body['examples']['strata'].values()) == 500
+        body = client.post('/api/simulate', json=dict(payload, fields=['success_probability'])).get_json()
+        assert set(body) == {'success_probability'}
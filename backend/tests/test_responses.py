@@ -0,0 +1,106 @@
+import pytest, sys, os, gzip, json
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, Response, jsonify, request
+
+import utils.responses as responses
+from utils.responses import FastJSONProvider, compress_response
+
+PAYLOAD = {'runs': list(range(2000)), 'crop': 'Wheat', 'at': datetime(2024, 5, 1, 12, 0)}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.route('/large')
+    def large():
+        return jsonify(PAYLOAD)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/stream')
+    def stream():
+        return Response((f"{i},{i * 2}\n" for i in range(5000)), content_type='text/csv; charset=utf-8')
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify(request.get_json())
+
+    app.after_request(lambda response: compress_response(response, 1024))
+    return app.test_client()
+
+
+class TestJSONProvider:
+    """Test JSON serialization through the fast provider"""
+
+    def test_matches_standard_encoding(self, client):
+        """Bodies decode to the same values the stdlib encoder produces"""
+        body = client.get('/large').get_json()
+        assert body['runs'] == PAYLOAD['runs']
+        assert body['at'] == 'Wed, 01 May 2024 12:00:00 GMT'
+
+    def test_stdlib_fallback(self, client, monkeypatch):
+        """Without orjson the provider falls back to the standard library"""
+        monkeypatch.setattr(responses, 'orjson', None)
+        body = client.get('/large').get_json()
+        assert body['runs'] == PAYLOAD['runs']
+        assert body['at'] == 'Wed, 01 May 2024 12:00:00 GMT'
+
+    def test_request_bodies_parse(self, client):
+        """Request JSON is parsed by the provider too"""
+        assert client.post('/echo', json={'a': [1, 2]}).get_json() == {'a': [1, 2]}
+
+
+class TestCompression:
+    """Test Accept-Encoding negotiation and size thresholds"""
+
+    def test_gzip_large_body(self, client):
+        """Large bodies are gzipped for clients that accept it"""
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.get_data()))['crop'] == 'Wheat'
+
+    def test_small_and_unaccepted_bodies_are_plain(self, client):
+        """Small bodies and clients without (or refusing) gzip get identity"""
+        assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'Content-Encoding' not in client.get('/large').headers
+        assert 'Content-Encoding' not in client.get('/large', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+    def test_streamed_body(self, client):
+        """Streamed exports are compressed chunk by chunk"""
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()).decode().count('\n') == 5000
+
+    def test_brotli_preferred(self, client):
+        """Brotli is chosen when installed and accepted"""
+        brotli = pytest.importorskip('brotli')
+        response = client.get('/large', headers={'Accept-Encoding': 'gzip, br'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert json.loads(brotli.decompress(response.get_data()))['crop'] == 'Wheat'
+
+
+class TestMessagePack:
+    """Test MessagePack content negotiation"""
+
+    def test_msgpack_on_request(self, client):
+        """Clients preferring application/msgpack get MessagePack"""
+        msgpack = pytest.importorskip('msgpack')
+        response = client.get('/large', headers={'Accept': 'application/msgpack'})
+        assert response.mimetype == 'application/msgpack'
+        assert msgpack.unpackb(response.get_data())['runs'] == PAYLOAD['runs']
+        assert client.get('/large').mimetype == 'application/json'
+
+    def test_json_without_msgpack(self, client, monkeypatch):
+        """Without the msgpack package every client gets JSON"""
+        monkeypatch.setattr(responses, 'msgpack', None)
+        response = client.get('/large', headers={'Accept': 'application/msgpack'})
+        assert response.mimetype == 'application/json'
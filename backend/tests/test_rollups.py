@@ -0,0 +1,107 @@
+"""
+Tests for analytics rollups
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from storage import SQLiteStorage
+from utils.rollups import (
+    week_start, region_cell, parse_analytics_query, aggregate, check_groups, TooManyGroupsError
+)
+
+
+def make_record(crop, lat, success, risk, created_at, terrain='plain'):
+    return {
+        'crop_name': crop, 'latitude': lat, 'longitude': 80.5, 'terrain': terrain,
+        'success_probability': success, 'expected_yield': success * 1000,
+        'risk_level': risk, 'created_at': created_at
+    }
+
+
+class TestRollups:
+    """Test rollup keys, incremental maintenance and aggregation"""
+    
+    @pytest.fixture
+    def storage(self):
+        storage = SQLiteStorage(':memory:')
+        storage.insert_simulations([
+            make_record('Rice', 13.1, 0.8, 'Low', '2024-01-03T10:00:00Z'),
+            make_record('Rice', 13.9, 0.6, 'Medium', '2024-01-07T23:00:00Z'),
+            make_record('Rice', 13.5, 0.4, 'High', '2024-01-08T01:00:00Z'),
+        ])
+        storage.insert_simulation(make_record('Wheat', -1.5, 0.9, 'Low', '2024-01-04T00:00:00Z'))
+        yield storage
+        storage.close()
+    
+    def test_keys(self):
+        assert week_start('2024-01-07T23:59:59Z') == '2024-01-01'
+        assert week_start('2024-01-08T00:00:00+00:00') == '2024-01-08'
+        assert region_cell(13.9, -0.2, 1.0) == (13.0, -1.0)
+    
+    def test_rollups_updated_on_insert(self, storage):
+        rows = storage.list_rollups(parse_analytics_query({'crop': 'Rice'})[0])
+        by_week = {row['week_start']: row for row in rows}
+        assert by_week['2024-01-01']['simulation_count'] == 2
+        assert by_week['2024-01-01']['sum_success_probability'] == pytest.approx(1.4)
+        assert by_week['2024-01-08']['high_risk_count'] == 1
+    
+    def test_aggregate_coarser_grouping(self, storage):
+        query, error = parse_analytics_query({'group_by': 'crop'})
+        assert error is None
+        results = {r['crop_name']: r for r in aggregate(storage.list_rollups(query), query['group_by'])}
+        assert results['Rice']['simulation_count'] == 3
+        assert results['Rice']['avg_success_probability'] == pytest.approx(0.6)
+        assert results['Rice']['risk_counts'] == {'Low': 1, 'Medium': 1, 'High': 1}
+        assert 'week_start' not in results['Wheat']
+    
+    def test_grouped_in_storage(self, storage):
+        """Rollup rows come back merged over group_by, one per group"""
+        query, _ = parse_analytics_query({'group_by': 'crop'})
+        rows = {row['crop_name']: row for row in storage.list_rollups(query)}
+        assert set(rows) == {'Rice', 'Wheat'}
+        assert rows['Rice']['simulation_count'] == 3
+        assert 'week_start' not in rows['Rice'] and 'group_total' not in rows['Rice']
+    
+    def test_too_many_groups_refused(self, storage, monkeypatch):
+        """A query over the group limit fails instead of returning a subset"""
+        monkeypatch.setattr('storage.sqlite_storage.MAX_ANALYTICS_GROUPS', 2)
+        with pytest.raises(TooManyGroupsError):
+            storage.list_rollups(parse_analytics_query({})[0])
+        assert len(storage.list_rollups(parse_analytics_query({'group_by': 'crop'})[0])) == 2
+        # Rows cut off by a server-side cap are caught from group_total
+        with pytest.raises(TooManyGroupsError):
+            check_groups([{'crop_name': 'Rice', 'group_total': 3}])
+    
+    def test_filters_and_validation(self, storage):
+        query, _ = parse_analytics_query({'week_from': '2024-01-09', 'lat_min': '0'})
+        rows = storage.list_rollups(query)
+        assert [row['week_start'] for row in rows] == ['2024-01-08']
+        assert parse_analytics_query({'group_by': 'planet'})[1]
+        assert parse_analytics_query({'week_to': 'soon'})[1]
+    
+    def test_backfill_existing_database(self, tmp_path):
+        path = str(tmp_path / 'terrasim.db')
+        storage = SQLiteStorage(path)
+        storage.insert_simulation(make_record('Rice', 13.1, 0.8, 'Low', '2024-01-03T10:00:00Z'))
+        storage._connection().execute('DELETE FROM simulation_rollups')
+        storage._connection().commit()
+        storage.close()
+        
+        reopened = SQLiteStorage(path)
+        rows = reopened.list_rollups(parse_analytics_query({})[0])
+        assert rows[0]['simulation_count'] == 1
+        reopened.close()
+    
+    def test_api_too_many_groups(self, flask_app, monkeypatch):
+        monkeypatch.setattr('storage.sqlite_storage.MAX_ANALYTICS_GROUPS', 1)
+        flask_app.get_storage().insert_simulations([
+            make_record('Rice', 13.1, 0.8, 'Low', '2024-01-03T10:00:00Z'),
+            make_record('Wheat', 13.1, 0.8, 'Low', '2024-01-03T10:00:00Z'),
+        ])
+        response = flask_app.app.test_client().get('/api/analytics')
+        assert response.status_code == 422
@@ -0,0 +1,99 @@
+"""
+Tests for cost-based routing and asynchronous simulation jobs
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.scheduler import estimate_seconds, choose_route, calibrate
+from utils.jobs import JobManager, JobQueueFullError
+
+
+def wait_for(manager, job_id, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while manager.get(job_id)['status'] in ('queued', 'running'):
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    return manager.get(job_id)
+
+
+class TestScheduler:
+    """Test cost estimates, routing thresholds and calibration"""
+
+    def test_routes_by_estimated_cost(self):
+        assert estimate_seconds(10000, 'streaming', 1e-5) > estimate_seconds(10000, 'full', 1e-5) == pytest.approx(0.1)
+        assert choose_route(estimate_seconds(1000, 'full', 1e-5), 0.02, 0.25) == 'inline'
+        assert choose_route(estimate_seconds(10000, 'full', 1e-5), 0.02, 0.25) == 'pool'
+        assert choose_route(estimate_seconds(25000, 'full', 1e-5), 0.02, 0.25) == 'job'
+
+    def test_calibrates_from_slowest_pipeline_case(self):
+        baseline = {'results': {
+            'pipeline.run_simulation[rice-favorable-1000]': {'median': 0.012},
+            'pipeline.run_simulation[rice-mismatch-10000]': {'median': 0.15},
+            'simulator.run[rice-mismatch-10000]': {'median': 0.09},
+            'api.simulate[rice-favorable]': {'median': 0.5},
+        }}
+        assert calibrate(baseline) == pytest.approx(1.5e-5)
+        # Monte Carlo loop timings alone understate the pipeline
+        assert calibrate({'results': {'simulator.run[rice-mismatch-10000]': {'median': 0.09}}}) is None
+        assert calibrate({'results': {}}) is None
+
+
+class TestJobManager:
+    """Test job lifecycle, failures, bounded pending jobs and expiry"""
+
+    def test_job_result_and_failure(self):
+        manager = JobManager(workers=2)
+        job = manager.submit(lambda: {'answer': 42}, estimated_seconds=1.5)
+        assert job['status'] == 'queued' and job['estimated_seconds'] == 1.5
+        assert wait_for(manager, job['id'])['result'] == {'answer': 42}
+
+        def fail():
+            raise RuntimeError("engine exploded")
+        failed = wait_for(manager, manager.submit(fail)['id'])
+        assert failed['status'] == 'failed' and failed['error'] == "engine exploded"
+        assert manager.get('missing') is None
+        manager.shutdown()
+
+    def test_pending_jobs_bounded(self):
+        manager = JobManager(workers=1, max_pending=1)
+        release = threading.Event()
+        job = manager.submit(release.wait)
+        with pytest.raises(JobQueueFullError):
+            manager.submit(lambda: {})
+        release.set()
+        wait_for(manager, job['id'])
+        manager.submit(lambda: {})
+        manager.shutdown()
+
+    def test_finished_jobs_expire(self):
+        manager = JobManager(ttl=0.05, max_jobs=2)
+        first = wait_for(manager, manager.submit(lambda: {})['id'])
+        assert first['status'] == 'done'
+        time.sleep(0.06)
+        assert manager.get(first['id']) is None
+
+        # Beyond max_jobs the oldest finished jobs are dropped before their TTL
+        manager.ttl = 60
+        ids = [wait_for(manager, manager.submit(lambda: {})['id'])['id'] for _ in range(3)]
+        manager.submit(lambda: {})
+        assert manager.get(ids[0]) is None and manager.get(ids[2]) is not None
+        manager.shutdown()
+
+
+class TestJobRouting:
+    """Test that jobs are only created when a poll can find them"""
+
+    @pytest.mark.parametrize('async_jobs, route', [(True, 'job'), (False, 'pool')])
+    def test_jobs_need_single_worker(self, flask_app, monkeypatch, async_jobs, route):
+        monkeypatch.setattr(flask_app, 'SIMULATION_EXECUTION', 'auto')
+        monkeypatch.setattr(flask_app, 'SCHEDULER_JOB_MIN_SECONDS', 0.0)
+        monkeypatch.setattr(flask_app, 'ASYNC_JOBS', async_jobs)
+        with flask_app.app.test_request_context():
+            assert flask_app._choose_route(50000, 'full')[0] == route
@@ -0,0 +1,106 @@
+"""
+Tests for coalescing identical in-flight computations
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.singleflight import SingleFlight, FlightTimeout, canonical_key
+
+
+def run_concurrently(flight, key, compute, callers, **options):
+    outcomes, threads = [], []
+    for _ in range(callers):
+        def call():
+            try:
+                outcomes.append(flight.do(key, compute, **options))
+            except Exception as e:
+                outcomes.append(e)
+        threads.append(threading.Thread(target=call))
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+class TestSingleFlight:
+    """Test sharing of results and errors between concurrent callers"""
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight, calls, release = SingleFlight(), [], threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait()
+            return {'success_probability': 0.9}
+
+        threads, outcomes = run_concurrently(flight, 'k', compute, 5)
+        while flight.in_flight() == 0 or len(calls) == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert [shared for _, shared in outcomes].count(False) == 1
+        assert all(value == {'success_probability': 0.9} for value, _ in outcomes)
+        assert flight.in_flight() == 0
+
+        # Nothing is cached once the flight has landed
+        assert flight.do('k', lambda: 'again') == ('again', False)
+
+    def test_errors_reach_every_caller(self):
+        flight, release = SingleFlight(), threading.Event()
+
+        def compute():
+            release.wait()
+            raise ValueError("engine failed")
+
+        threads, outcomes = run_concurrently(flight, 'k', compute, 3)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(outcomes) == 3 and all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+    def test_canonical_key_ignores_key_order(self):
+        assert canonical_key({'a': 1, 'b': 2.5}, 100) == canonical_key({'b': 2.5, 'a': 1}, 100)
+        assert canonical_key({'a': 1}, 100) != canonical_key({'a': 1}, 101)
+
+    def test_follower_wait_is_bounded(self):
+        flight, release = SingleFlight(), threading.Event()
+        leader = threading.Thread(target=flight.do, args=('k', release.wait))
+        leader.start()
+        while flight.in_flight() == 0:
+            time.sleep(0.001)
+        start = time.monotonic()
+        with pytest.raises(FlightTimeout):
+            flight.do('k', lambda: 'mine', timeout=0.05)
+        assert time.monotonic() - start < 1
+        release.set()
+        leader.join()
+
+    def test_followers_retry_leader_only_errors(self):
+        """A leader's own rejection is not passed on; followers compute for themselves"""
+        flight, release = SingleFlight(), threading.Event()
+
+        def rejected():
+            release.wait()
+            raise PermissionError("leader's client is over its limit")
+
+        leader, leader_outcome = run_concurrently(flight, 'k', rejected, 1, retry_on=(PermissionError,))
+        while flight.in_flight() == 0:
+            time.sleep(0.001)
+        threads, outcomes = run_concurrently(flight, 'k', lambda: 'admitted', 3, retry_on=(PermissionError,))
+        time.sleep(0.05)
+        release.set()
+        for thread in leader + threads:
+            thread.join()
+        assert isinstance(leader_outcome[0], PermissionError)
+        assert sorted(value for value, _ in outcomes) == ['admitted'] * 3
@@ -0,0 +1,61 @@
+"""
+Tests for seeded simulations and compact distribution summaries
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import run_simulation, summarize, compare_summaries
+from engine.sketch import HISTOGRAM_BINS
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+
+@pytest.fixture
+def environment():
+    return {
+        'avg_temp': 26, 'avg_rainfall': 1200, 'humidity': 75, 'wind_speed': 8,
+        'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+    }
+
+
+class TestSketch:
+    """Test reproducibility and summary contents"""
+    
+    def test_seed_reproduces_runs(self, environment):
+        rice = MOCK_CROPS[1]
+        first = run_simulation(rice, environment, default_terrain_modifiers('plain'), runs=500, seed=42)
+        second = run_simulation(rice, environment, default_terrain_modifiers('plain'), runs=500, seed=42)
+        assert first['seed'] == 42
+        assert first['success_rate'] == second['success_rate']
+        assert first['yield_range'] == second['yield_range']
+        assert first['summary'] is None
+    
+    def test_summary_is_compact(self, environment):
+        outcome = run_simulation(
+            MOCK_CROPS[1], environment, default_terrain_modifiers('plain'), runs=2000, summary=True
+        )
+        summary = outcome['summary']
+        assert summary['seed'] == outcome['seed']
+        assert summary['runs'] == 2000
+        assert sum(summary['histogram']['counts']) == 2000
+        assert len(summary['histogram']['counts']) == HISTOGRAM_BINS
+        assert summary['quantiles']['p05'] <= summary['quantiles']['p50'] <= summary['quantiles']['p95']
+        assert len(json.dumps(summary, separators=(',', ':'))) < 700
+    
+    def test_compare_summaries(self):
+        def results(yields):
+            return [{'yield': y, 'success': y > 1500, 'limiting_factors': []} for y in yields]
+        base = summarize(results([1000, 2000, 3000, 4000]), ideal_yield=5000)
+        other = summarize(results([2000, 3000, 4000, 5000]), ideal_yield=5000)
+        comparison = compare_summaries(base, other)
+        assert comparison['mean_yield_delta'] == 1000
+        assert comparison['success_rate_delta'] == pytest.approx(0.25)
+        assert comparison['histogram_distance'] == pytest.approx(0.25)
+        
+        with pytest.raises(ValueError):
+            compare_summaries(base, summarize([], ideal_yield=5000))
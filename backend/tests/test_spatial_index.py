@@ -0,0 +1,102 @@
+"""
+Tests for the spatial index of past simulations
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.spatial_index import SpatialIndex, haversine_km, inputs_match, can_reuse, simulation_entry
+
+
+def make_entry(lat, lon, crop='Rice', terrain='plain', created_at=None, result=None, **inputs):
+    record = {
+        'crop_name': crop, 'terrain': terrain, 'latitude': lat, 'longitude': lon,
+        'created_at': created_at, 'avg_temp': 25, 'avg_rainfall': 800,
+        'humidity': 70, 'wind_speed': 10, 'elevation': 100
+    }
+    record.update(inputs)
+    return simulation_entry(record, result)
+
+
+class TestSpatialIndex:
+    """Test nearest-neighbour and radius queries"""
+    
+    @pytest.fixture
+    def index(self):
+        index = SpatialIndex(cell_degrees=0.5)
+        for lat, lon in [(20.0, 78.0), (20.1, 78.1), (21.0, 79.0), (-33.9, 151.2)]:
+            index.add(make_entry(lat, lon))
+        index.add(make_entry(20.05, 78.05, crop='Wheat'))
+        return index
+    
+    def test_nearest_matches_brute_force(self, index):
+        """Results are the k closest entries of the same crop and terrain"""
+        results = index.nearest(20.02, 78.02, 'rice', 'plain', k=2)
+        assert [(entry['latitude'], entry['longitude']) for _, entry in results] == [(20.0, 78.0), (20.1, 78.1)]
+        assert results[0][0] == pytest.approx(haversine_km(20.02, 78.02, 20.0, 78.0))
+    
+    def test_far_neighbour_found_across_empty_cells(self, index):
+        """Sparse data still yields the nearest entry on another continent"""
+        results = index.nearest(-30.0, 150.0, 'Rice', 'plain', k=1)
+        assert results[0][1]['latitude'] == -33.9
+    
+    def test_radius_and_age_filters(self, index):
+        assert len(index.within(20.0, 78.0, 20, 'Rice', 'plain')) == 2
+        index.add(make_entry(20.0, 78.0, created_at=time.time() - 7200))
+        assert len(index.within(20.0, 78.0, 1, 'Rice', 'plain', max_age_seconds=3600)) == 1
+    
+    def test_antimeridian_wrap(self):
+        index = SpatialIndex(cell_degrees=1.0)
+        index.add(make_entry(0.0, 179.8))
+        results = index.nearest(0.0, -179.8, 'Rice', 'plain', max_distance_km=100)
+        assert len(results) == 1
+        assert results[0][0] < 50
+    
+    def test_eviction_keeps_most_recent(self):
+        index = SpatialIndex(max_entries=2)
+        for lon in (10.0, 11.0, 12.0):
+            index.add(make_entry(0.0, lon))
+        assert len(index) == 2
+        longitudes = {entry['longitude'] for _, entry in index.within(0.0, 11.0, 500, 'Rice', 'plain')}
+        assert longitudes == {11.0, 12.0}
+    
+    def test_inputs_match_tolerances(self):
+        base = make_entry(0, 0)['inputs']
+        assert inputs_match(base, dict(base, avg_temp=25.3))
+        assert not inputs_match(base, dict(base, avg_rainfall=850))
+        assert not inputs_match(base, dict(base, elevation=None))
+    
+    def test_can_reuse_needs_result_and_runs(self):
+        """Only entries with a result from at least as many runs are reused"""
+        environment = make_entry(0, 0)['inputs']
+        entry = make_entry(0, 0, result={'success_probability': 0.8}, simulation_runs=1000)
+        assert can_reuse(entry, environment, 1000)
+        assert not can_reuse(entry, environment, 100000)
+        assert not can_reuse(make_entry(0, 0, simulation_runs=1000), environment, 100)
+        assert not can_reuse(dict(entry, simulation_runs=None), environment, 100)
+
+
+class TestReuseAPI:
+    """Test which requests /api/simulate answers from a past simulation"""
+
+    PAYLOAD = {
+        'crop': 'Potato', 'location': {'lat': 47.5, 'lon': -120.5}, 'terrain': 'plain',
+        'weather': {'temp': 15, 'rainfall': 600, 'humidity': 70, 'wind': 9}
+    }
+
+    def test_reuse_requires_runs_and_no_examples(self, flask_app, monkeypatch):
+        monkeypatch.setattr(flask_app, 'SIMULATION_COALESCING', False)
+        client = flask_app.app.test_client()
+        client.post('/api/simulate', json=dict(self.PAYLOAD, runs=200))
+        reused = client.post('/api/simulate', json=dict(self.PAYLOAD, runs=100, reuse=True)).get_json()
+        assert reused['reused'] is True
+        more_runs = client.post('/api/simulate', json=dict(self.PAYLOAD, runs=5000, reuse=True)).get_json()
+        assert 'reused' not in more_runs
+        with_examples = client.post('/api/simulate', json=dict(self.PAYLOAD, runs=100, reuse=True, examples=2)).get_json()
+        assert 'reused' not in with_examples
+        assert len(with_examples['examples']['runs']) == 2
@@ -0,0 +1,132 @@
+"""
+Tests for the storage providers
+"""
+
+import pytest
+import sqlite3
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from storage import SQLiteStorage, connect_supabase
+from utils.history_query import parse_history_query, paginate
+
+
+def make_record(crop='Rice', terrain='plain', risk='Low', created_at=None):
+    return {
+        'crop_name': crop, 'latitude': 13.08, 'longitude': 80.27, 'terrain': terrain,
+        'avg_temp': 28, 'avg_rainfall': 1400, 'humidity': 80, 'wind_speed': 6,
+        'success_probability': 0.82, 'expected_yield': 5100.5, 'risk_level': risk,
+        'is_override': False, 'simulation_runs': 10000, 'explanation': 'ok',
+        'created_at': created_at
+    }
+
+
+class TestSQLiteStorage:
+    """Test schema, reference data, simulations and feedback"""
+    
+    @pytest.fixture
+    def storage(self, tmp_path):
+        storage = SQLiteStorage(str(tmp_path / 'terrasim.db'))
+        yield storage
+        storage.close()
+    
+    def test_wal_mode_and_seeded_reference_data(self, storage):
+        journal_mode = storage._connection().execute('PRAGMA journal_mode').fetchone()[0]
+        assert journal_mode == 'wal'
+        assert storage.get_crop('rice')['name'] == 'Rice'
+        assert storage.get_terrain_modifiers('mountain')['erosion_risk'] == 0.7
+        assert len(storage.list_terrain_modifiers()) == 5
+    
+    def test_insert_assigns_id_and_timestamp(self, storage):
+        row = storage.insert_simulation(make_record())
+        assert row['id'] and row['created_at'].endswith('+00:00')
+        history = storage.list_simulations(parse_history_query({})[0])
+        assert history[0]['id'] == row['id']
+        assert history[0]['is_override'] is False
+    
+    def test_bulk_insert_and_keyset_pages(self, storage):
+        storage.insert_simulations([
+            make_record(created_at=f'2024-01-01T00:00:{second:02d}Z') for second in range(5)
+        ])
+        seen, cursor = [], None
+        while True:
+            args = {'limit': '2'}
+            if cursor:
+                args['cursor'] = cursor
+            page, cursor = paginate(storage.list_simulations(parse_history_query(args)[0]), 2)
+            seen.extend(row['created_at'] for row in page)
+            if not cursor:
+                break
+        assert len(seen) == 5
+        assert seen == sorted(seen, reverse=True)
+    
+    def test_filters_ranges_and_projection(self, storage):
+        storage.insert_simulations([
+            make_record(crop='Rice', risk='Low', created_at='2024-01-01T00:00:00Z'),
+            make_record(crop='Wheat', risk='High', created_at='2024-02-01T00:00:00Z'),
+            make_record(crop='Wheat', risk='Low', created_at='2024-03-01T00:00:00Z'),
+        ])
+        query, _ = parse_history_query({
+            'crop': 'Wheat', 'created_to': '2024-02-15T00:00:00', 'columns': 'risk_level'
+        })
+        rows = storage.list_simulations(query)
+        assert [row['risk_level'] for row in rows] == ['High']
+        assert set(rows[0]) == {'risk_level', 'created_at', 'id'}
+    
+    def test_feedback_and_persistence(self, tmp_path, storage):
+        simulation = storage.insert_simulation(make_record())
+        feedback = storage.insert_feedback({'simulation_id': simulation['id'], 'accuracy_rating': 4})
+        assert feedback['id']
+        
+        reopened = SQLiteStorage(str(tmp_path / 'terrasim.db'))
+        assert len(reopened.recent_simulations(10, ('id',))) == 1
+        assert len(reopened.list_crops()) == len(storage.list_crops())
+        reopened.close()
+    
+    def test_feedback_requires_simulation(self, storage):
+        """Foreign keys are enforced on every thread's connection"""
+        errors = []
+        
+        def insert_orphan():
+            try:
+                storage.insert_feedback({'simulation_id': 'missing', 'accuracy_rating': 3})
+            except sqlite3.IntegrityError as e:
+                errors.append(e)
+        
+        insert_orphan()
+        worker = threading.Thread(target=insert_orphan)
+        worker.start()
+        worker.join()
+        assert len(errors) == 2
+
+
+class TestSupabaseConnection:
+    """Test where connect_supabase takes its credentials from"""
+    
+    def test_credentials_come_from_config(self, monkeypatch):
+        monkeypatch.setenv('SUPABASE_URL', 'https://example.supabase.co')
+        monkeypatch.setenv('SUPABASE_KEY', 'key')
+        monkeypatch.setattr(Config, 'SUPABASE_URL', None)
+        monkeypatch.setattr(Config, 'SUPABASE_KEY', None)
+        assert connect_supabase() is None
+
+
+class TestSimulationRecordAPI:
+    """Test the record /api/simulate stores"""
+    
+    def test_rainfall_stored_as_whole_millimetres(self, flask_app, monkeypatch):
+        """avg_rainfall is an INTEGER column; fractional inputs are rounded"""
+        monkeypatch.setattr(flask_app, 'SIMULATION_COALESCING', False)
+        client = flask_app.app.test_client()
+        response = client.post('/api/simulate', json={
+            'crop': 'Rice', 'location': {'lat': 21.5, 'lon': 79.5}, 'terrain': 'plain',
+            'runs': 200, 'weather': {'temp': 27, 'rainfall': 1234.6, 'humidity': 70}
+        })
+        simulation_id = response.get_json()['simulation_id']
+        stored = client.get(f'/api/simulations/{simulation_id}').get_json()
+        assert stored['avg_rainfall'] == 1235
@@ -0,0 +1,208 @@
+import pytest, sys, os, time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from storage.base import StorageProvider
+from storage.guarded import (
+    CircuitBreaker, GuardedStorage, StorageUnavailableError, CLOSED, OPEN, HALF_OPEN
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyStorage(StorageProvider):
+    """Provider whose calls fail or hang on demand"""
+
+    name = 'supabase'
+
+    def __init__(self):
+        self.fail = False
+        self.delay = 0.0
+        self.calls = 0
+
+    def _maybe_fail(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("database unreachable")
+
+    def list_crops(self):
+        self._maybe_fail()
+        return [{'name': 'Wheat'}]
+
+    def get_crop(self, name):
+        self._maybe_fail()
+        return {'name': name} if name == 'Wheat' else None
+
+    def insert_simulations(self, records):
+        self._maybe_fail()
+        return [dict(r, id='sim-1') for r in records]
+
+
+def guarded(inner, failures=3, reset=30.0, timeout=0.1):
+    clock = FakeClock()
+    storage = GuardedStorage(inner, timeout=timeout, breaker=CircuitBreaker(failures, reset, clock=clock))
+    return storage, clock
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Breaker opens only after the failure threshold is reached"""
+        breaker = CircuitBreaker(3, 10.0, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        """Failures must be consecutive to open the breaker"""
+        breaker = CircuitBreaker(2, 10.0, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_half_open_allows_single_probe(self):
+        """After the reset timeout exactly one probe call goes through"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(1, 10.0, clock=clock)
+        breaker.record_failure()
+        clock.now = 10.0
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_probe_outcome_closes_or_reopens(self):
+        """A successful probe closes the breaker; a failed one re-opens it"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(1, 10.0, clock=clock)
+        breaker.record_failure()
+        clock.now = 10.0
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        clock.now = 20.0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+
+class TestGuardedStorage:
+    """Test timeouts, fast failure and cached reference reads"""
+
+    def test_passes_calls_through(self):
+        """Healthy calls return the provider's results"""
+        storage, _ = guarded(FlakyStorage())
+        assert storage.name == 'supabase'
+        assert storage.list_crops() == [{'name': 'Wheat'}]
+        assert storage.get_crop('Rice') is None
+        assert storage.insert_simulation({'crop': 'Wheat'})['id'] == 'sim-1'
+
+    def test_errors_propagate_without_cache(self):
+        """A failing call with nothing cached raises the provider's error"""
+        inner = FlakyStorage()
+        inner.fail = True
+        storage, _ = guarded(inner)
+        with pytest.raises(ConnectionError):
+            storage.list_crops()
+
+    def test_open_breaker_fails_fast(self):
+        """Once open, calls are refused without reaching the provider"""
+        inner = FlakyStorage()
+        inner.fail = True
+        storage, _ = guarded(inner, failures=2)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                storage.insert_simulations([{}])
+        with pytest.raises(StorageUnavailableError):
+            storage.insert_simulations([{}])
+        assert inner.calls == 2
+
+    def test_serves_last_good_reference_data(self):
+        """Reference reads fall back to the last successful result"""
+        inner = FlakyStorage()
+        storage, _ = guarded(inner, failures=1)
+        assert storage.get_crop('Wheat') == {'name': 'Wheat'}
+        inner.fail = True
+        assert storage.get_crop('Wheat') == {'name': 'Wheat'}
+        assert storage.breaker.state == OPEN
+        assert storage.get_crop('Wheat') == {'name': 'Wheat'}
+        with pytest.raises(StorageUnavailableError):
+            storage.get_crop('Maize')
+
+    def test_cache_skips_misses_and_is_bounded(self, monkeypatch):
+        """Lookups of unknown names add nothing; old results are evicted"""
+        monkeypatch.setattr(GuardedStorage, 'CACHE_SIZE', 2)
+        storage, _ = guarded(FlakyStorage())
+        for name in ('Maize', 'Barley', 'Oats'):
+            assert storage.get_crop(name) is None
+        assert len(storage._cache) == 0
+        storage.get_crop('Wheat')
+        storage.list_crops()
+        storage.get_crop('Wheat')
+        storage.insert_simulations([{}])
+        assert list(storage._cache) == [('list_crops',), ('get_crop', 'Wheat')]
+
+    def test_timeout_counts_as_failure(self):
+        """A hung call is abandoned after the timeout and trips the breaker"""
+        inner = FlakyStorage()
+        storage, _ = guarded(inner, failures=1, timeout=0.05)
+        inner.delay = 0.3
+        with pytest.raises(StorageUnavailableError):
+            storage.list_crops()
+        assert storage.breaker.state == OPEN
+        storage.close()
+
+    def test_recovers_after_reset(self):
+        """A successful probe after the reset timeout closes the breaker"""
+        inner = FlakyStorage()
+        inner.fail = True
+        storage, clock = guarded(inner, failures=1, reset=5.0)
+        with pytest.raises(ConnectionError):
+            storage.list_crops()
+        inner.fail = False
+        with pytest.raises(StorageUnavailableError):
+            storage.list_crops()
+        clock.now = 5.0
+        assert storage.list_crops() == [{'name': 'Wheat'}]
+        assert storage.breaker.state == CLOSED
+
+
+class UnavailableStorage:
+    """Storage whose simulation reads are refused by an open breaker"""
+
+    name = 'supabase'
+
+    def _refuse(self, *args):
+        raise StorageUnavailableError("Storage circuit breaker is open")
+
+    get_simulation = get_simulations = list_simulations = _refuse
+
+
+class TestUnavailableRoutes:
+    """Test that stored-simulation routes answer 503 while storage is unavailable"""
+
+    @pytest.mark.parametrize('path', [
+        '/api/simulations/export',
+        '/api/simulations/abc/runs',
+        '/api/simulations/compare?ids=a,b',
+        '/api/simulations/abc',
+    ])
+    def test_returns_503_with_retry_after(self, flask_app, monkeypatch, path):
+        monkeypatch.setattr(flask_app, 'get_storage', lambda: UnavailableStorage())
+        response = flask_app.app.test_client().get(path)
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
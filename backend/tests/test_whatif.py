@@ -0,0 +1,137 @@
+"""
+Tests for what-if sessions and re-scoring of fixed random draws
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import MonteCarloSimulator, PenaltyEngine, RunDraws, run_simulation
+from utils.whatif import WhatIfSessions
+from utils.reference_data import MOCK_CROPS, default_terrain_modifiers
+
+ENVIRONMENT = {
+    'avg_temp': 26, 'avg_rainfall': 1200, 'humidity': 75, 'wind_speed': 8,
+    'elevation': 100, 'terrain': 'plain', 'latitude': 13.0, 'longitude': 80.0
+}
+
+PAYLOAD = {
+    'crop': 'Rice', 'location': {'lat': 13.0, 'lon': 80.0}, 'terrain': 'plain',
+    'runs': 500, 'weather': {'temp': 26, 'rainfall': 1200, 'humidity': 75}
+}
+
+
+def simulate_runs(environment, seed=None, draws=None):
+    penalty_engine = PenaltyEngine(MOCK_CROPS[1], environment, default_terrain_modifiers('plain'))
+    simulator = MonteCarloSimulator(MOCK_CROPS[1], environment, penalty_engine, runs=300, seed=seed, draws=draws)
+    return list(simulator.iter_runs())
+
+
+class TestRunDraws:
+    """Test sampling and re-scoring of draws"""
+
+    def test_rescoring_reproduces_runs(self):
+        """Unchanged inputs re-scored from draws give the original runs"""
+        draws = RunDraws.sample(300, seed=11)
+        assert len(draws) == 300
+        assert draws.nbytes == 300 * 33
+        assert simulate_runs(ENVIRONMENT, draws=draws) == simulate_runs(ENVIRONMENT, seed=11)
+
+    def test_edit_keeps_events_and_deviates(self):
+        """After an edit, events are unchanged and weather shifts by the edit"""
+        draws = RunDraws.sample(300, seed=11)
+        before = simulate_runs(ENVIRONMENT, draws=draws)
+        after = simulate_runs(dict(ENVIRONMENT, avg_temp=30), draws=draws)
+        for old, new in zip(before, after):
+            assert new['temp'] == pytest.approx(old['temp'] + 4)
+            assert new['rainfall'] == old['rainfall']
+            for event in ('had_pest', 'had_disease', 'had_extreme_weather'):
+                assert new[event] == old[event]
+
+    def test_pipeline_uses_draws(self):
+        """The pipeline runs as many iterations as there are draws"""
+        args = (MOCK_CROPS[1], ENVIRONMENT, default_terrain_modifiers('plain'))
+        draws = RunDraws.sample(400, seed=5)
+        for mode in ('full', 'streaming'):
+            outcome = run_simulation(*args, runs=10000, mode=mode, draws=draws)
+            assert outcome['simulation_runs'] == 400
+            assert outcome['success_rate'] == run_simulation(*args, runs=400, seed=5)['success_rate']
+
+
+class TestWhatIfSessions:
+    """Test session lifetime and eviction"""
+
+    def test_expiry(self, monkeypatch):
+        sessions = WhatIfSessions(ttl=10)
+        now = [1000.0]
+        monkeypatch.setattr('utils.whatif.time.time', lambda: now[0])
+        session = sessions.create({'crop': 'Rice'}, RunDraws.sample(10, seed=1))
+        now[0] += 9
+        assert sessions.get(session['id']) is not None
+        now[0] += 9
+        # The get above renewed the session
+        assert sessions.get(session['id']) is not None
+        now[0] += 11
+        assert sessions.get(session['id']) is None
+        assert sessions.stats() == {'sessions': 0, 'bytes': 0}
+
+    def test_evicts_least_recently_used(self):
+        sessions = WhatIfSessions(max_sessions=2)
+        first = sessions.create({}, RunDraws.sample(10, seed=1))
+        second = sessions.create({}, RunDraws.sample(10, seed=2))
+        sessions.get(first['id'])
+        sessions.create({}, RunDraws.sample(10, seed=3))
+        assert sessions.get(first['id']) is not None
+        assert sessions.get(second['id']) is None
+
+    def test_memory_budget(self):
+        """Older sessions make room for new draws; the newest is always kept"""
+        sessions = WhatIfSessions(max_bytes=100 * 33)
+        first = sessions.create({}, RunDraws.sample(60, seed=1))
+        second = sessions.create({}, RunDraws.sample(60, seed=2))
+        assert sessions.get(first['id']) is None
+        assert sessions.stats() == {'sessions': 1, 'bytes': 60 * 33}
+        assert sessions.delete(second['id'])
+        assert not sessions.delete(second['id'])
+
+
+class TestWhatIfAPI:
+    """Test the what-if endpoints"""
+
+    @pytest.fixture
+    def client(self, flask_app):
+        return flask_app.app.test_client()
+
+    def test_session_lifecycle(self, client):
+        """Create, edit and delete a session"""
+        response = client.post('/api/whatif', json=PAYLOAD)
+        assert response.status_code == 201
+        created = response.get_json()
+        session_id = created['session_id']
+        assert response.headers['Location'] == f'/api/whatif/{session_id}'
+        assert created['simulation_runs'] == 500
+        assert 'simulation_id' not in created
+
+        # Re-scoring the same inputs gives the same answer
+        unchanged = client.patch(f'/api/whatif/{session_id}', json={'terrain': 'plain'}).get_json()
+        assert unchanged['success_probability'] == created['success_probability']
+        assert unchanged['expected_yield'] == created['expected_yield']
+
+        # Weather edits merge into the session's weather
+        edited = client.patch(f'/api/whatif/{session_id}', json={
+            'weather': {'temp': 40}, 'fields': ['expected_yield']
+        }).get_json()
+        assert set(edited) == {'expected_yield', 'session_id', 'expires_in'}
+        assert edited['expected_yield'] < created['expected_yield']
+
+        assert client.delete(f'/api/whatif/{session_id}').status_code == 204
+        assert client.patch(f'/api/whatif/{session_id}', json={'terrain': 'hilly'}).status_code == 404
+
+    def test_invalid_edits(self, client):
+        session_id = client.post('/api/whatif', json=PAYLOAD).get_json()['session_id']
+        assert client.patch(f'/api/whatif/{session_id}', json={'runs': 1000}).status_code == 400
+        assert client.patch(f'/api/whatif/{session_id}', json={'weather': {'temp': 500}}).status_code == 400
+        assert client.delete('/api/whatif/unknown').status_code == 404
@@ -0,0 +1,86 @@
+"""
+Run a file of simulation scenarios offline, without the API.
+
+Usage (from the backend directory):
+    python tools/batch_run.py scenarios.csv -o results.jsonl --workers 8
+    python tools/batch_run.py scenarios.jsonl -o results.csv --runs 5000
+    python tools/batch_run.py scenarios.csv -o results.jsonl --workers 8 --resume
+
+CSV columns (or flat JSONL keys): id, crop, terrain, lat, lon and optional
+temp, rainfall, humidity, wind, elevation, runs and seed. JSONL lines may
+also be /api/simulate payloads. Crop and terrain profiles are resolved like
+the API (storage first, built-in profiles as fallback) and missing weather
+falls back to the climatology grid at CLIMATOLOGY_PATH.
+
+Results are written in input order. A checkpoint file (<output>.checkpoint)
+is updated every --checkpoint-every scenarios; --resume continues an
+interrupted run from it. Progress and throughput are reported on stderr.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from storage import open_storage
+from utils.batch import (
+    OUTPUT_FORMATS, ScenarioResolver, ProgressReporter, count_scenarios, run_batch
+)
+from utils.weather_service import WeatherService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run simulation scenarios from a CSV or JSONL file")
+    parser.add_argument('input', help="CSV or JSONL scenario file")
+    parser.add_argument('-o', '--output', required=True, help="Result file")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, help="Result format (default: from the output extension, else jsonl)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument('--runs', type=int, default=Config.DEFAULT_SIMULATION_RUNS, help="Runs per scenario without a runs column")
+    parser.add_argument('--summary', action='store_true', help="Include distribution summaries (JSONL only)")
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint of an interrupted run")
+    parser.add_argument('--checkpoint-every', type=int, default=100, help="Scenarios between checkpoints (default 100)")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="Seconds between progress lines (default 5)")
+    parser.add_argument('--storage', default='none', help="Reference data source: none (built-in), auto, supabase or sqlite")
+    parser.add_argument('--sqlite-path', default=Config.SQLITE_PATH, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    output_format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+    if args.runs < 1 or args.workers < 1 or args.checkpoint_every < 1:
+        parser.error("--runs, --workers and --checkpoint-every must be positive")
+
+    storage = open_storage(args.storage, args.sqlite_path)
+    resolver = ScenarioResolver(
+        storage=storage,
+        weather_service=WeatherService(climatology_path=Config.CLIMATOLOGY_PATH),
+        default_runs=args.runs,
+        summary=args.summary
+    )
+    progress = ProgressReporter(total=count_scenarios(args.input), interval=args.progress_interval)
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        run_batch(
+            args.input, args.output, resolver,
+            output_format=output_format,
+            workers=args.workers,
+            resume=args.resume,
+            checkpoint_every=args.checkpoint_every,
+            progress=progress
+        )
+    except ValueError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    finally:
+        if storage is not None:
+            storage.close()
+
+    progress.report(final=True)
+    print(f"[OK] Wrote {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
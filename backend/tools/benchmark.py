@@ -0,0 +1,114 @@
+"""
+Run the benchmark suite and compare results against a baseline.
+
+Usage (from the backend directory):
+    python tools/benchmark.py run -o benchmarks/baseline.json
+    python tools/benchmark.py run -k simulator.run -k api. --repeat 7
+    python tools/benchmark.py compare benchmarks/baseline.json
+    python tools/benchmark.py compare benchmarks/baseline.json current.json --threshold 0.05
+
+`run` times the cases and writes a JSON document (results plus machine and
+engine details). `compare` checks a new document - or a fresh run when only
+the baseline is given - against the baseline and exits with status 1 if
+any case's median time grew by more than the threshold. Baselines are only
+comparable on the same machine and Python version.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.cases import select_cases
+from benchmarks.runner import (
+    DEFAULT_THRESHOLD, run_cases, save_baseline, load_baseline, compare,
+    print_comparison, format_seconds
+)
+
+
+def _print_timing(name, timing):
+    print(
+        f"{name}: {format_seconds(timing['median'])} median "
+        f"(+/- {format_seconds(timing['stdev'])}, {timing['repeat']}x{timing['number']} calls)",
+        flush=True
+    )
+
+
+def _add_run_options(parser):
+    parser.add_argument('-k', '--filter', action='append', help="Only cases whose name contains this (repeatable)")
+    parser.add_argument('--repeat', type=int, default=5, help="Samples per case (default 5)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds per sample (default 0.2)")
+
+
+def _run(args):
+    cases = select_cases(args.filter)
+    if not cases:
+        print("[ERROR] No benchmark cases match", file=sys.stderr)
+        return None
+    return run_cases(cases, repeat=args.repeat, min_time=args.min_time, report=_print_timing)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TerraSim benchmark suite")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Time the benchmark cases")
+    run_parser.add_argument('-o', '--output', help="Write results to this JSON file")
+    _add_run_options(run_parser)
+
+    compare_parser = commands.add_parser('compare', help="Compare results against a baseline")
+    compare_parser.add_argument('baseline', help="Baseline JSON file")
+    compare_parser.add_argument('current', nargs='?', help="Results JSON file (default: run the suite now)")
+    compare_parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help=f"Relative slowdown flagged as a regression (default {DEFAULT_THRESHOLD})"
+    )
+    _add_run_options(compare_parser)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        document = _run(args)
+        if document is None:
+            return 1
+        if args.output:
+            save_baseline(document, args.output)
+            print(f"[OK] Wrote {args.output}")
+        return 0
+
+    try:
+        baseline = load_baseline(args.baseline)
+        if args.current:
+            current = load_baseline(args.current)
+        else:
+            if not args.filter:
+                args.filter = list(baseline['results'])
+            current = _run(args)
+            if current is None:
+                return 1
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    if baseline.get('environment') != current.get('environment'):
+        print("[WARN] Baseline was recorded on a different machine, Python or engine version", file=sys.stderr)
+
+    if args.filter:
+        # Cases left out by the filter are not missing
+        baseline = dict(baseline, results={
+            name: timing for name, timing in baseline['results'].items()
+            if any(pattern in name for pattern in args.filter)
+        })
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    regressions = [row['name'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"[FAIL] {len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"[OK] No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
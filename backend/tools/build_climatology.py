@@ -0,0 +1,57 @@
+"""
+Build an offline climatology grid file from CSV or NetCDF observations.
+
+Usage (from the backend directory):
+    python tools/build_climatology.py observations.csv -o data/climatology.bin
+    python tools/build_climatology.py era5_annual.nc -o data/climatology.bin --resolution 0.25
+
+Each input row (or NetCDF time step) is one observation for a coordinate,
+typically one year of annual means. Observations falling in the same cell are
+reduced to a mean and variance. Point CLIMATOLOGY_PATH at the output file to
+serve get_historical_climate() from it.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.climatology import build_grid, read_csv_observations, read_netcdf_observations
+
+
+def _read_inputs(paths):
+    for path in paths:
+        if path.lower().endswith(('.nc', '.nc4', '.netcdf')):
+            yield read_netcdf_observations(path)
+        else:
+            yield read_csv_observations(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a memory-mapped climatology grid")
+    parser.add_argument('inputs', nargs='+', help="CSV or NetCDF observation files")
+    parser.add_argument('-o', '--output', required=True, help="Output grid file")
+    parser.add_argument('--resolution', type=float, default=0.5, help="Cell size in degrees (default 0.5)")
+    parser.add_argument(
+        '--bounds', type=float, nargs=4, metavar=('LAT_MIN', 'LAT_MAX', 'LON_MIN', 'LON_MAX'),
+        default=(-90.0, 90.0, -180.0, 180.0), help="Area covered by the grid (default: whole globe)"
+    )
+    args = parser.parse_args(argv)
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(output_dir, exist_ok=True)
+
+    observations = itertools.chain.from_iterable(_read_inputs(args.inputs))
+    summary = build_grid(observations, args.output, args.resolution, tuple(args.bounds))
+
+    print(
+        f"[OK] Wrote {args.output}: {summary['nlat']}x{summary['nlon']} cells, "
+        f"{summary['cells_filled']} filled from {summary['observations']} observations"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
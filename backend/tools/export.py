@@ -0,0 +1,112 @@
+"""
+Export stored simulations, or the raw runs of one simulation, to a file.
+
+Usage (from the backend directory):
+    python tools/export.py -o simulations.parquet --format parquet
+    python tools/export.py -o rice.csv --crop Rice --created-from 2024-01-01 --columns id,success_probability
+    python tools/export.py -o runs.arrows --format arrow --simulation-id <id>
+
+Rows are read and written in batches of --batch-size, so exports of any size
+run in bounded memory. Storage is opened the same way as the API
+(STORAGE_BACKEND / SQLITE_PATH unless overridden).
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from storage import open_storage
+from utils.export import (
+    EXPORT_BATCH_SIZE, RUN_COLUMNS, ExportError, resolve_columns, check_format,
+    iter_simulation_batches, iter_run_batches, encode, build_run_simulator
+)
+from utils.history_query import HISTORY_COLUMNS, parse_history_query
+from utils.reference_data import resolve_crop, resolve_terrain_modifiers
+
+
+def _history_args(args):
+    """History filters from command-line options, keyed like the API"""
+    options = {
+        'crop': args.crop, 'terrain': args.terrain, 'risk_level': args.risk_level,
+        'created_from': args.created_from, 'created_to': args.created_to,
+    }
+    if args.bbox:
+        options.update(zip(('lat_min', 'lat_max', 'lon_min', 'lon_max'), map(str, args.bbox)))
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def _run_batches(storage, simulation_id, batch_size):
+    simulation = storage.get_simulation(simulation_id)
+    if not simulation:
+        raise ExportError(f"Simulation not found: {simulation_id}")
+    crop_profile = resolve_crop(storage, simulation['crop_name'])
+    if not crop_profile:
+        raise ExportError(f"Crop not found: {simulation['crop_name']}")
+    simulator = build_run_simulator(
+        simulation, crop_profile, resolve_terrain_modifiers(storage, simulation['terrain'])
+    )
+    return iter_run_batches(simulator, batch_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export simulations as CSV, Arrow IPC or Parquet")
+    parser.add_argument('-o', '--output', required=True, help="Output file")
+    parser.add_argument('--format', default=None, help="csv, arrow or parquet (default: from the output extension, else csv)")
+    parser.add_argument('--columns', help="Comma-separated columns to export (default: all)")
+    parser.add_argument('--simulation-id', help="Export the raw per-run results of this simulation")
+    parser.add_argument('--crop', help="Only simulations of this crop")
+    parser.add_argument('--terrain', help="Only simulations on this terrain")
+    parser.add_argument('--risk-level', help="Only simulations with this risk level")
+    parser.add_argument('--created-from', help="Created at or after (ISO 8601)")
+    parser.add_argument('--created-to', help="Created at or before (ISO 8601)")
+    parser.add_argument(
+        '--bbox', type=float, nargs=4, metavar=('LAT_MIN', 'LAT_MAX', 'LON_MIN', 'LON_MAX'),
+        help="Only simulations inside this bounding box"
+    )
+    parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE, help=f"Rows per batch (default {EXPORT_BATCH_SIZE})")
+    parser.add_argument('--storage', default=Config.STORAGE_BACKEND, help="auto, supabase or sqlite")
+    parser.add_argument('--sqlite-path', default=Config.SQLITE_PATH, help="SQLite database file")
+    args = parser.parse_args(argv)
+
+    export_format = args.format
+    if export_format is None:
+        extension = os.path.splitext(args.output)[1].lower()
+        export_format = {'.parquet': 'parquet', '.arrow': 'arrow', '.arrows': 'arrow'}.get(extension, 'csv')
+
+    try:
+        export_format = check_format(export_format)
+        storage = open_storage(args.storage, args.sqlite_path)
+        if storage is None:
+            raise ExportError("No storage configured")
+
+        if args.simulation_id:
+            columns = resolve_columns(args.columns, RUN_COLUMNS)
+            batches = _run_batches(storage, args.simulation_id, args.batch_size)
+        else:
+            columns = resolve_columns(args.columns, HISTORY_COLUMNS)
+            query, error = parse_history_query(_history_args(args))
+            if error:
+                raise ExportError(error)
+            query['columns'] = columns
+            batches = iter_simulation_batches(storage, query, args.batch_size)
+
+        output_dir = os.path.dirname(os.path.abspath(args.output))
+        os.makedirs(output_dir, exist_ok=True)
+        written = 0
+        with open(args.output, 'wb') as f:
+            for chunk in encode(batches, columns, export_format):
+                f.write(chunk)
+                written += len(chunk)
+    except ExportError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    print(f"[OK] Wrote {args.output}: {written} bytes ({export_format}, {len(columns)} columns)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Load-test the API locally against stubbed Supabase and weather services.
+
+Usage (from the backend directory):
+    python tools/loadtest.py --workers 4 --concurrency 16 --duration 30
+    python tools/loadtest.py --workers 2 --rate 50 --mix crops=1,simulate=3,history=1
+    python tools/loadtest.py --env SIMULATION_EXECUTION=pool --env DEFAULT_SIMULATION_RUNS=5000 -o pool.json
+
+Starts --workers API processes (each with an in-process Supabase stand-in)
+and a stub weather server, sends the request mix for --warmup plus
+--duration seconds, and reports throughput, p50/p95/p99 latency and error
+rate per endpoint, plus CPU and memory per worker. Use --env to compare
+configurations before shipping them.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.loadtest import parse_mix, start_workers, stop_workers, run_load, ResourceMonitor
+from benchmarks.stubs import start_weather_stub
+
+
+def _print_report(report):
+    print(
+        f"\n{report['mode']}-loop, {report['duration_s']}s measured, "
+        f"concurrency {report['concurrency']}" + (f", target {report['rate']} req/s" if report['rate'] else '')
+    )
+    header = f"{'endpoint':<10} {'requests':>8} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header)
+    rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+    for name, stats in rows:
+        error_rate = f"{stats['error_rate']:.1%}" if stats['error_rate'] is not None else '-'
+        print(
+            f"{name:<10} {stats['requests']:>8} {stats['throughput_rps'] or 0:>8} {error_rate:>7} "
+            + ' '.join(f"{stats[key] if stats[key] is not None else '-':>8}" for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+        )
+    if report['dropped']:
+        print(f"[WARN] {report['dropped']} requests not sent: all {report['concurrency']} clients busy")
+
+    print(f"\n{'worker pid':<10} {'cpu %':>7} {'cpu s':>7} {'rss MB':>8} {'peak MB':>8}")
+    for worker in report['workers']:
+        print(
+            f"{worker['pid']:<10} {worker['cpu_percent'] if worker['cpu_percent'] is not None else '-':>7} "
+            f"{worker.get('cpu_seconds', '-'):>7} {worker['rss_mb'] if worker['rss_mb'] is not None else '-':>8} "
+            f"{worker['peak_rss_mb'] if worker['peak_rss_mb'] is not None else '-':>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local load test with stubbed backends")
+    parser.add_argument('--workers', type=int, default=2, help="API worker processes (default 2)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients, or in-flight cap with --rate (default 8)")
+    parser.add_argument('--rate', type=float, help="Open-loop target requests per second (default: closed loop)")
+    parser.add_argument('--duration', type=float, default=20, help="Measured seconds (default 20)")
+    parser.add_argument('--warmup', type=float, default=3, help="Unmeasured seconds before measuring (default 3)")
+    parser.add_argument('--mix', help="Endpoint weights, e.g. crops=2,weather=2,simulate=4,history=2")
+    parser.add_argument('--storage-latency-ms', type=float, default=0, help="Latency added to each Supabase stand-in query")
+    parser.add_argument('--weather-latency-ms', type=float, default=0, help="Latency added to each weather stub response")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help="Extra worker environment (repeatable)")
+    parser.add_argument('--seed', type=int, help="Seed for the request mix")
+    parser.add_argument('-o', '--output', help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        env = dict(item.split('=', 1) for item in args.env)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.workers < 1 or args.concurrency < 1 or args.duration <= 0 or (args.rate is not None and args.rate <= 0):
+        parser.error("--workers, --concurrency, --duration and --rate must be positive")
+
+    weather_server, weather_url = start_weather_stub(latency=args.weather_latency_ms / 1000)
+    workers = []
+    try:
+        print(f"Starting {args.workers} worker(s)...", flush=True)
+        workers = start_workers(args.workers, weather_url, env, storage_latency=args.storage_latency_ms / 1000)
+        monitor = ResourceMonitor([worker.pid for worker in workers]).start()
+        report = run_load(
+            [worker.url for worker in workers], mix, args.duration,
+            concurrency=args.concurrency, rate=args.rate, warmup=args.warmup, seed=args.seed,
+            on_tick=lambda done: print(f"\r{done} requests measured", end='', flush=True)
+        )
+        report['workers'] = monitor.stop()
+    except RuntimeError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    finally:
+        stop_workers(workers)
+        weather_server.shutdown()
+
+    report.update(mix=mix, env=env, worker_count=args.workers)
+    _print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Wrote {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Admission control for CPU-bound simulation requests.
+
+At most `max_concurrent` simulations run at once; up to `queue_depth` more
+wait for a slot, for no longer than `max_wait` seconds. Anything beyond that
+is rejected immediately with a suggested retry delay, so overload shows up
+as fast 429 responses rather than every request slowing down together.
+
+Waiting requests are grouped by client and slots are handed out round-robin
+across clients, so one client's burst cannot starve everyone else queued
+behind it. An optional per-client limit caps how many slots (running plus
+queued) a single client may hold.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Initial guess of how long a simulation holds its slot, before any finished
+DEFAULT_SERVICE_SECONDS = 1.0
+# Weight of the latest hold time in the moving average
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted"""
+
+    def __init__(self, reason: str, retry_after: int):
+        """
+        Args:
+            reason: 'queue_full', 'client_limit' or 'timeout'
+            retry_after: Suggested seconds before retrying
+        """
+        super().__init__(f"Request not admitted ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, client: str):
+        self.client = client
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded, per-client fair wait queue"""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        queue_depth: int = 0,
+        max_wait: float = 10.0,
+        client_limit: int = 0
+    ):
+        """
+        Args:
+            max_concurrent: Requests allowed to run at once
+            queue_depth: Requests allowed to wait for a slot
+            max_wait: Seconds a request may wait before it is rejected
+            client_limit: Slots (running plus queued) one client may hold;
+                0 for no per-client limit
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_depth = max(0, queue_depth)
+        self.max_wait = max_wait
+        self.client_limit = client_limit
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+        # client -> waiters in arrival order; clients in round-robin order
+        self._waiting: 'OrderedDict[str, deque[_Waiter]]' = OrderedDict()
+        self._held: Dict[str, int] = {}
+        self._service_seconds = DEFAULT_SERVICE_SECONDS
+
+    @contextmanager
+    def slot(self, client: str = '', timeout: Optional[float] = None):
+        """
+        Hold a slot while the block runs.
+
+        Args:
+            client: Client identity used for fair sharing
+            timeout: Longest wait for this request (capped at max_wait)
+
+        Yields:
+            Seconds spent waiting for the slot
+
+        Raises:
+            AdmissionRejected: if the queue is full, the client is over its
+                limit, or no slot freed up in time
+        """
+        waited = self.acquire(client, timeout)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(client, time.monotonic() - start)
+
+    def acquire(self, client: str = '', timeout: Optional[float] = None) -> float:
+        """Take a slot, waiting if needed (see slot()); returns the wait in seconds"""
+        start = time.monotonic()
+        with self._lock:
+            if self.client_limit and self._held.get(client, 0) >= self.client_limit:
+                raise AdmissionRejected('client_limit', self._retry_after())
+            if self._running < self.max_concurrent and not self._queued:
+                self._running += 1
+                self._held[client] = self._held.get(client, 0) + 1
+                return 0.0
+            if self._queued >= self.queue_depth:
+                raise AdmissionRejected('queue_full', self._retry_after())
+            waiter = _Waiter(client)
+            self._waiting.setdefault(client, deque()).append(waiter)
+            self._queued += 1
+            self._held[client] = self._held.get(client, 0) + 1
+
+        waiter.event.wait(self.max_wait if timeout is None else max(0.0, min(timeout, self.max_wait)))
+        with self._lock:
+            if not waiter.granted:
+                self._remove(waiter)
+                raise AdmissionRejected('timeout', self._retry_after())
+        return time.monotonic() - start
+
+    def release(self, client: str = '', held_seconds: Optional[float] = None):
+        """
+        Give a slot back; it passes straight to the next client in turn.
+
+        Args:
+            client: Client the slot was acquired for
+            held_seconds: How long the slot was held (updates the retry estimate)
+        """
+        with self._lock:
+            self._drop_hold(client)
+            if held_seconds is not None:
+                self._service_seconds += SERVICE_TIME_SMOOTHING * (held_seconds - self._service_seconds)
+            if not self._waiting:
+                self._running -= 1
+                return
+            next_client, waiters = next(iter(self._waiting.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiting.move_to_end(next_client)
+            else:
+                del self._waiting[next_client]
+            self._queued -= 1
+            waiter.granted = True
+            waiter.event.set()
+
+    def _remove(self, waiter: _Waiter):
+        waiters = self._waiting.get(waiter.client)
+        if waiters is not None:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiting[waiter.client]
+        self._queued -= 1
+        self._drop_hold(waiter.client)
+
+    def _drop_hold(self, client: str):
+        remaining = self._held.get(client, 0) - 1
+        if remaining > 0:
+            self._held[client] = remaining
+        else:
+            self._held.pop(client, None)
+
+    def _retry_after(self) -> int:
+        # Time for the queue ahead (plus this request) to drain through the slots
+        drain = (self._queued + 1) * self._service_seconds / self.max_concurrent
+        return max(1, math.ceil(drain))
+
+    def stats(self) -> Dict[str, float]:
+        """Current load: running and queued requests, capacity and clients holding slots"""
+        with self._lock:
+            return {
+                'running': self._running,
+                'queued': self._queued,
+                'max_concurrent': self.max_concurrent,
+                'queue_depth': self.queue_depth,
+                'clients': len(self._held),
+                'service_seconds': round(self._service_seconds, 3),
+            }
@@ -0,0 +1,468 @@
+"""
+Offline batch execution of simulation scenarios.
+
+Scenarios are read lazily from CSV or JSONL, resolved into engine inputs with
+the same lookups as the /api/simulate endpoint, run across worker processes
+and written to CSV or JSONL in input order. A small checkpoint file next to
+the output records how many scenarios are done and how many output bytes
+belong to them, so an interrupted run resumes where it stopped.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from engine.pipeline import run_simulation
+from utils.reference_data import resolve_crop, resolve_terrain_modifiers, build_environment
+from utils.validators import validate_input
+
+OUTPUT_FORMATS = ('jsonl', 'csv')
+
+# Accepted column names for flat (CSV or flat JSONL) scenarios
+COLUMN_ALIASES = {
+    'id': ('id', 'scenario_id', 'name'),
+    'crop': ('crop', 'crop_name'),
+    'terrain': ('terrain',),
+    'lat': ('lat', 'latitude'),
+    'lon': ('lon', 'longitude', 'lng'),
+    'temp': ('temp', 'avg_temp', 'temperature'),
+    'rainfall': ('rainfall', 'avg_rainfall'),
+    'humidity': ('humidity',),
+    'wind': ('wind', 'wind_speed'),
+    'elevation': ('elevation',),
+    'runs': ('runs', 'simulation_runs'),
+    'seed': ('seed',),
+}
+WEATHER_KEYS = ('temp', 'rainfall', 'humidity', 'wind')
+
+RESULT_COLUMNS = (
+    'id', 'crop', 'terrain', 'lat', 'lon',
+    'avg_temp', 'avg_rainfall', 'humidity', 'wind_speed',
+    'success_probability', 'expected_yield', 'risk_level', 'is_override',
+    'yield_min', 'yield_avg', 'yield_max', 'simulation_runs', 'seed',
+    'explanation', 'error'
+)
+
+
+# ============================================
+# Scenario input
+# ============================================
+
+def _number(value):
+    if value is None or value == '':
+        return None
+    number = float(value)
+    return int(number) if number.is_integer() and '.' not in str(value) else number
+
+
+def scenario_from_row(row: Dict) -> Dict:
+    """
+    Convert a flat scenario row into a simulation payload.
+
+    Args:
+        row: Mapping with id, crop, terrain, lat, lon and optional temp,
+            rainfall, humidity, wind, elevation, runs and seed (see
+            COLUMN_ALIASES for accepted names)
+
+    Returns:
+        Payload in the /api/simulate shape plus id, runs and seed
+    """
+    values = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if row.get(alias) not in (None, ''):
+                values[key] = row[alias]
+                break
+
+    payload = {
+        'id': values.get('id'),
+        'crop': values.get('crop'),
+        'terrain': values.get('terrain'),
+        'location': {'lat': _number(values.get('lat')), 'lon': _number(values.get('lon'))},
+        'weather': {key: _number(values[key]) for key in WEATHER_KEYS if key in values},
+    }
+    for key in ('elevation', 'runs', 'seed'):
+        if key in values:
+            payload[key] = _number(values[key])
+    return {key: value for key, value in payload.items() if value is not None}
+
+
+def read_scenarios(path: str) -> Iterator[Dict]:
+    """
+    Stream scenarios from a CSV or JSONL file.
+
+    JSONL lines may be /api/simulate payloads (with "location" and
+    "weather" objects) or flat rows like the CSV columns. Scenarios without
+    an id are numbered by their position (starting at 1).
+
+    Args:
+        path: Input file; '.csv' is read as CSV, anything else as JSONL
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = (scenario_from_row(row) for row in csv.DictReader(f))
+            yield from _numbered(rows)
+    else:
+        with open(path, encoding='utf-8') as f:
+            rows = (json.loads(line) for line in f if line.strip())
+            yield from _numbered(row if 'location' in row else scenario_from_row(row) for row in rows)
+
+
+def _numbered(scenarios: Iterable[Dict]) -> Iterator[Dict]:
+    for position, scenario in enumerate(scenarios, start=1):
+        scenario.setdefault('id', str(position))
+        yield scenario
+
+
+def count_scenarios(path: str) -> int:
+    """Number of scenarios in an input file (for progress reporting)"""
+    with open(path, 'rb') as f:
+        lines = sum(1 for line in f if line.strip())
+    return max(0, lines - 1) if path.lower().endswith('.csv') else lines
+
+
+class ScenarioResolver:
+    """
+    Turns scenario payloads into run_simulation arguments.
+
+    Crop and terrain lookups go through resolve_crop/resolve_terrain_modifiers
+    (storage first, built-in profiles as fallback) and are cached per name,
+    so a file of thousands of scenarios costs one lookup per distinct crop.
+    """
+
+    def __init__(self, storage=None, weather_service=None, default_runs: int = 10000, summary: bool = False):
+        """
+        Args:
+            storage: StorageProvider, or None to use built-in profiles only
+            weather_service: WeatherService for climatology baselines (optional)
+            default_runs: Runs for scenarios that do not set their own
+            summary: Also build distribution summaries
+        """
+        self.storage = storage
+        self.weather_service = weather_service
+        self.default_runs = default_runs
+        self.summary = summary
+        self._crops: Dict[str, Optional[Dict]] = {}
+        self._terrain: Dict[str, Dict] = {}
+
+    def resolve(self, scenario: Dict) -> Tuple[Optional[Tuple], Optional[str]]:
+        """
+        Returns:
+            (run_simulation arguments, None) or (None, error message)
+        """
+        error = validate_input(scenario)
+        if error:
+            return None, error
+
+        crop_key = scenario['crop'].lower()
+        if crop_key not in self._crops:
+            self._crops[crop_key] = resolve_crop(self.storage, scenario['crop'])
+        crop_profile = self._crops[crop_key]
+        if not crop_profile:
+            return None, f"Crop not found: {scenario['crop']}"
+
+        terrain = scenario['terrain']
+        if terrain not in self._terrain:
+            self._terrain[terrain] = resolve_terrain_modifiers(self.storage, terrain)
+
+        baseline = None
+        if self.weather_service is not None:
+            baseline = self.weather_service.get_climate_baseline(
+                scenario['location']['lat'], scenario['location']['lon']
+            )
+        environment = build_environment(scenario, baseline)
+
+        runs = scenario.get('runs') or self.default_runs
+        if not isinstance(runs, int) or runs < 1:
+            return None, "runs must be a positive integer"
+
+        return (crop_profile, environment, self._terrain[terrain], runs, scenario.get('seed'), self.summary), None
+
+
+# ============================================
+# Execution
+# ============================================
+
+def _run_task(task: Tuple) -> Dict:
+    """Worker entry point"""
+    crop_profile, environment, terrain_modifiers, runs, seed, summary = task
+    outcome = run_simulation(crop_profile, environment, terrain_modifiers, runs, seed=seed, summary=summary)
+    outcome.pop('timings', None)
+    outcome['inputs'] = {key: environment[key] for key in ('avg_temp', 'avg_rainfall', 'humidity', 'wind_speed')}
+    return outcome
+
+
+def run_scenarios(
+    scenarios: Iterable[Dict],
+    resolve: Callable[[Dict], Tuple[Optional[Tuple], Optional[str]]],
+    workers: int = 1,
+    window: Optional[int] = None
+) -> Iterator[Tuple[Dict, Optional[Dict], Optional[str]]]:
+    """
+    Run scenarios, yielding results in input order.
+
+    At most `window` scenarios are in flight at once, so memory stays
+    bounded however long the input is.
+
+    Args:
+        scenarios: Scenario payloads
+        resolve: Function mapping a scenario to (task, error)
+        workers: Worker processes (1 runs in this process)
+        window: Maximum in-flight scenarios (default: 4 per worker)
+
+    Yields:
+        (scenario, outcome, error) with exactly one of outcome/error set
+    """
+    if workers <= 1:
+        for scenario in scenarios:
+            task, error = resolve(scenario)
+            if error:
+                yield scenario, None, error
+                continue
+            try:
+                yield scenario, _run_task(task), None
+            except Exception as e:
+                yield scenario, None, str(e)
+        return
+
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for scenario in scenarios:
+            task, error = resolve(scenario)
+            pending.append((scenario, executor.submit(_run_task, task) if task else None, error))
+            while len(pending) >= window:
+                yield _collect(pending.popleft())
+        while pending:
+            yield _collect(pending.popleft())
+
+
+def _collect(entry) -> Tuple[Dict, Optional[Dict], Optional[str]]:
+    scenario, future, error = entry
+    if future is None:
+        return scenario, None, error
+    try:
+        return scenario, future.result(), None
+    except Exception as e:
+        return scenario, None, str(e)
+
+
+def result_row(scenario: Dict, outcome: Optional[Dict], error: Optional[str]) -> Dict:
+    """Flat output row for one scenario (see RESULT_COLUMNS)"""
+    location = scenario.get('location') or {}
+    row = {
+        'id': scenario.get('id'),
+        'crop': scenario.get('crop'),
+        'terrain': scenario.get('terrain'),
+        'lat': location.get('lat'),
+        'lon': location.get('lon'),
+    }
+    if error:
+        row['error'] = error
+        return row
+
+    yield_min, yield_avg, yield_max = outcome['yield_range']
+    row.update(outcome['inputs'])
+    row.update({
+        'success_probability': round(outcome['success_rate'], 3),
+        'expected_yield': round(outcome['avg_yield'], 2),
+        'risk_level': outcome['risk_level'],
+        'is_override': outcome['is_override'],
+        'yield_min': round(yield_min, 2),
+        'yield_avg': round(yield_avg, 2),
+        'yield_max': round(yield_max, 2),
+        'simulation_runs': outcome['simulation_runs'],
+        'seed': outcome['seed'],
+        'explanation': outcome['explanation'],
+    })
+    if outcome.get('summary') is not None:
+        row['summary'] = outcome['summary']
+    return row
+
+
+# ============================================
+# Output and checkpoints
+# ============================================
+
+class ResultWriter:
+    """Appends result rows to a JSONL or CSV file"""
+
+    def __init__(self, f, output_format: str, write_header: bool = True):
+        """
+        Args:
+            f: Binary file object opened for writing/appending
+            output_format: 'jsonl' or 'csv'
+            write_header: Write the CSV header (False when resuming)
+        """
+        self.f = f
+        self.output_format = output_format
+        if output_format == 'csv':
+            self._buffer = io.StringIO()
+            self._writer = csv.DictWriter(self._buffer, RESULT_COLUMNS, extrasaction='ignore')
+            if write_header:
+                self._writer.writeheader()
+                self._drain()
+
+    def _drain(self):
+        self.f.write(self._buffer.getvalue().encode('utf-8'))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def write(self, row: Dict):
+        if self.output_format == 'csv':
+            self._writer.writerow(row)
+            self._drain()
+        else:
+            self.f.write(json.dumps(row, separators=(',', ':')).encode('utf-8') + b'\n')
+
+
+def checkpoint_path(output_path: str) -> str:
+    return output_path + '.checkpoint'
+
+
+def load_checkpoint(output_path: str) -> Optional[Dict]:
+    """Checkpoint of a previous run writing to output_path, or None"""
+    try:
+        with open(checkpoint_path(output_path), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(output_path: str, state: Dict):
+    """Atomically replace the checkpoint file"""
+    path = checkpoint_path(output_path)
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+class ProgressReporter:
+    """Periodic progress and throughput lines on stderr"""
+
+    def __init__(self, total: Optional[int] = None, interval: float = 5.0, stream=None, initial: int = 0):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.initial = initial
+        self.done = initial
+        self.failed = 0
+        self.runs = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def update(self, runs: int = 0, failed: bool = False):
+        self.done += 1
+        self.runs += runs
+        self.failed += int(failed)
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def stats(self) -> Dict:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        processed = self.done - self.initial
+        stats = {
+            'done': self.done,
+            'failed': self.failed,
+            'elapsed_s': round(elapsed, 1),
+            'scenarios_per_s': round(processed / elapsed, 2),
+            'runs_per_s': round(self.runs / elapsed),
+        }
+        if self.total:
+            remaining = max(self.total - self.done, 0)
+            stats['total'] = self.total
+            stats['eta_s'] = round(remaining / (processed / elapsed), 1) if processed else None
+        return stats
+
+    def report(self, final: bool = False):
+        stats = self.stats()
+        progress = f"{stats['done']}/{stats['total']}" if self.total else str(stats['done'])
+        line = (
+            f"[{'DONE' if final else 'PROGRESS'}] {progress} scenarios, {stats['failed']} failed, "
+            f"{stats['scenarios_per_s']} scenarios/s, {stats['runs_per_s']} runs/s, {stats['elapsed_s']}s elapsed"
+        )
+        if not final and stats.get('eta_s') is not None:
+            line += f", ETA {stats['eta_s']}s"
+        print(line, file=self.stream, flush=True)
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    resolver: ScenarioResolver,
+    output_format: str = 'jsonl',
+    workers: int = 1,
+    resume: bool = False,
+    checkpoint_every: int = 100,
+    progress: Optional[ProgressReporter] = None
+) -> Dict:
+    """
+    Run every scenario of an input file and write the results.
+
+    Args:
+        input_path: CSV or JSONL scenario file
+        output_path: Result file (truncated unless resuming)
+        resolver: ScenarioResolver used to build engine inputs
+        output_format: 'jsonl' or 'csv'
+        workers: Worker processes
+        resume: Continue from the checkpoint of a previous run, if any
+        checkpoint_every: Scenarios between checkpoints
+        progress: Optional ProgressReporter
+
+    Raises:
+        ValueError: if the checkpoint belongs to a different input or format
+
+    Returns:
+        Final progress statistics
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Output format must be one of: {', '.join(OUTPUT_FORMATS)}")
+
+    state = {'input': os.path.abspath(input_path), 'format': output_format, 'completed': 0, 'offset': 0}
+    checkpoint = load_checkpoint(output_path) if resume else None
+    if checkpoint:
+        if (checkpoint.get('input'), checkpoint.get('format')) != (state['input'], output_format):
+            raise ValueError(
+                f"Checkpoint {checkpoint_path(output_path)} belongs to {checkpoint.get('input')} "
+                f"({checkpoint.get('format')}); remove it or write to another output"
+            )
+        state.update(completed=checkpoint['completed'], offset=checkpoint['offset'])
+
+    progress = progress or ProgressReporter(interval=float('inf'))
+    progress.done = progress.initial = state['completed']
+
+    scenarios = read_scenarios(input_path)
+    for _ in range(state['completed']):
+        next(scenarios, None)
+
+    mode = 'r+b' if state['offset'] and os.path.exists(output_path) else 'wb'
+    with open(output_path, mode) as f:
+        # Drop output written after the last checkpoint
+        f.seek(state['offset'])
+        f.truncate()
+        writer = ResultWriter(f, output_format, write_header=state['offset'] == 0)
+
+        for scenario, outcome, error in run_scenarios(scenarios, resolver.resolve, workers):
+            writer.write(result_row(scenario, outcome, error))
+            state['completed'] += 1
+            progress.update(runs=outcome['simulation_runs'] if outcome else 0, failed=error is not None)
+            if state['completed'] % checkpoint_every == 0:
+                f.flush()
+                state['offset'] = f.tell()
+                save_checkpoint(output_path, state)
+
+        f.flush()
+        state['offset'] = f.tell()
+    save_checkpoint(output_path, dict(state, finished=True))
+    return progress.stats()
@@ -0,0 +1,350 @@
+"""
+Offline climatology grid.
+
+Long-term annual means and variances of temperature, rainfall, humidity and
+wind are stored as a regular lat/lon grid of float32 records in one binary
+file. The file is memory-mapped, so resolving the baseline climate for a
+coordinate is an index computation and a single struct unpack - no network
+call and no parsing.
+
+File layout (little-endian):
+    header: magic, version, lat_min, lon_min, lat_step, lon_step, nlat, nlon, nfields
+    body:   nlat * nlon records of nfields float32 values, row-major by latitude
+Cells without observations are stored as NaN.
+"""
+
+import csv
+import math
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+MAGIC = b'TSCLIM01'
+FORMAT_VERSION = 1
+HEADER_FORMAT = '<8sIddddIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Order of the float32 values inside one cell record
+FIELDS = (
+    'temp_mean', 'temp_var',
+    'rainfall_mean', 'rainfall_var',
+    'humidity_mean', 'humidity_var',
+    'wind_mean', 'wind_var',
+    'samples'
+)
+VARIABLES = ('temp', 'rainfall', 'humidity', 'wind')
+RECORD_FORMAT = '<' + 'f' * len(FIELDS)
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# Accepted input column names for each climate variable
+COLUMN_ALIASES = {
+    'lat': ('lat', 'latitude'),
+    'lon': ('lon', 'longitude', 'lng'),
+    'temp': ('temp', 'avg_temp', 'temperature', 'tas'),
+    'rainfall': ('rainfall', 'avg_rainfall', 'precip', 'precipitation', 'pr'),
+    'humidity': ('humidity', 'relative_humidity', 'hurs'),
+    'wind': ('wind', 'wind_speed', 'sfcwind'),
+}
+
+
+class ClimatologyGrid:
+    """
+    Read-only, memory-mapped view of a climatology grid file.
+    Lookups are O(1) and safe to share between request threads.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open and validate a climatology grid file
+
+        Args:
+            path: Path to a grid file produced by build_grid()
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Climatology grid is empty: {path}")
+
+        if len(self._mm) < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"Climatology grid header is truncated: {path}")
+
+        (magic, version, self.lat_min, self.lon_min, self.lat_step, self.lon_step,
+         self.nlat, self.nlon, nfields) = struct.unpack_from(HEADER_FORMAT, self._mm, 0)
+
+        if magic != MAGIC or version != FORMAT_VERSION or nfields != len(FIELDS):
+            self.close()
+            raise ValueError(f"Not a supported climatology grid file: {path}")
+
+        expected_size = HEADER_SIZE + self.nlat * self.nlon * RECORD_SIZE
+        if len(self._mm) < expected_size:
+            self.close()
+            raise ValueError(f"Climatology grid body is truncated: {path}")
+
+    def cell_index(self, lat: float, lon: float) -> Optional[Tuple[int, int]]:
+        """Return the (row, column) of the cell containing a coordinate, or None if outside the grid"""
+        row = int(math.floor((lat - self.lat_min) / self.lat_step))
+        col = int(math.floor((lon - self.lon_min) / self.lon_step))
+
+        # Points on the upper edge belong to the last cell
+        if row == self.nlat and lat <= self.lat_min + self.nlat * self.lat_step:
+            row -= 1
+        if col == self.nlon and lon <= self.lon_min + self.nlon * self.lon_step:
+            col -= 1
+
+        if not (0 <= row < self.nlat and 0 <= col < self.nlon):
+            return None
+        return row, col
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, float]]:
+        """
+        Fetch long-term climate statistics for a coordinate.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+
+        Returns:
+            Dictionary of means and variances, or None if the cell has no data
+        """
+        index = self.cell_index(lat, lon)
+        if index is None:
+            return None
+
+        offset = HEADER_SIZE + (index[0] * self.nlon + index[1]) * RECORD_SIZE
+        values = struct.unpack_from(RECORD_FORMAT, self._mm, offset)
+        if math.isnan(values[0]):
+            return None
+
+        record = dict(zip(FIELDS, values))
+        result = {
+            'avg_temp_annual': record['temp_mean'],
+            'avg_rainfall_annual': record['rainfall_mean'],
+            'avg_humidity_annual': record['humidity_mean'],
+            'avg_wind_annual': record['wind_mean'],
+            'temp_variance': record['temp_var'],
+            'rainfall_variance': record['rainfall_var'],
+            'humidity_variance': record['humidity_var'],
+            'wind_variance': record['wind_var'],
+        }
+        # Variables missing from the source data are left out rather than NaN
+        result = {key: value for key, value in result.items() if not math.isnan(value)}
+        result['samples'] = int(record['samples'])
+        result['source'] = 'climatology'
+        return result
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ============================================
+# Ingestion
+# ============================================
+
+def _resolve_columns(fieldnames: Sequence[str]) -> Dict[str, str]:
+    """Map canonical variable names to the columns present in an input file"""
+    lowered = {name.strip().lower(): name for name in fieldnames}
+    columns = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                columns[canonical] = lowered[alias]
+                break
+    if 'lat' not in columns or 'lon' not in columns:
+        raise ValueError("Input must contain latitude and longitude columns")
+    return columns
+
+
+def _parse_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def read_csv_observations(path: str) -> Iterator[Tuple[float, ...]]:
+    """
+    Stream observations from a CSV file.
+
+    Each row is one observation (e.g. one year) for a coordinate. Rows for the
+    same grid cell are aggregated into a mean and variance by build_grid().
+    Missing or blank values are treated as absent for that variable.
+
+    Yields:
+        (lat, lon, temp, rainfall, humidity, wind) tuples
+    """
+    with open(path, newline='') as handle:
+        reader = csv.DictReader(handle)
+        columns = _resolve_columns(reader.fieldnames or [])
+        for row in reader:
+            yield tuple(
+                _parse_float(row.get(columns[name])) if name in columns else float('nan')
+                for name in ('lat', 'lon') + VARIABLES
+            )
+
+
+def read_netcdf_observations(
+    path: str,
+    variable_names: Optional[Dict[str, str]] = None
+) -> Iterator[Tuple[float, ...]]:
+    """
+    Stream observations from a NetCDF file with (time, lat, lon) variables.
+
+    Requires the optional netCDF4 package.
+
+    Args:
+        path: NetCDF file path
+        variable_names: Optional mapping of canonical names (lat, lon, temp,
+            rainfall, humidity, wind) to variable names in the file
+
+    Yields:
+        (lat, lon, temp, rainfall, humidity, wind) tuples
+    """
+    try:
+        from netCDF4 import Dataset
+    except ImportError:
+        raise ImportError("NetCDF ingestion requires the netCDF4 package (pip install netCDF4)")
+
+    with Dataset(path) as dataset:
+        names = _resolve_columns(list(dataset.variables.keys()))
+        names.update(variable_names or {})
+
+        lats = dataset.variables[names['lat']][:]
+        lons = dataset.variables[names['lon']][:]
+        data = {
+            name: dataset.variables[names[name]]
+            for name in VARIABLES if name in names
+        }
+        steps = max((var.shape[0] for var in data.values() if var.ndim == 3), default=1)
+
+        for step in range(steps):
+            # Read one time slice at a time to keep memory bounded
+            slices = {
+                name: (var[step] if var.ndim == 3 else var[:])
+                for name, var in data.items()
+            }
+            for i, lat in enumerate(lats):
+                for j, lon in enumerate(lons):
+                    values = []
+                    for name in VARIABLES:
+                        if name not in slices:
+                            values.append(float('nan'))
+                            continue
+                        value = slices[name][i][j]
+                        values.append(float('nan') if value is None or getattr(value, 'mask', False) else float(value))
+                    yield (float(lat), float(lon), *values)
+
+
+def build_grid(
+    observations: Iterable[Tuple[float, ...]],
+    output_path: str,
+    resolution: float = 0.5,
+    bounds: Tuple[float, float, float, float] = (-90.0, 90.0, -180.0, 180.0)
+) -> Dict[str, int]:
+    """
+    Aggregate observations into a climatology grid file.
+
+    Means and variances are accumulated per cell with Welford's algorithm, so
+    inputs are streamed and only cells that have data are held in memory.
+
+    Args:
+        observations: Iterable of (lat, lon, temp, rainfall, humidity, wind)
+        output_path: Destination grid file
+        resolution: Cell size in degrees
+        bounds: (lat_min, lat_max, lon_min, lon_max) covered by the grid
+
+    Returns:
+        Summary with grid dimensions and counts of observations and filled cells
+    """
+    if resolution <= 0:
+        raise ValueError("Resolution must be positive")
+
+    lat_min, lat_max, lon_min, lon_max = bounds
+    nlat = max(1, int(math.ceil((lat_max - lat_min) / resolution)))
+    nlon = max(1, int(math.ceil((lon_max - lon_min) / resolution)))
+
+    # cell -> per-variable [count, mean, M2]
+    cells: Dict[Tuple[int, int], List[List[float]]] = {}
+    observation_count = 0
+
+    for observation in observations:
+        lat, lon = observation[0], observation[1]
+        if math.isnan(lat) or math.isnan(lon):
+            continue
+        row = min(int((lat - lat_min) // resolution), nlat - 1)
+        col = min(int((lon - lon_min) // resolution), nlon - 1)
+        if not (0 <= row < nlat and 0 <= col < nlon) or lat > lat_max or lon > lon_max:
+            continue
+
+        stats = cells.setdefault((row, col), [[0, 0.0, 0.0] for _ in VARIABLES])
+        for acc, value in zip(stats, observation[2:]):
+            if math.isnan(value):
+                continue
+            acc[0] += 1
+            delta = value - acc[1]
+            acc[1] += delta / acc[0]
+            acc[2] += delta * (value - acc[1])
+        observation_count += 1
+
+    nan = float('nan')
+    empty_record = struct.pack(RECORD_FORMAT, *([nan] * len(FIELDS)))
+    tmp_path = f"{output_path}.tmp"
+
+    with open(tmp_path, 'wb') as out:
+        out.write(struct.pack(
+            HEADER_FORMAT, MAGIC, FORMAT_VERSION,
+            lat_min, lon_min, resolution, resolution,
+            nlat, nlon, len(FIELDS)
+        ))
+        for row in range(nlat):
+            records = []
+            for col in range(nlon):
+                stats = cells.get((row, col))
+                if stats is None or stats[0][0] == 0:
+                    # Temperature is required for a cell to count as filled
+                    records.append(empty_record)
+                    continue
+                values = []
+                for count, mean, m2 in stats:
+                    values.append(mean if count else nan)
+                    values.append(m2 / count if count else nan)
+                values.append(max(acc[0] for acc in stats))
+                records.append(struct.pack(RECORD_FORMAT, *values))
+            out.write(b''.join(records))
+
+    # Atomic replace so readers never map a half-written file
+    os.replace(tmp_path, output_path)
+
+    return {
+        'nlat': nlat,
+        'nlon': nlon,
+        'observations': observation_count,
+        'cells_filled': sum(1 for stats in cells.values() if stats[0][0])
+    }
+
+
+def open_climatology(path: Optional[str]) -> Optional[ClimatologyGrid]:
+    """Open a climatology grid if a path is configured and readable, else return None"""
+    if not path:
+        return None
+    try:
+        return ClimatologyGrid(path)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Climatology grid unavailable: {str(e)[:100]}")
+        return None
@@ -0,0 +1,259 @@
+"""
+Streaming export of simulation records and raw per-run results.
+
+Rows are produced in fixed-size batches (keyset pages for stored
+simulations, regenerated runs for a single simulation) and encoded batch by
+batch as CSV, Arrow IPC stream or Parquet, so memory stays bounded no matter
+how many rows are exported. Arrow and Parquet require the optional pyarrow
+package.
+"""
+
+import csv
+import io
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Per-run columns of a regenerated simulation
+RUN_COLUMNS = (
+    'run', 'success', 'yield', 'temp', 'rainfall', 'humidity',
+    'had_pest', 'had_disease', 'had_extreme_weather', 'limiting_factors'
+)
+
+# Logical column types used to build Arrow schemas
+COLUMN_TYPES = {
+    'id': 'string', 'crop_name': 'string', 'terrain': 'string', 'risk_level': 'string',
+    'explanation': 'string', 'created_at': 'string', 'summary': 'string',
+    'latitude': 'float', 'longitude': 'float', 'avg_temp': 'float', 'avg_rainfall': 'float',
+    'humidity': 'float', 'wind_speed': 'float', 'success_probability': 'float',
+    'expected_yield': 'float', 'simulation_runs': 'int', 'is_override': 'bool',
+    'run': 'int', 'success': 'bool', 'yield': 'float', 'temp': 'float', 'rainfall': 'float',
+    'had_pest': 'bool', 'had_disease': 'bool', 'had_extreme_weather': 'bool',
+    'limiting_factors': 'string',
+}
+
+
+class ExportError(ValueError):
+    """Raised for invalid export requests (unknown format, columns, ...)"""
+
+
+def resolve_columns(requested: Optional[str], available: Sequence[str]) -> List[str]:
+    """Validate a comma-separated column list (all columns if empty)"""
+    if not requested:
+        return list(available)
+    columns = [column.strip() for column in requested.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise ExportError(f"Unknown columns: {', '.join(unknown)}")
+    return list(dict.fromkeys(columns))
+
+
+def check_format(export_format: str) -> str:
+    """Validate an export format, checking that pyarrow is present if needed"""
+    export_format = (export_format or 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format != 'csv':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportError(f"{export_format} export requires pyarrow (pip install pyarrow)")
+    return export_format
+
+
+# ============================================
+# Row sources
+# ============================================
+
+def iter_simulation_batches(
+    storage,
+    query: Dict,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[List[Dict]]:
+    """
+    Stored simulations matching a history query, in keyset-paged batches.
+
+    Args:
+        storage: StorageProvider
+        query: Parsed history query; its limit and cursor are managed here
+        batch_size: Rows fetched per page
+    """
+    query = dict(query, limit=batch_size, cursor=query.get('cursor'))
+    if query.get('columns'):
+        query['columns'] = list(dict.fromkeys(list(query['columns']) + ['created_at', 'id']))
+    while True:
+        rows = storage.list_simulations(query)
+        page = rows[:batch_size]
+        if page:
+            yield page
+        if len(rows) <= batch_size:
+            return
+        created_at, row_id = page[-1]['created_at'], page[-1]['id']
+        query['cursor'] = (created_at, str(row_id))
+
+
+def iter_run_batches(simulator, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Raw runs regenerated by a seeded MonteCarloSimulator, in batches"""
+    batch = []
+    for index, result in enumerate(simulator.iter_runs()):
+        row = dict(result, run=index, limiting_factors='; '.join(result['limiting_factors']))
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ============================================
+# Encoders
+# ============================================
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+
+def _project(batch: List[Dict], columns: Sequence[str]) -> List[Dict]:
+    return [{column: _cell(row.get(column)) for column in columns} for row in batch]
+
+
+def encode_csv(batches: Iterable[List[Dict]], columns: Sequence[str]) -> Iterator[bytes]:
+    """CSV with a header row, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for row in _project(batch, columns):
+            writer.writerow(['' if row[column] is None else row[column] for column in columns])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    remainder = buffer.getvalue()
+    if remainder:
+        yield remainder.encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back chunk by chunk"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns: Sequence[str]):
+    import pyarrow as pa
+    types = {'string': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'bool': pa.bool_()}
+    return pa.schema([(column, types[COLUMN_TYPES.get(column, 'string')]) for column in columns])
+
+
+def encode_arrow(batches: Iterable[List[Dict]], columns: Sequence[str], parquet: bool = False) -> Iterator[bytes]:
+    """Arrow IPC stream (one record batch per batch) or Parquet (one row group per batch)"""
+    import pyarrow as pa
+
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    if parquet:
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(_project(batch, columns), schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def encode(batches: Iterable[List[Dict]], columns: Sequence[str], export_format: str) -> Iterator[bytes]:
+    """Encode row batches in the given format as a stream of byte chunks"""
+    if export_format == 'csv':
+        return encode_csv(batches, columns)
+    return encode_arrow(batches, columns, parquet=export_format == 'parquet')
+
+
+# ============================================
+# Raw run regeneration
+# ============================================
+
+def build_run_simulator(simulation: Dict, crop_profile: Dict, terrain_modifiers: Dict):
+    """
+    Recreate the seeded simulator of a stored simulation.
+
+    The seed, exact inputs and engine version come from the stored summary;
+    runs are identical to the original as long as the engine version and
+    the crop and terrain reference data are unchanged.
+
+    Raises:
+        ExportError: if the simulation has no seed or was produced by a
+            different engine version
+    """
+    from engine import __version__, PenaltyEngine, MonteCarloSimulator
+
+    summary = simulation.get('summary') or {}
+    if summary.get('seed') is None:
+        raise ExportError("Simulation has no stored seed; raw runs cannot be regenerated")
+    if summary.get('engine_version') != __version__:
+        raise ExportError(
+            f"Simulation was produced by engine {summary.get('engine_version')}, "
+            f"current engine is {__version__}"
+        )
+
+    inputs = summary.get('inputs') or {}
+    environment = {
+        field: inputs.get(field, simulation.get(field))
+        for field in ('avg_temp', 'avg_rainfall', 'humidity', 'wind_speed')
+    }
+    environment.update(
+        terrain=simulation['terrain'],
+        latitude=simulation['latitude'],
+        longitude=simulation['longitude']
+    )
+
+    penalty_engine = PenaltyEngine(crop_profile, environment, terrain_modifiers)
+    return MonteCarloSimulator(
+        crop_profile=crop_profile,
+        environment=environment,
+        penalty_engine=penalty_engine,
+        runs=summary.get('runs') or simulation.get('simulation_runs') or 10000,
+        seed=summary['seed']
+    )
+
@@ -0,0 +1,177 @@
+"""
+Query parsing for the simulation history API.
+
+History is paged with a keyset cursor on (created_at, id) instead of
+offsets, so each page is an index range scan no matter how deep the client
+pages. Filters map onto indexed columns and the page size is capped.
+"""
+
+import base64
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_HISTORY_PAGE_SIZE = int(os.getenv('DEFAULT_HISTORY_PAGE_SIZE', 50))
+MAX_HISTORY_PAGE_SIZE = int(os.getenv('MAX_HISTORY_PAGE_SIZE', 200))
+
+# Columns of the simulations table clients may project
+HISTORY_COLUMNS = (
+    'id', 'crop_name', 'latitude', 'longitude', 'terrain',
+    'avg_temp', 'avg_rainfall', 'humidity', 'wind_speed',
+    'success_probability', 'expected_yield', 'risk_level',
+    'is_override', 'simulation_runs', 'explanation', 'created_at', 'summary'
+)
+
+# Cursor columns are always selected so the next page can be addressed
+CURSOR_COLUMNS = ('created_at', 'id')
+
+RISK_LEVELS = ('Low', 'Medium', 'High')
+
+
+def encode_cursor(row: Dict) -> str:
+    """Opaque cursor pointing just after the given row"""
+    raw = json.dumps([row['created_at'], row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor into (created_at, id); raises ValueError if malformed.
+
+    Both values end up in storage filters, so they are parsed rather than
+    passed through: created_at must be an ISO 8601 timestamp and comes back
+    in the fixed-width UTC form the stores sort by, id must be a UUID.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        timestamp = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        row_id = uuid.UUID(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).isoformat(timespec='microseconds'), str(row_id)
+
+
+def _parse_float(args, name: str, low: float, high: float) -> Optional[float]:
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not (low <= number <= high):
+        raise ValueError(f"{name} must be between {low:g} and {high:g}")
+    return number
+
+
+def _parse_timestamp(args, name: str) -> Optional[str]:
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp")
+
+
+def parse_history_query(args) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Parse and validate history query parameters.
+
+    Supported parameters:
+        limit: page size (capped at MAX_HISTORY_PAGE_SIZE)
+        cursor: value of X-Next-Cursor from the previous page
+        crop, terrain, risk_level: equality filters
+        created_from, created_to: inclusive created_at range (ISO 8601)
+        lat_min, lat_max, lon_min, lon_max: bounding box
+        columns: comma-separated projection
+
+    Args:
+        args: Mapping of query-string values (e.g. request.args)
+
+    Returns:
+        (query, None) on success or (None, error message)
+    """
+    try:
+        try:
+            limit = int(args.get('limit', DEFAULT_HISTORY_PAGE_SIZE))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        limit = min(limit, MAX_HISTORY_PAGE_SIZE)
+
+        filters = {}
+        for param, column in (('crop', 'crop_name'), ('terrain', 'terrain'), ('risk_level', 'risk_level')):
+            value = args.get(param)
+            if value:
+                filters[column] = value
+        if 'risk_level' in filters and filters['risk_level'] not in RISK_LEVELS:
+            raise ValueError(f"risk_level must be one of: {', '.join(RISK_LEVELS)}")
+
+        ranges = {
+            'created_at': (_parse_timestamp(args, 'created_from'), _parse_timestamp(args, 'created_to')),
+            'latitude': (_parse_float(args, 'lat_min', -90, 90), _parse_float(args, 'lat_max', -90, 90)),
+            'longitude': (_parse_float(args, 'lon_min', -180, 180), _parse_float(args, 'lon_max', -180, 180)),
+        }
+        ranges = {column: bounds for column, bounds in ranges.items() if bounds != (None, None)}
+
+        columns = None
+        if args.get('columns'):
+            requested = [column.strip() for column in args['columns'].split(',') if column.strip()]
+            unknown = [column for column in requested if column not in HISTORY_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+            columns = list(dict.fromkeys(requested + list(CURSOR_COLUMNS)))
+
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except ValueError as e:
+        return None, str(e)
+
+    return {
+        'limit': limit,
+        'cursor': cursor,
+        'filters': filters,
+        'ranges': ranges,
+        'columns': columns,
+    }, None
+
+
+def apply_supabase_query(table, query: Dict):
+    """
+    Build a Supabase/PostgREST select for one history page.
+
+    One extra row is requested so the caller can tell whether a next page
+    exists without a COUNT query.
+    """
+    builder = table.select(','.join(query['columns']) if query['columns'] else '*')
+
+    for column, value in query['filters'].items():
+        builder = builder.eq(column, value)
+    for column, (low, high) in query['ranges'].items():
+        if low is not None:
+            builder = builder.gte(column, low)
+        if high is not None:
+            builder = builder.lte(column, high)
+
+    if query['cursor']:
+        created_at, row_id = query['cursor']
+        builder = builder.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+        )
+
+    return builder.order('created_at', desc=True).order('id', desc=True).limit(query['limit'] + 1)
+
+
+def paginate(rows: List[Dict], limit: int) -> Tuple[List[Dict], Optional[str]]:
+    """Trim the look-ahead row and compute the cursor for the next page"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1])
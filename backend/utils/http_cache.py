@@ -0,0 +1,81 @@
+"""
+Validators for HTTP conditional caching of reference data.
+
+Crop profiles change rarely, so their endpoints carry an ETag derived from
+the content (the reference data version) and a Last-Modified time, letting
+browsers and CDNs revalidate with a 304 instead of downloading the payload
+again. Last-Modified is the newest `updated_at` of the rows when the store
+records one, and otherwise the time this process first served the version.
+
+ETags are weak: the same version may be sent with different encodings.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+
+def reference_version(payload) -> str:
+    """Stable digest of a JSON-like payload (dict key order does not matter)"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class VersionClock:
+    """Remembers when each reference data version was first served"""
+
+    def __init__(self, max_versions: int = 256):
+        """
+        Args:
+            max_versions: Versions remembered; the least recently used go first
+        """
+        self.max_versions = max_versions
+        self._first_seen: 'OrderedDict[str, datetime]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def first_seen(self, version: str) -> datetime:
+        with self._lock:
+            seen = self._first_seen.get(version)
+            if seen is None:
+                # HTTP dates have one-second resolution
+                seen = self._first_seen[version] = datetime.now(timezone.utc).replace(microsecond=0)
+                while len(self._first_seen) > self.max_versions:
+                    self._first_seen.popitem(last=False)
+            else:
+                self._first_seen.move_to_end(version)
+            return seen
+
+    def last_modified(self, rows: Iterable[Dict], version: str) -> datetime:
+        """
+        Last-Modified time for a version.
+
+        Args:
+            rows: Reference rows in the payload
+            version: reference_version of the payload
+
+        Returns:
+            Newest row updated_at, or when the version was first served
+        """
+        stamps = [_parse_timestamp(row.get('updated_at')) for row in rows]
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        if stamps:
+            return max(stamps).replace(microsecond=0)
+        return self.first_seen(version)
@@ -0,0 +1,116 @@
+"""
+Asynchronous simulation jobs.
+
+Expensive simulations are accepted with 202 and run on a small pool of
+background threads (which hand the engine to the process pool when one is
+running). Clients poll the job until it is done. Finished jobs are kept for
+a limited time and count, so the store never grows without bound.
+
+Jobs live in the process that accepted them; behind several web workers a
+poll may reach a worker that never saw the job, so the API only creates
+jobs when it runs with a single worker.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the maximum number of unfinished jobs is reached"""
+
+
+class JobManager:
+    """Runs submitted callables in the background and keeps their results"""
+
+    def __init__(self, workers: int = 1, max_pending: int = 100, ttl: float = 3600.0, max_jobs: int = 1000):
+        """
+        Args:
+            workers: Jobs run at once
+            max_pending: Unfinished (queued or running) jobs accepted
+            ttl: Seconds a finished job's result stays available
+            max_jobs: Jobs retained in total; the oldest finished ones go first
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, task: Callable[[], Dict], **info) -> Dict:
+        """
+        Queue a job.
+
+        Args:
+            task: Zero-argument callable returning the job result
+            **info: Extra fields reported with the job (e.g. estimated_seconds)
+
+        Returns:
+            Snapshot of the new job
+
+        Raises:
+            JobQueueFullError: if max_pending jobs are unfinished
+        """
+        with self._lock:
+            self._expire()
+            pending = sum(1 for job in self._jobs.values() if job['status'] in (QUEUED, RUNNING))
+            if pending >= self.max_pending:
+                raise JobQueueFullError("Too many simulation jobs in progress")
+            job = dict(info, id=uuid.uuid4().hex, status=QUEUED, submitted_at=time.time())
+            self._jobs[job['id']] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='simulation-job')
+            snapshot = dict(job)
+        self._executor.submit(self._run, job, task)
+        return snapshot
+
+    def _run(self, job: Dict, task: Callable[[], Dict]):
+        with self._lock:
+            job.update(status=RUNNING, started_at=time.time())
+        try:
+            result = task()
+        except Exception as e:
+            with self._lock:
+                job.update(status=FAILED, error=str(e), finished_at=time.time())
+            return
+        with self._lock:
+            job.update(status=DONE, result=result, finished_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Snapshot of a job, or None if unknown or expired"""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _expire(self):
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job['status'] in (DONE, FAILED)]
+        excess = len(self._jobs) - self.max_jobs
+        for job in finished:
+            if now - job['finished_at'] > self.ttl or excess > 0:
+                del self._jobs[job['id']]
+                excess -= 1
+
+    def counts(self) -> Dict[str, int]:
+        """Retained jobs by status"""
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return counts
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,161 @@
+"""
+Lazy and background initialization of backend subsystems.
+
+Subsystems such as the database client or the simulation pool are wrapped in
+a LazyResource: nothing is constructed at import time, initialization
+happens on first use or on a background thread, and every resource reports
+its state and how long it took. The startup report collects these timings
+together with module import times.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+PENDING = 'pending'
+INITIALIZING = 'initializing'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class LazyResource:
+    """
+    A value built once, on first use or in the background.
+
+    A factory returning None is treated as "unavailable" (e.g. no database
+    credentials) rather than a failure; exceptions mark the resource failed
+    and get() returns None so callers can use their fallback path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        required: bool = True,
+        eager: Optional[bool] = None
+    ):
+        """
+        Args:
+            name: Subsystem name used in health and startup reports
+            factory: Zero-argument callable building the resource
+            required: Whether readiness waits for this resource
+            eager: Whether background start-up initializes it (default: required)
+        """
+        self.name = name
+        self.required = required
+        self.eager = required if eager is None else eager
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._state = PENDING
+        self._value = None
+        self._error: Optional[str] = None
+        self._init_seconds: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def settled(self) -> bool:
+        """True once initialization has finished, successfully or not"""
+        return self._state in (READY, FAILED)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Return the resource, initializing it on the calling thread if needed.
+
+        Args:
+            timeout: If another thread is initializing, wait at most this many
+                seconds and return None if it has not finished
+
+        Returns:
+            The resource, or None if unavailable, failed or still initializing
+        """
+        if self._state == READY:
+            return self._value
+        if self._state == FAILED:
+            return None
+
+        if not self._lock.acquire(blocking=False):
+            # Initialization in progress elsewhere
+            self._done.wait(timeout)
+            return self._value if self._state == READY else None
+
+        try:
+            if self._state == PENDING:
+                self._initialize()
+        finally:
+            self._lock.release()
+        return self._value if self._state == READY else None
+
+    def _initialize(self):
+        self._state = INITIALIZING
+        start = time.perf_counter()
+        try:
+            self._value = self._factory()
+            self._state = READY
+        except Exception as e:
+            self._error = str(e)[:200]
+            self._state = FAILED
+        finally:
+            self._init_seconds = time.perf_counter() - start
+            self._done.set()
+
+    def start_background(self) -> threading.Thread:
+        """Initialize on a daemon thread without blocking the caller"""
+        thread = threading.Thread(target=self.get, name=f"init-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def peek(self) -> Any:
+        """Return the value if already initialized, never triggering initialization"""
+        return self._value if self._state == READY else None
+
+    def status(self) -> Dict[str, Any]:
+        status = {
+            'state': self._state,
+            'available': self._state == READY and self._value is not None,
+            'required': self.required,
+        }
+        if self._init_seconds is not None:
+            status['init_ms'] = round(self._init_seconds * 1000, 2)
+        if self._error:
+            status['error'] = self._error
+        return status
+
+
+class StartupReport:
+    """Import and initialization timings for each subsystem"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.resources: List[LazyResource] = []
+
+    @contextmanager
+    def measure_import(self, name: str):
+        """Time a block of import statements"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.imports[name] = time.perf_counter() - start
+
+    def register(self, resource: LazyResource) -> LazyResource:
+        self.resources.append(resource)
+        return resource
+
+    @property
+    def ready(self) -> bool:
+        """Every required subsystem has finished initializing"""
+        return all(resource.settled for resource in self.resources if resource.required)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'uptime_s': round(time.perf_counter() - self._start, 3),
+            'imports_ms': {name: round(seconds * 1000, 2) for name, seconds in self.imports.items()},
+            'subsystems': {resource.name: resource.status() for resource in self.resources},
+        }
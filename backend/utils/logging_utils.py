@@ -0,0 +1,75 @@
+"""
+Structured, leveled and sampled logging.
+
+Log records are emitted as one JSON object per line with an event name and
+flat fields, so they can be filtered and aggregated instead of grepped.
+High-volume per-request debug events are sampled (LOG_SAMPLE_RATE) so they
+can stay enabled in production without flooding the logs.
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+from typing import Optional
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON with any structured fields attached"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': round(record.created, 3),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        payload.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger writing structured JSON lines to stderr"""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+    return logger
+
+
+def log_event(
+    logger: logging.Logger,
+    level: int,
+    event: str,
+    sample_rate: Optional[float] = None,
+    exc_info: bool = False,
+    **fields
+):
+    """
+    Emit a structured log event.
+
+    Args:
+        logger: Logger from get_logger()
+        level: logging level (e.g. logging.DEBUG)
+        event: Short event name such as 'simulate.request'
+        sample_rate: Fraction of events to keep (1.0 keeps all); None keeps all
+        exc_info: Attach the current exception traceback
+        **fields: Structured fields added to the record
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sample_rate is not None and sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    if sample_rate is not None and sample_rate < 1.0:
+        fields['sample_rate'] = sample_rate
+    logger.log(level, event, exc_info=exc_info, extra={'fields': fields})
+
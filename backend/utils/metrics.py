@@ -0,0 +1,320 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+A small, dependency-free registry of counters, gauges and histograms. Metric
+updates are thread-safe; render() produces the text format scraped from the
+/metrics endpoint.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond lookups to long simulations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: a named metric family with optional labels"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; may be computed on scrape by a callback"""
+
+    type_name = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], object]] = None
+    ):
+        """
+        Args:
+            callback: Optional function called at scrape time. Returns a number,
+                or a dict mapping label-value tuples to numbers for labelled gauges.
+        """
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                result = self._callback()
+            except Exception:
+                return []
+            if result is None:
+                return []
+            if isinstance(result, dict):
+                items = sorted((tuple(k) if isinstance(k, tuple) else (k,), v) for k, v in result.items())
+            else:
+                items = [((), result)]
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (e.g. latencies in seconds)"""
+
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager observing the elapsed wall time of its block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return int(state[-1]) if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, state):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, ('le', _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key, ('le', '+Inf'))
+            lines.append(f"{self.name}_bucket{labels} {int(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {int(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Re-registration (e.g. module reload) returns the live metric
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], object]] = None
+    ) -> Gauge:
+        gauge = self._register(Gauge(name, description, labels, callback))
+        if callback is not None:
+            # Later registrations rebind the callback to the current provider
+            gauge._callback = callback
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition of every registered metric"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide default registry
+registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ============================================
+# Simulation pipeline metrics
+# ============================================
+
+HTTP_REQUESTS = registry.counter(
+    'terrasim_http_requests_total', 'HTTP requests handled', ('endpoint', 'method', 'status')
+)
+HTTP_LATENCY = registry.histogram(
+    'terrasim_http_request_duration_seconds', 'HTTP request latency', ('endpoint',)
+)
+STAGE_LATENCY = registry.histogram(
+    'terrasim_simulate_stage_duration_seconds', 'Latency of each /api/simulate pipeline stage', ('stage',)
+)
+SIMULATIONS = registry.counter(
+    'terrasim_simulations_total', 'Simulations executed', ('execution',)
+)
+SIMULATION_RUNS = registry.counter(
+    'terrasim_simulation_runs_total', 'Monte Carlo runs executed'
+)
+SIMULATIONS_REUSED = registry.counter(
+    'terrasim_simulations_reused_total', 'Simulations answered from a recent nearby result'
+)
+SIMULATIONS_COALESCED = registry.counter(
+    'terrasim_simulations_coalesced_total', 'Simulations answered by joining an identical one in flight'
+)
+SIMULATIONS_TRUNCATED = registry.counter(
+    'terrasim_simulations_truncated_total', 'Simulations stopped early to meet a request deadline'
+)
+SIMULATION_PEAK_MEMORY = registry.histogram(
+    'terrasim_simulation_peak_memory_bytes', 'Measured peak allocation of sampled simulations', ('mode',),
+    buckets=(2 ** 20, 4 * 2 ** 20, 16 * 2 ** 20, 64 * 2 ** 20, 256 * 2 ** 20, 2 ** 30)
+)
+SIMULATION_MEMORY_DECISIONS = registry.counter(
+    'terrasim_simulation_memory_decisions_total', 'Engine mode chosen under the memory budget', ('decision',)
+)
+ADMISSION_WAIT = registry.histogram(
+    'terrasim_admission_wait_seconds', 'Time simulations waited for an admission slot'
+)
+ADMISSION_REJECTIONS = registry.counter(
+    'terrasim_admission_rejections_total', 'Simulations rejected by admission control', ('reason',)
+)
+STORAGE_CALLS = registry.counter(
+    'terrasim_storage_calls_total', 'Guarded storage calls by outcome', ('method', 'outcome')
+)
+PROFILES = registry.counter(
+    'terrasim_profiles_total', 'Requests profiled', ('trigger',)
+)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Record the duration of one /api/simulate pipeline stage"""
+    with STAGE_LATENCY.time(stage=stage):
+        yield
+
+
+def observe_stages(timings: Dict[str, float]):
+    """Record stage durations measured elsewhere (e.g. inside a worker process)"""
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.observe(seconds, stage=stage)
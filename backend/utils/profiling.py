@@ -0,0 +1,258 @@
+"""
+On-demand profiling of individual requests.
+
+A request is profiled when it carries the PROFILE_TOKEN in the X-Profile
+header (or the profile query parameter), or when it is picked by
+PROFILE_SAMPLE_RATE. Two profilers are available:
+
+    deterministic: cProfile; exact call counts and self/cumulative times,
+        with noticeable overhead on the tight Monte Carlo loop
+    sampling: a background thread records the request thread's Python stack
+        about every SAMPLING_INTERVAL seconds; low overhead, approximate times
+
+Either produces a compact summary (top functions by self time and self time
+per engine area) that can be returned with the response and/or written to
+PROFILE_DIR together with the raw profile.
+"""
+
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# Secret that authorizes profiling on demand; profiling is off without it
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+# Fraction of requests profiled in the background (requires PROFILE_DIR)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR')
+PROFILE_TOP = int(os.getenv('PROFILE_TOP', 15))
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODES = ('deterministic', 'sampling')
+# Matches the interpreter's default thread switch interval; the sampler
+# cannot run more often while the request thread holds the GIL
+SAMPLING_INTERVAL = 0.005
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Self time is grouped into these areas by source file or function name
+CATEGORIES = (
+    ('simulation', ('engine/simulator.py',)),
+    ('penalties', ('engine/penalties.py',)),
+    ('scoring', ('engine/scoring.py', 'statistics.py')),
+    ('explanation', ('engine/explainability.py',)),
+    ('summary', ('engine/sketch.py',)),
+    ('storage', ('storage/', 'sqlite3', 'httpx', 'postgrest')),
+    ('random', ('random.py', "of '_random.Random'")),
+    ('string formatting', ("'format' of 'str'", "'join' of 'str'", 'json/', 'flask/json')),
+)
+
+
+def profile_options(
+    headers: Mapping[str, str],
+    args: Mapping[str, str],
+    token: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    directory: Optional[str] = None
+) -> Optional[Dict]:
+    """
+    Decide whether to profile a request.
+
+    Args:
+        headers: Request headers (X-Profile carries the token)
+        args: Query parameters (profile carries the token, profile_mode
+            selects 'deterministic' or 'sampling')
+        token: Authorizing token (default PROFILE_TOKEN)
+        sample_rate: Background sampling rate (default PROFILE_SAMPLE_RATE)
+        directory: Output directory (default PROFILE_DIR)
+
+    Returns:
+        {'mode', 'trigger', 'respond'} or None when the request is not profiled.
+        respond is True only for authorized requests; sampled profiles are
+        written to the directory and never returned to the client.
+    """
+    token = PROFILE_TOKEN if token is None else token
+    sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+    directory = PROFILE_DIR if directory is None else directory
+
+    mode = args.get('profile_mode') or headers.get('X-Profile-Mode') or 'deterministic'
+    if mode not in PROFILE_MODES:
+        mode = 'deterministic'
+
+    supplied = headers.get(PROFILE_HEADER) or args.get('profile')
+    if token and supplied and hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        return {'mode': mode, 'trigger': 'requested', 'respond': True}
+    if directory and sample_rate > 0 and random.random() < sample_rate:
+        return {'mode': 'sampling', 'trigger': 'sampled', 'respond': False}
+    return None
+
+
+# ============================================
+# Profilers
+# ============================================
+
+def _function_label(filename: str, line: int, name: str) -> str:
+    if filename == '~':
+        return name
+    path = os.path.abspath(filename)
+    if path.startswith(_BACKEND_DIR + os.sep):
+        path = os.path.relpath(path, _BACKEND_DIR)
+    else:
+        path = os.path.basename(path)
+    return f"{path.replace(os.sep, '/')}:{line}({name})"
+
+
+def _category(label: str) -> str:
+    for category, markers in CATEGORIES:
+        if any(marker in label for marker in markers):
+            return category
+    return 'other'
+
+
+def _summary(mode: str, total: float, rows: List[Dict], top: int) -> Dict:
+    categories = Counter()
+    for row in rows:
+        categories[_category(row['function'])] += row['self_ms']
+    rows.sort(key=lambda row: row['self_ms'], reverse=True)
+    return {
+        'mode': mode,
+        'total_ms': round(total * 1000, 2),
+        'top': [dict(row, self_ms=round(row['self_ms'], 2), cumulative_ms=round(row['cumulative_ms'], 2)) for row in rows[:top]],
+        'categories': {name: round(ms, 2) for name, ms in categories.most_common()},
+    }
+
+
+class DeterministicProfiler:
+    """cProfile around the profiled code"""
+
+    mode = 'deterministic'
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._elapsed = 0.0
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def stop(self):
+        self._profile.disable()
+        self._elapsed = time.perf_counter() - self._start
+
+    def summary(self, top: int = PROFILE_TOP) -> Dict:
+        stats = pstats.Stats(self._profile)
+        rows = [
+            {
+                'function': _function_label(*function),
+                'calls': calls,
+                'self_ms': self_time * 1000,
+                'cumulative_ms': cumulative * 1000,
+            }
+            for function, (_, calls, self_time, cumulative, _) in stats.stats.items()
+        ]
+        return _summary(self.mode, self._elapsed, rows, top)
+
+    def dump(self, path: str) -> str:
+        path += '.prof'
+        self._profile.dump_stats(path)
+        return path
+
+
+class SamplingProfiler:
+    """Periodic stack samples of one thread, taken from a background thread"""
+
+    mode = 'sampling'
+
+    def __init__(self, interval: float = SAMPLING_INTERVAL, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = 0
+        self._self: Counter = Counter()
+        self._inclusive: Counter = Counter()
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._elapsed = 0.0
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack: List[Tuple[str, int, str]] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self.samples += 1
+            self._self[stack[0]] += 1
+            self._inclusive.update(set(stack))
+            self._stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._elapsed = time.perf_counter() - self._start
+
+    def summary(self, top: int = PROFILE_TOP) -> Dict:
+        scale = self._elapsed * 1000 / self.samples if self.samples else 0.0
+        rows = [
+            {
+                'function': _function_label(*function),
+                'samples': self._self[function],
+                'self_ms': self._self[function] * scale,
+                'cumulative_ms': count * scale,
+            }
+            for function, count in self._inclusive.items()
+        ]
+        summary = _summary(self.mode, self._elapsed, rows, top)
+        summary['samples'] = self.samples
+        return summary
+
+    def dump(self, path: str) -> str:
+        """Write collapsed stacks (flame graph input: "a;b;c count" per line)"""
+        path += '.folded'
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self._stacks.most_common():
+                f.write(';'.join(_function_label(*function) for function in stack) + f' {count}\n')
+        return path
+
+
+def start_profiler(mode: str):
+    """Start a profiler on the calling thread"""
+    profiler = SamplingProfiler() if mode == 'sampling' else DeterministicProfiler()
+    return profiler.start()
+
+
+def write_profile(profiler, summary: Dict, name: str, directory: Optional[str] = None) -> str:
+    """
+    Write the raw profile and its JSON summary to the profile directory.
+
+    Args:
+        profiler: Stopped profiler
+        summary: Its summary()
+        name: File name stem (e.g. endpoint and timestamp)
+        directory: Output directory (default PROFILE_DIR)
+
+    Returns:
+        Path of the raw profile (.prof for cProfile, .folded for sampling)
+    """
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path + '.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return profiler.dump(path)
@@ -0,0 +1,183 @@
+"""
+Reference data shared by the API and the simulation workers.
+
+Crop profiles and terrain modifiers normally come from Supabase; the values
+here are the fallbacks used when the database is unavailable, together with
+the helpers that turn database rows and request payloads into the structures
+the engine expects.
+"""
+
+from typing import Dict, List, Optional
+
+
+# Mock data for when Supabase is unavailable
+MOCK_CROPS = [
+    {
+        "id": 1,
+        "name": "Wheat",
+        "temp_min": 0,
+        "temp_max": 30,
+        "rainfall_min": 400,
+        "rainfall_max": 1000,
+        "growing_season_days": 120,
+        "ideal_yield": 5000,
+        "category": "Cereal",
+        "description": "Winter or spring cereal grain",
+        "season": "Winter",
+        "yield_potential": 5.5
+    },
+    {
+        "id": 2,
+        "name": "Rice",
+        "temp_min": 15,
+        "temp_max": 35,
+        "rainfall_min": 1200,
+        "rainfall_max": 2000,
+        "growing_season_days": 150,
+        "ideal_yield": 6000,
+        "category": "Cereal",
+        "description": "Staple grain crop requiring water",
+        "season": "Summer",
+        "yield_potential": 5.0
+    },
+    {
+        "id": 3,
+        "name": "Corn",
+        "temp_min": 10,
+        "temp_max": 35,
+        "rainfall_min": 400,
+        "rainfall_max": 1200,
+        "growing_season_days": 110,
+        "ideal_yield": 8000,
+        "category": "Cereal",
+        "description": "Versatile crop for food and feed",
+        "season": "Summer",
+        "yield_potential": 6.5
+    },
+    {
+        "id": 4,
+        "name": "Soybean",
+        "temp_min": 10,
+        "temp_max": 30,
+        "rainfall_min": 400,
+        "rainfall_max": 900,
+        "growing_season_days": 120,
+        "ideal_yield": 3000,
+        "category": "Legume",
+        "description": "Protein-rich legume crop",
+        "season": "Summer",
+        "yield_potential": 2.5
+    },
+    {
+        "id": 5,
+        "name": "Potato",
+        "temp_min": 5,
+        "temp_max": 25,
+        "rainfall_min": 400,
+        "rainfall_max": 800,
+        "growing_season_days": 90,
+        "ideal_yield": 20000,
+        "category": "Tuber",
+        "description": "Starchy tuber crop",
+        "season": "Spring/Fall",
+        "yield_potential": 20.0
+    }
+]
+
+# Default terrain modifiers when the terrain_modifiers table has no row
+TERRAIN_DEFAULTS = {
+    'plain': {'water_retention_factor': 1.0, 'soil_depth_factor': 1.0, 'erosion_risk': 0.1},
+    'plateau': {'water_retention_factor': 0.85, 'soil_depth_factor': 0.9, 'erosion_risk': 0.3},
+    'mountain': {'water_retention_factor': 0.6, 'soil_depth_factor': 0.7, 'erosion_risk': 0.7},
+    'valley': {'water_retention_factor': 1.1, 'soil_depth_factor': 1.1, 'erosion_risk': 0.2},
+    'coastal': {'water_retention_factor': 0.9, 'soil_depth_factor': 0.8, 'erosion_risk': 0.4}
+}
+
+DEFAULT_TERRAIN_MODIFIERS = {'water_retention_factor': 1.0, 'soil_depth_factor': 1.0, 'erosion_risk': 0.1}
+
+
+def find_crop(crops: List[Dict], crop_name: str) -> Optional[Dict]:
+    """Case-insensitive lookup of a crop profile by name"""
+    for crop in crops:
+        if crop['name'].lower() == crop_name.lower():
+            return crop
+    return None
+
+
+def extract_terrain_modifiers(row: Dict) -> Dict:
+    """Extract only the modifier fields the penalty engine needs from a terrain_modifiers row"""
+    return {
+        'water_retention_factor': row.get('water_retention_factor', 1.0),
+        'soil_depth_factor': row.get('soil_depth_factor', 1.0),
+        'erosion_risk': row.get('erosion_risk', 0.0)
+    }
+
+
+def default_terrain_modifiers(terrain: str) -> Dict:
+    """Built-in terrain modifiers for a terrain type"""
+    return dict(TERRAIN_DEFAULTS.get(terrain, DEFAULT_TERRAIN_MODIFIERS))
+
+
+def resolve_crop(storage, crop_name: str) -> Optional[Dict]:
+    """
+    Crop profile from storage, falling back to the built-in profiles.
+    
+    Args:
+        storage: StorageProvider, or None in mock mode
+        crop_name: Crop name (case-insensitive for the fallback)
+    """
+    if storage:
+        try:
+            crop = storage.get_crop(crop_name)
+            if crop:
+                return crop
+        except Exception:
+            pass
+    return find_crop(MOCK_CROPS, crop_name)
+
+
+def resolve_terrain_modifiers(storage, terrain: str) -> Dict:
+    """
+    Terrain modifiers from storage, falling back to the built-in defaults.
+    
+    Args:
+        storage: StorageProvider, or None in mock mode
+        terrain: Terrain type
+    """
+    if storage:
+        try:
+            row = storage.get_terrain_modifiers(terrain)
+            if row:
+                return extract_terrain_modifiers(row)
+        except Exception:
+            pass
+    return default_terrain_modifiers(terrain)
+
+
+def build_environment(data: Dict, baseline: Optional[Dict] = None) -> Dict:
+    """
+    Build the engine environment from a validated simulation payload.
+    
+    Missing weather fields fall back to the long-term climatology for the
+    location (if given), or to fixed defaults.
+    
+    Args:
+        data: Validated simulation payload
+        baseline: Optional climatology record for the location
+        
+    Returns:
+        Environment dictionary for PenaltyEngine and MonteCarloSimulator
+    """
+    weather = data.get('weather') or {}
+    baseline = baseline or {}
+    
+    return {
+        "avg_temp": weather.get('temp', baseline.get('avg_temp_annual', 25)),
+        "avg_rainfall": weather.get('rainfall', baseline.get('avg_rainfall_annual', 800)),
+        "humidity": weather.get('humidity', baseline.get('avg_humidity_annual', 70)),
+        "wind_speed": weather.get('wind', baseline.get('avg_wind_annual', 10)),
+        "elevation": data.get('elevation', 100),
+        "terrain": data['terrain'],
+        "latitude": data['location']['lat'],
+        "longitude": data['location']['lon']
+    }
@@ -0,0 +1,158 @@
+"""
+Response encoding: fast JSON, MessagePack and compression.
+
+FastJSONProvider replaces Flask's JSON provider, so every jsonify() call
+serializes with orjson when it is installed (falling back to the standard
+library otherwise) and answers with MessagePack instead of JSON when the
+client prefers application/msgpack and the msgpack package is installed.
+
+compress_response() negotiates gzip or brotli from Accept-Encoding for
+bodies above a size threshold. Buffered bodies are compressed in one go;
+streamed ones (exports) chunk by chunk, so memory use stays flat.
+"""
+
+import gzip
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+# Bodies worth compressing (Parquet is compressed internally already)
+COMPRESSIBLE_MIMETYPES = (
+    JSON_MIMETYPE, MSGPACK_MIMETYPE, 'text/csv', 'text/plain', 'application/vnd.apache.arrow.stream'
+)
+
+# Moderate levels: most of the size reduction for a fraction of the CPU time
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+if orjson is not None:
+    # Dates go through Flask's default (HTTP dates), as with the stdlib encoder
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def available_encodings() -> tuple:
+    """Content-Encodings this process can produce, most preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _wants_msgpack() -> bool:
+    if msgpack is None:
+        return False
+    accept = request.accept_mimetypes
+    best = accept.best_match((JSON_MIMETYPE,) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson and offering MessagePack"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs.get('indent'):
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if has_request_context() and _wants_msgpack():
+            body = msgpack.packb(obj, default=self.default, use_bin_type=True, datetime=False)
+            response = self._app.response_class(body, mimetype=MSGPACK_MIMETYPE)
+            response.vary.add('Accept')
+            return response
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            response = super().response(obj)
+        else:
+            body = orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+            response = self._app.response_class(body, mimetype=self.mimetype)
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+
+def choose_encoding(accept_encodings) -> Optional[str]:
+    """
+    Content-Encoding to use for a client.
+
+    Args:
+        accept_encodings: Werkzeug Accept of the request's Accept-Encoding
+
+    Returns:
+        'br', 'gzip', or None when the client accepts neither
+    """
+    return accept_encodings.best_match(available_encodings())
+
+
+def _compress_chunks(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def compress_response(response, min_bytes: int):
+    """
+    Compress a response in place when the client and the body allow it.
+
+    Args:
+        response: Flask response about to be sent
+        min_bytes: Smallest buffered body worth compressing
+
+    Returns:
+        The response
+    """
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_chunks(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < min_bytes:
+            return response
+        if encoding == 'br':
+            response.set_data(brotli.compress(body, quality=BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = encoding
+    return response
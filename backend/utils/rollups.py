@@ -0,0 +1,248 @@
+"""
+Analytics rollups over persisted simulations.
+
+Each simulation updates one rollup row keyed by (week, crop, terrain,
+region cell) holding counts and sums, so per-group averages are served
+from the rollups in O(groups) without scanning raw simulation rows.
+Storage providers keep the rollups current in the same transaction (or
+database trigger) that inserts the simulation, and merge them into the
+requested grouping in the database, so only the groups are returned. A
+query with more groups than MAX_ANALYTICS_GROUPS is refused rather than
+answered from a subset.
+"""
+
+import math
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Region cell size in degrees. Fixed rather than configurable: the Supabase
+# trigger in Database/supabase_schema.sql keys rollups on floor() of the
+# coordinates, i.e. 1 degree cells, and existing rollups use that size.
+ROLLUP_REGION_DEGREES = 1.0
+
+MAX_ANALYTICS_GROUPS = int(os.getenv('MAX_ANALYTICS_GROUPS', 5000))
+
+
+class TooManyGroupsError(ValueError):
+    """Raised when an analytics query has more groups than can be returned"""
+
+    def __init__(self, groups: int, limit: int):
+        """
+        Args:
+            groups: Groups matching the query
+            limit: Groups that could be returned
+        """
+        super().__init__(
+            f"The query matches {groups} groups, more than the {limit} that can be returned; "
+            "narrow the filters or group by fewer dimensions"
+        )
+        self.groups = groups
+        self.limit = limit
+
+
+ROLLUP_KEY_COLUMNS = ('week_start', 'crop_name', 'terrain', 'region_lat', 'region_lon')
+ROLLUP_VALUE_COLUMNS = (
+    'simulation_count', 'sum_success_probability', 'sum_expected_yield',
+    'low_risk_count', 'medium_risk_count', 'high_risk_count'
+)
+
+# group_by dimension -> rollup key columns
+GROUP_DIMENSIONS = {
+    'week': ('week_start',),
+    'crop': ('crop_name',),
+    'terrain': ('terrain',),
+    'region': ('region_lat', 'region_lon'),
+}
+
+
+def week_start(value) -> str:
+    """ISO date of the Monday starting the UTC week of a timestamp or date"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        value = value.date()
+    return (value - timedelta(days=value.weekday())).isoformat()
+
+
+def region_cell(lat: float, lon: float, degrees: float = ROLLUP_REGION_DEGREES) -> Tuple[float, float]:
+    """South-west corner of the region cell containing a coordinate"""
+    return (
+        round(math.floor(float(lat) / degrees) * degrees, 6),
+        round(math.floor(float(lon) / degrees) * degrees, 6),
+    )
+
+
+def rollup_delta(record: Dict, degrees: float = ROLLUP_REGION_DEGREES) -> Dict:
+    """Rollup key and increments contributed by one simulation row"""
+    region_lat, region_lon = region_cell(record['latitude'], record['longitude'], degrees)
+    risk = str(record.get('risk_level', '')).lower()
+    return {
+        'week_start': week_start(record['created_at']),
+        'crop_name': record['crop_name'],
+        'terrain': record['terrain'],
+        'region_lat': region_lat,
+        'region_lon': region_lon,
+        'simulation_count': 1,
+        'sum_success_probability': float(record['success_probability']),
+        'sum_expected_yield': float(record['expected_yield']),
+        'low_risk_count': int(risk == 'low'),
+        'medium_risk_count': int(risk == 'medium'),
+        'high_risk_count': int(risk == 'high'),
+    }
+
+
+def merge_deltas(deltas: Iterable[Dict]) -> List[Dict]:
+    """Combine deltas sharing a key so a bulk insert touches each rollup row once"""
+    merged: Dict[Tuple, Dict] = {}
+    for delta in deltas:
+        key = tuple(delta[column] for column in ROLLUP_KEY_COLUMNS)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(delta)
+        else:
+            for column in ROLLUP_VALUE_COLUMNS:
+                current[column] += delta[column]
+    return list(merged.values())
+
+
+def group_columns(group_by: List[str]) -> List[str]:
+    """Rollup key columns of the requested group_by dimensions"""
+    return [column for dimension in group_by for column in GROUP_DIMENSIONS[dimension]]
+
+
+def check_groups(rows: List[Dict]) -> List[Dict]:
+    """
+    Make sure grouped rollup rows cover every group of the query.
+
+    Args:
+        rows: Grouped rows, each carrying group_total (the number of groups
+            before any row limit, as computed by the database)
+
+    Returns:
+        The rows, without group_total
+
+    Raises:
+        TooManyGroupsError: if the rows were cut off by a limit
+    """
+    total = rows[0]['group_total'] if rows else 0
+    if total > len(rows):
+        raise TooManyGroupsError(total, len(rows))
+    return [{key: value for key, value in row.items() if key != 'group_total'} for row in rows]
+
+
+def parse_analytics_query(args) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Parse and validate /api/analytics query parameters.
+
+    Supported parameters:
+        crop, terrain: equality filters
+        week_from, week_to: inclusive range of week start dates (YYYY-MM-DD)
+        lat_min, lat_max, lon_min, lon_max: region bounding box
+        group_by: comma-separated subset of week, crop, terrain, region
+            (default: all four)
+
+    Args:
+        args: Mapping of query-string values (e.g. request.args)
+
+    Returns:
+        (query, None) on success or (None, error message)
+    """
+    try:
+        filters = {}
+        for param, column in (('crop', 'crop_name'), ('terrain', 'terrain')):
+            if args.get(param):
+                filters[column] = args[param]
+
+        ranges = {}
+        for column, low_param, high_param in (
+            ('week_start', 'week_from', 'week_to'),
+            ('region_lat', 'lat_min', 'lat_max'),
+            ('region_lon', 'lon_min', 'lon_max'),
+        ):
+            low, high = args.get(low_param), args.get(high_param)
+            if column == 'week_start':
+                try:
+                    # Any day in a week selects that whole week
+                    low = week_start(date.fromisoformat(low)) if low else None
+                    high = week_start(date.fromisoformat(high)) if high else None
+                except ValueError:
+                    raise ValueError("week_from and week_to must be dates (YYYY-MM-DD)")
+            else:
+                try:
+                    low = float(low) if low not in (None, '') else None
+                    high = float(high) if high not in (None, '') else None
+                except ValueError:
+                    raise ValueError(f"{low_param} and {high_param} must be numbers")
+                # Include the cell that contains the lower bound
+                if low is not None:
+                    low = math.floor(low / ROLLUP_REGION_DEGREES) * ROLLUP_REGION_DEGREES
+            if low is not None or high is not None:
+                ranges[column] = (low, high)
+
+        dimensions = [d.strip() for d in args.get('group_by', '').split(',') if d.strip()]
+        dimensions = dimensions or list(GROUP_DIMENSIONS)
+        unknown = [d for d in dimensions if d not in GROUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown group_by dimensions: {', '.join(unknown)}")
+    except ValueError as e:
+        return None, str(e)
+
+    return {
+        'filters': filters,
+        'ranges': ranges,
+        'group_by': list(dict.fromkeys(dimensions)),
+    }, None
+
+
+def aggregate(rows: Iterable[Dict], group_by: List[str]) -> List[Dict]:
+    """
+    Merge rollup rows into the requested grouping and compute averages.
+
+    Args:
+        rows: Rollup rows (key columns plus counts and sums), usually
+            already grouped by the storage provider
+        group_by: Dimensions from GROUP_DIMENSIONS to keep
+
+    Returns:
+        One dict per group, ordered by week (newest first) then key
+    """
+    columns = group_columns(group_by)
+    groups: Dict[Tuple, Dict] = {}
+    for row in rows:
+        key = tuple(row[column] for column in columns)
+        group = groups.get(key)
+        if group is None:
+            group = {column: row[column] for column in columns}
+            group.update({column: 0 for column in ROLLUP_VALUE_COLUMNS})
+            groups[key] = group
+        for column in ROLLUP_VALUE_COLUMNS:
+            group[column] += row[column] or 0
+
+    results = []
+    for group in groups.values():
+        count = group['simulation_count']
+        result = {column: group[column] for column in columns if column not in ('region_lat', 'region_lon')}
+        if 'region' in group_by:
+            result['region'] = {
+                'lat': float(group['region_lat']),
+                'lon': float(group['region_lon']),
+                'size_degrees': ROLLUP_REGION_DEGREES
+            }
+        result.update({
+            'simulation_count': count,
+            'avg_success_probability': round(group['sum_success_probability'] / count, 4) if count else None,
+            'avg_expected_yield': round(group['sum_expected_yield'] / count, 2) if count else None,
+            'risk_counts': {
+                'Low': group['low_risk_count'],
+                'Medium': group['medium_risk_count'],
+                'High': group['high_risk_count'],
+            },
+        })
+        results.append(result)
+
+    results.sort(key=lambda r: tuple(str(r.get(c, '')) for c in ('crop_name', 'terrain')))
+    results.sort(key=lambda r: r.get('week_start', ''), reverse=True)
+    return results
@@ -0,0 +1,97 @@
+"""
+Cost-based routing of simulation requests.
+
+The cost of a simulation is estimated in seconds of engine time from its run
+count and engine mode. With SIMULATION_EXECUTION=auto, cheap requests run
+inline on the request thread (the pool's inter-process round trip would cost
+more than it saves), medium ones run in the process pool, and expensive ones
+become asynchronous jobs polled through /api/jobs/<id>.
+
+Per-run costs default to figures measured with the benchmark suite
+(pipeline.run_simulation cases) and can be recalibrated on the deployment hardware
+from a saved benchmark baseline (tools/benchmark.py run -o ...).
+"""
+
+import json
+import re
+from typing import Dict, Optional
+
+ROUTES = ('inline', 'pool', 'job')
+
+# Engine seconds per Monte Carlo run; the full pipeline (simulation,
+# metrics, explanation, summary) measured 8.5-12 us per run
+SECONDS_PER_RUN = 12e-6
+# Streaming aggregation trades memory for time (see engine.memory)
+MODE_COST_FACTOR = {'full': 1.0, 'streaming': 1.5}
+
+_PIPELINE_CASE = re.compile(r'^pipeline\.run_simulation\[.+-(\d+)\]$')
+
+
+def estimate_seconds(runs: int, mode: str = 'full', seconds_per_run: float = SECONDS_PER_RUN) -> float:
+    """
+    Estimate the engine time of one simulation.
+
+    Args:
+        runs: Number of Monte Carlo runs
+        mode: Engine mode ('full' or 'streaming')
+        seconds_per_run: Calibrated cost of one run in full mode
+
+    Returns:
+        Estimated seconds
+    """
+    return runs * seconds_per_run * MODE_COST_FACTOR[mode]
+
+
+def choose_route(estimated_seconds: float, inline_max: float, job_min: float) -> str:
+    """
+    Pick where a simulation runs.
+
+    Args:
+        estimated_seconds: Estimated engine time (estimate_seconds)
+        inline_max: Simulations estimated below this run on the request thread
+        job_min: Simulations estimated at or above this become asynchronous jobs
+
+    Returns:
+        'inline', 'pool' or 'job'
+    """
+    if estimated_seconds >= job_min:
+        return 'job'
+    if estimated_seconds < inline_max:
+        return 'inline'
+    return 'pool'
+
+
+def calibrate(baseline: Dict) -> Optional[float]:
+    """
+    Seconds per run from a benchmark baseline document.
+
+    Uses the slowest pipeline.run_simulation case per run, so estimates
+    stay conservative across scenarios. Those cases time the whole engine
+    (simulation, metrics, explanation, summary) like SECONDS_PER_RUN;
+    simulator.run cases leave out everything after the Monte Carlo loop
+    and are not used.
+
+    Args:
+        baseline: Document saved by tools/benchmark.py run
+
+    Returns:
+        Seconds per run, or None if the baseline has no pipeline cases
+    """
+    per_run = []
+    for name, timing in baseline.get('results', {}).items():
+        match = _PIPELINE_CASE.match(name)
+        if match and timing.get('median'):
+            per_run.append(timing['median'] / int(match.group(1)))
+    return max(per_run) if per_run else None
+
+
+def load_calibration(path: str) -> Optional[float]:
+    """
+    Seconds per run from a benchmark baseline file (see calibrate).
+
+    Raises:
+        OSError: if the file cannot be read
+        ValueError: if it is not valid JSON
+    """
+    with open(path, encoding='utf-8') as f:
+        return calibrate(json.load(f))
@@ -0,0 +1,103 @@
+"""
+Coalescing of identical in-flight computations.
+
+When several requests need the same result at the same time, only the
+first (the leader) computes it; the others wait for the leader and share
+its result or its exception. Errors that belong to the leader alone (such
+as its client being refused admission) can instead be retried by the
+followers with their own compute. Followers wait at most a given time.
+Nothing is cached: once the leader finishes, the next request for the key
+starts a new computation.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+
+class FlightTimeout(TimeoutError):
+    """Raised in a follower whose leader did not finish in time"""
+
+
+def canonical_key(*parts) -> str:
+    """Stable digest of JSON-like values (dict key order does not matter)"""
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        timeout: Optional[float] = None,
+        retry_on: Tuple[Type[BaseException], ...] = ()
+    ) -> Tuple[Any, bool]:
+        """
+        Compute the value for a key, or wait for the computation in flight.
+
+        Args:
+            key: Identity of the computation (see canonical_key)
+            compute: Zero-argument callable producing the value
+            timeout: Seconds a follower waits for the leader (None = no limit)
+            retry_on: Leader errors followers do not share; they start over
+                with their own compute instead
+
+        Returns:
+            (value, shared); shared is True when another caller computed it
+
+        Raises:
+            FlightTimeout: In a follower, when the leader did not finish in time
+            Whatever compute raised, in the leader and every follower (unless
+            it is one of retry_on)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    call.followers += 1
+            if leader:
+                break
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not call.done.wait(remaining):
+                raise FlightTimeout(f"Shared computation did not finish within {timeout:g}s")
+            if call.error is None:
+                return call.result, True
+            if not isinstance(call.error, retry_on):
+                raise call.error
+
+        try:
+            call.result = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Keys currently being computed"""
+        with self._lock:
+            return len(self._calls)
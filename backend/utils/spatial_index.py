@@ -0,0 +1,282 @@
+"""
+Spatial index of past simulations.
+
+Simulations are bucketed by (crop, terrain) and a fixed-size lat/lon grid
+cell. Nearest-neighbour and radius queries scan outward ring by ring from
+the query cell and stop as soon as no unvisited ring can hold a closer
+point, so a lookup touches a handful of cells instead of every stored row.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+# Environment inputs that must match for a past simulation to be reused,
+# with the absolute tolerance allowed for each
+REUSE_TOLERANCES = {
+    'avg_temp': 0.5,
+    'avg_rainfall': 10.0,
+    'humidity': 2.0,
+    'wind_speed': 1.0,
+    'elevation': 50.0,
+}
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_timestamp(value) -> float:
+    """Epoch seconds from an epoch number or ISO 8601 string (now if missing)"""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def inputs_match(a: Dict, b: Dict, tolerances: Dict[str, float] = REUSE_TOLERANCES) -> bool:
+    """Whether two environments agree on every input within tolerance"""
+    for field, tolerance in tolerances.items():
+        if a.get(field) is None or b.get(field) is None:
+            return False
+        if abs(float(a[field]) - float(b[field])) > tolerance:
+            return False
+    return True
+
+
+def can_reuse(entry: Dict, environment: Dict, runs: int) -> bool:
+    """
+    Whether an entry's result may answer a new simulation request.
+
+    Args:
+        entry: Index entry (see simulation_entry)
+        environment: Environment of the request
+        runs: Runs the request asks for; an entry with fewer runs is less
+            precise than requested and is not reused
+    """
+    return (
+        entry['result'] is not None
+        and (entry.get('simulation_runs') or 0) >= runs
+        and inputs_match(entry['inputs'], environment)
+    )
+
+
+class SpatialIndex:
+    """
+    Grid-bucketed index of simulations keyed by crop and terrain.
+
+    Entries are dicts with at least crop_name, terrain, latitude and
+    longitude; created_at (epoch or ISO string), inputs and result are kept
+    as given. The index holds at most max_entries, evicting the oldest.
+    """
+
+    def __init__(self, cell_degrees: float = 0.5, max_entries: int = 100000):
+        """
+        Args:
+            cell_degrees: Grid cell size in degrees
+            max_entries: Maximum number of simulations held in memory
+        """
+        self.cell_degrees = cell_degrees
+        self.max_entries = max_entries
+        self._rows = int(math.ceil(180 / cell_degrees))
+        self._cols = int(math.ceil(360 / cell_degrees))
+        self._cells: Dict[Tuple[str, str], Dict[Tuple[int, int], List[Dict]]] = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @staticmethod
+    def _key(crop: str, terrain: str) -> Tuple[str, str]:
+        return crop.lower(), terrain
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        row = min(int((lat + 90) // self.cell_degrees), self._rows - 1)
+        col = int((lon + 180) // self.cell_degrees) % self._cols
+        return row, col
+
+    def add(self, entry: Dict):
+        """Index one simulation"""
+        entry = dict(entry)
+        entry['latitude'] = float(entry['latitude'])
+        entry['longitude'] = float(entry['longitude'])
+        entry['created_at'] = parse_timestamp(entry.get('created_at'))
+
+        key = self._key(entry['crop_name'], entry['terrain'])
+        cell = self._cell(entry['latitude'], entry['longitude'])
+        with self._lock:
+            self._cells.setdefault(key, {}).setdefault(cell, []).append(entry)
+            self._order.append((key, cell, entry))
+            while len(self._order) > self.max_entries:
+                old_key, old_cell, old_entry = self._order.popleft()
+                bucket = self._cells[old_key][old_cell]
+                bucket.remove(old_entry)
+                if not bucket:
+                    del self._cells[old_key][old_cell]
+
+    def _ring(self, center: Tuple[int, int], radius: int):
+        """Cells at Chebyshev distance `radius` from center (longitude wraps)"""
+        row0, col0 = center
+        if radius == 0:
+            yield center
+            return
+        for row in range(row0 - radius, row0 + radius + 1):
+            if not (0 <= row < self._rows):
+                continue
+            if row in (row0 - radius, row0 + radius):
+                cols = range(col0 - radius, col0 + radius + 1)
+            else:
+                cols = (col0 - radius, col0 + radius)
+            # Wide rings wrap around the antimeridian onto themselves
+            for col in sorted({col % self._cols for col in cols}):
+                yield row, col
+
+    def _ring_min_km(self, lat: float, radius: int) -> float:
+        """Lower bound on the distance from the query point to any cell in a ring"""
+        if radius <= 1:
+            return 0.0
+        degrees = (radius - 1) * self.cell_degrees
+        # Longitude degrees shrink towards the poles; use the widest latitude the ring can reach
+        extreme_lat = min(89.9, abs(lat) + radius * self.cell_degrees)
+        return degrees * KM_PER_DEGREE * math.cos(math.radians(extreme_lat))
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        crop: str,
+        terrain: str,
+        k: int = 1,
+        max_distance_km: Optional[float] = None,
+        max_age_seconds: Optional[float] = None,
+        predicate: Optional[Callable[[Dict], bool]] = None
+    ) -> List[Tuple[float, Dict]]:
+        """
+        k nearest simulations for a crop and terrain.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            crop: Crop name (case-insensitive)
+            terrain: Terrain type
+            k: Number of results
+            max_distance_km: Optional search radius
+            max_age_seconds: Ignore simulations older than this
+            predicate: Optional extra filter on entries
+
+        Returns:
+            List of (distance_km, entry), nearest first
+        """
+        with self._lock:
+            cells = self._cells.get(self._key(crop, terrain))
+            if not cells:
+                return []
+
+            now = time.time()
+            center = self._cell(lat, lon)
+            max_radius = max(self._rows, self._cols)
+            found: List[Tuple[float, Dict]] = []
+
+            def consider(entries):
+                for entry in entries:
+                    if max_age_seconds is not None and now - entry['created_at'] > max_age_seconds:
+                        continue
+                    distance = haversine_km(lat, lon, entry['latitude'], entry['longitude'])
+                    if max_distance_km is not None and distance > max_distance_km:
+                        continue
+                    if predicate is not None and not predicate(entry):
+                        continue
+                    found.append((distance, entry))
+
+            for radius in range(max_radius + 1):
+                ring_min = self._ring_min_km(lat, radius)
+                if max_distance_km is not None and ring_min > max_distance_km:
+                    break
+                if len(found) >= k and ring_min > found[k - 1][0]:
+                    break
+
+                if 8 * radius > len(cells):
+                    # Sparse data: scanning the remaining occupied cells is
+                    # cheaper than walking ever larger empty rings
+                    for cell, entries in cells.items():
+                        if self._chebyshev(center, cell) >= radius:
+                            consider(entries)
+                    found.sort(key=lambda item: item[0])
+                    break
+
+                for cell in self._ring(center, radius):
+                    consider(cells.get(cell, ()))
+                found.sort(key=lambda item: item[0])
+
+            return found[:k]
+
+    def _chebyshev(self, a: Tuple[int, int], b: Tuple[int, int]) -> int:
+        col_distance = abs(a[1] - b[1])
+        return max(abs(a[0] - b[0]), min(col_distance, self._cols - col_distance))
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        crop: str,
+        terrain: str,
+        max_age_seconds: Optional[float] = None
+    ) -> List[Tuple[float, Dict]]:
+        """All simulations for a crop and terrain within radius_km, nearest first"""
+        return self.nearest(
+            lat, lon, crop, terrain,
+            k=self.max_entries, max_distance_km=radius_km, max_age_seconds=max_age_seconds
+        )
+
+
+def simulation_entry(record: Dict, result: Optional[Dict] = None) -> Dict:
+    """
+    Build an index entry from a simulations row.
+
+    Args:
+        record: Row with crop_name, terrain, latitude, longitude, the
+            environment input columns (avg_temp, avg_rainfall, ...) and
+            simulation_runs
+        result: API response for the simulation, if available; only entries
+            with a full result can be served in place of a new run
+    """
+    return {
+        'id': record.get('id'),
+        'crop_name': record['crop_name'],
+        'terrain': record['terrain'],
+        'latitude': record['latitude'],
+        'longitude': record['longitude'],
+        'created_at': record.get('created_at'),
+        'inputs': {field: record.get(field) for field in REUSE_TOLERANCES},
+        'simulation_runs': record.get('simulation_runs'),
+        'result': result,
+    }
+
+
+def entry_to_json(entry: Dict, distance_km: float) -> Dict:
+    """Public representation of an index entry"""
+    return {
+        'id': entry.get('id'),
+        'crop_name': entry['crop_name'],
+        'terrain': entry['terrain'],
+        'latitude': entry['latitude'],
+        'longitude': entry['longitude'],
+        'distance_km': round(distance_km, 3),
+        'created_at': datetime.utcfromtimestamp(entry['created_at']).isoformat() + 'Z',
+        'inputs': entry['inputs'],
+        'result': entry['result'],
+    }
@@ -1,11 +1,22 @@
 from typing import Dict, Optional
 
-def validate_input(data: Dict) -> Optional[str]:
+# Top-level fields of a /api/simulate response a client may ask for
+SIMULATION_FIELDS = (
+    'success_probability', 'expected_yield', 'risk_level', 'explanation', 'is_override',
+    'yield_range', 'simulation_runs', 'truncated', 'confidence_interval', 'simulation_id', 'examples'
+)
+
+# Example runs returned per request (per stratum when stratified)
+DEFAULT_EXAMPLE_RUNS = 5
+MAX_EXAMPLE_RUNS = 20
+
+def validate_input(data: Dict, max_runs: Optional[int] = None) -> Optional[str]:
     """
     Validate simulation input data.
     
     Args:
         data: Input payload from API request
+        max_runs: Largest accepted runs value (unbounded if None)
         
     Returns:
         Error message if validation fails, None otherwise
@@ -78,6 +89,56 @@ def validate_input(data: Dict) -> Optional[str]:
             except (ValueError, TypeError):
                 return "Invalid humidity value"
     
+    # Validate reuse of nearby past simulations if requested
+    if 'reuse' in data:
+        reuse = data['reuse']
+        
+        if not isinstance(reuse, (bool, dict)):
+            return "Reuse must be a boolean or an object"
+        
+        if isinstance(reuse, dict):
+            for key in ('radius_km', 'max_age_hours'):
+                if key in reuse:
+                    try:
+                        if float(reuse[key]) < 0:
+                            return f"reuse.{key} cannot be negative"
+                    except (ValueError, TypeError):
+                        return f"Invalid reuse.{key} value"
+    
+    # Validate response deadline
+    if 'deadline_ms' in data:
+        deadline_ms = data['deadline_ms']
+        if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0:
+            return "deadline_ms must be a positive number"
+    
+    # Validate response field projection
+    if 'fields' in data:
+        fields = data['fields']
+        if not isinstance(fields, list) or not fields or not all(isinstance(f, str) for f in fields):
+            return "fields must be a non-empty list of field names"
+        unknown = [f for f in fields if f not in SIMULATION_FIELDS]
+        if unknown:
+            return f"Unknown fields: {', '.join(unknown)}"
+    
+    # Validate example runs: a count, or {"size": n, "stratify": bool}
+    if 'examples' in data:
+        examples = data['examples']
+        size = examples
+        if isinstance(examples, dict):
+            size = examples.get('size', DEFAULT_EXAMPLE_RUNS)
+            if not isinstance(examples.get('stratify', False), bool):
+                return "examples.stratify must be a boolean"
+        if isinstance(size, bool) or not isinstance(size, int) or not (0 <= size <= MAX_EXAMPLE_RUNS):
+            return f"examples must be an integer between 0 and {MAX_EXAMPLE_RUNS}"
+    
+    # Validate requested number of Monte Carlo runs
+    if 'runs' in data:
+        runs = data['runs']
+        if isinstance(runs, bool) or not isinstance(runs, int) or runs < 1:
+            return "Runs must be a positive integer"
+        if max_runs is not None and runs > max_runs:
+            return f"Runs cannot exceed {max_runs}"
+    
     return None
 
 def validate_crop_profile(crop: Dict) -> Optional[str]:
@@ -106,4 +167,38 @@ def validate_crop_profile(crop: Dict) -> Optional[str]:
     if crop['ideal_yield'] <= 0:
         return "ideal_yield must be positive"
     
-    return None
\ No newline at end of file
+    return None
+
+
+def validate_feedback(data: Dict) -> Optional[str]:
+    """
+    Validate user feedback on a simulation.
+    
+    Args:
+        data: Feedback payload
+        
+    Returns:
+        Error message if invalid, None otherwise
+    """
+    if not data or not isinstance(data, dict):
+        return "Invalid feedback data"
+    
+    if 'accuracy_rating' not in data and 'actual_yield' not in data:
+        return "Provide accuracy_rating or actual_yield"
+    
+    if 'accuracy_rating' in data:
+        rating = data['accuracy_rating']
+        if isinstance(rating, bool) or not isinstance(rating, int) or not (1 <= rating <= 5):
+            return "accuracy_rating must be an integer between 1 and 5"
+    
+    if 'actual_yield' in data:
+        try:
+            if float(data['actual_yield']) < 0:
+                return "actual_yield cannot be negative"
+        except (ValueError, TypeError):
+            return "Invalid actual_yield value"
+    
+    if 'comments' in data and not isinstance(data['comments'], str):
+        return "comments must be a string"
+    
+    return None
@@ -0,0 +1,105 @@
+"""
+What-if sessions: interactive edits re-scored against fixed random draws.
+
+A session samples the random draws of a scenario once (weather deviates and
+random events, engine.simulator.RunDraws) and keeps them server-side. Each
+edit of the inputs (crop, terrain, weather, location) re-scores the same
+draws, so consecutive answers differ only because of the edit, not because
+of sampling noise, and no new draws are sampled.
+
+Sessions expire after a period without use and the least recently used are
+evicted when the session count or the memory held by draws is over its
+limit. Sessions live in the process that created them; behind several
+workers, requests for a session must reach the same worker.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class WhatIfSessions:
+    """TTL and LRU bounded store of what-if sessions"""
+
+    def __init__(self, ttl: float = 900.0, max_sessions: int = 100, max_bytes: int = 64 * 2 ** 20):
+        """
+        Args:
+            ttl: Seconds a session lives after its last use
+            max_sessions: Sessions kept at once
+            max_bytes: Memory the sessions' draws may hold in total
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def create(self, inputs: Dict, draws) -> Dict:
+        """
+        Store a new session.
+
+        Args:
+            inputs: Simulation payload the session starts from
+            draws: RunDraws sampled for the session
+
+        Returns:
+            The session (id, inputs, draws, expires_at)
+        """
+        session = {'id': uuid.uuid4().hex, 'inputs': inputs, 'draws': draws}
+        with self._lock:
+            self._expire()
+            session['expires_at'] = time.time() + self.ttl
+            self._sessions[session['id']] = session
+            self._bytes += draws.nbytes
+            # The new session itself is kept even if it alone is over budget
+            while len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._sessions)))
+        return dict(session)
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Session by id, renewing its lifetime; None if unknown or expired"""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session['expires_at'] = time.time() + self.ttl
+            self._sessions.move_to_end(session_id)
+            return dict(session)
+
+    def update(self, session_id: str, inputs: Dict) -> bool:
+        """Replace a session's inputs after an edit; False if it is gone"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return False
+            session['inputs'] = inputs
+            return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id)
+            return True
+
+    def _remove(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._bytes -= session['draws'].nbytes
+
+    def _expire(self):
+        now = time.time()
+        expired = [sid for sid, session in self._sessions.items() if session['expires_at'] <= now]
+        for session_id in expired:
+            self._remove(session_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Sessions held and the memory of their draws"""
+        with self._lock:
+            self._expire()
+            return {'sessions': len(self._sessions), 'bytes': self._bytes}